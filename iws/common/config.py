@@ -5,6 +5,7 @@ import secrets
 from dotenv import load_dotenv
 
 from framework.enums import EnvType
+from framework.settings import getSettings
 
 # loads .env files
 load_dotenv()
@@ -47,6 +48,32 @@ class Config:
     __DB_NAME = 'DB_NAME'
     __DB_USERNAME = 'DB_USERNAME'
     __DB_PASSWORD = 'DB_PASSWORD'
+    __DB_ECHO = 'DB_ECHO'
+    __DB_POOL_SIZE = 'DB_POOL_SIZE'
+    __DB_MAX_OVERFLOW = 'DB_MAX_OVERFLOW'
+    __DB_JOURNAL_MODE = 'DB_JOURNAL_MODE'
+    __DB_SYNCHRONOUS = 'DB_SYNCHRONOUS'
+    __DB_MMAP_SIZE = 'DB_MMAP_SIZE'
+    __DB_CACHE_SIZE = 'DB_CACHE_SIZE'
+    __DB_BUSY_TIMEOUT = 'DB_BUSY_TIMEOUT'
+    __DB_TEMP_STORE = 'DB_TEMP_STORE'
+
+    # Auth Configs
+    __AUTH_CACHE_SIZE = 'AUTH_CACHE_SIZE'
+    __AUTH_CACHE_TTL = 'AUTH_CACHE_TTL'
+
+    # Storage Configs
+    __BLOB_STORE_PATH = 'BLOB_STORE_PATH'
+    __BLOB_CHUNK_SIZE = 'BLOB_CHUNK_SIZE'
+
+    # Log Configs
+    __LOG_QUEUE_SIZE = 'LOG_QUEUE_SIZE'
+    __LOG_BATCH_SIZE = 'LOG_BATCH_SIZE'
+    __SERVER_TIMING_ENABLED = 'SERVER_TIMING_ENABLED'
+
+    # Metrics Configs
+    __METRICS_ENABLED = 'METRICS_ENABLED'
+    __METRICS_DIR = 'PROMETHEUS_MULTIPROC_DIR'
 
     ENC_KEY = None
     ENC_NONCE = None
@@ -54,8 +81,43 @@ class Config:
     # env configs
     CORS_ENABLED = bool(os.getenv(__CORS_ENABLED))
 
+    # Database performance profile (SQLite), see 'SQLite3Connector'
+    DB_ECHO = EnvType.getenv_bool(__DB_ECHO)
+    DB_POOL_SIZE = int(os.getenv(__DB_POOL_SIZE, 5))
+    DB_MAX_OVERFLOW = int(os.getenv(__DB_MAX_OVERFLOW, 10))
+    DB_JOURNAL_MODE = os.getenv(__DB_JOURNAL_MODE, "WAL")
+    DB_SYNCHRONOUS = os.getenv(__DB_SYNCHRONOUS, "NORMAL")
+    DB_MMAP_SIZE = int(os.getenv(__DB_MMAP_SIZE, 256 * 1024 * 1024))
+    # negative value is in KiB i.e. -64000 => ~64MB
+    DB_CACHE_SIZE = int(os.getenv(__DB_CACHE_SIZE, -64000))
+    # in milliseconds
+    DB_BUSY_TIMEOUT = int(os.getenv(__DB_BUSY_TIMEOUT, 5000))
+    DB_TEMP_STORE = os.getenv(__DB_TEMP_STORE, "MEMORY")
+
+    # authenticated-principal cache, see 'PrincipalCache'
+    # per worker, the other workers serve a revoked principal until its entry expires, so the TTL is kept short
+    AUTH_CACHE_SIZE = int(os.getenv(__AUTH_CACHE_SIZE, 1024))
+    # in seconds
+    AUTH_CACHE_TTL = float(os.getenv(__AUTH_CACHE_TTL, 60))
+
+    # content-addressed blob store of the uploads, see 'BlobStore'
+    # in bytes
+    BLOB_CHUNK_SIZE = int(os.getenv(__BLOB_CHUNK_SIZE, 1024 * 1024))
+
+    # asynchronous log pipeline, see 'AsyncLogPipeline'
+    # the records are dropped when the queue is full
+    LOG_QUEUE_SIZE = int(os.getenv(__LOG_QUEUE_SIZE, 10000))
+    LOG_BATCH_SIZE = int(os.getenv(__LOG_BATCH_SIZE, 256))
+    # per-request 'Server-Timing' header and log fields, see 'ServerTiming'
+    SERVER_TIMING_ENABLED = EnvType.getenv_bool(__SERVER_TIMING_ENABLED, True)
+
+    # request, DB pool, cache and worker metrics at '/metrics', see 'MetricsRegistry'
+    METRICS_ENABLED = EnvType.getenv_bool(__METRICS_ENABLED, True)
+    # the directory shared by the (gunicorn) workers to aggregate their metrics, per process if not set
+    METRICS_DIR = os.getenv(__METRICS_DIR) or None
+
     # load ENV specific configs
-    if EnvType.is_testing(EnvType.get_env_type()):
+    if getSettings().testing:
         # loads app's config file
         with open(__APP_CONFIG_FILE_PATH) as config_file:
             APP_CONFIGS = json.load(config_file)
@@ -66,6 +128,7 @@ class Config:
         DB_HOSTNAME = os.getenv(__DB_HOSTNAME)
         DB_PORT = os.getenv(__DB_PORT)
         DB_NAME = "".join(["test", os.getenv(__DB_NAME).title()])
+        BLOB_STORE_PATH = os.getenv(__BLOB_STORE_PATH, "testBlobs")
         DB_USERNAME = os.getenv(__DB_USERNAME)
         DB_PASSWORD = os.getenv(__DB_PASSWORD)
     else:
@@ -80,6 +143,7 @@ class Config:
         DB_HOSTNAME = os.getenv(__DB_HOSTNAME)
         DB_PORT = os.getenv(__DB_PORT)
         DB_NAME = os.getenv(__DB_NAME)
+        BLOB_STORE_PATH = os.getenv(__BLOB_STORE_PATH, "blobs")
         DB_USERNAME = os.getenv(__DB_USERNAME)
         DB_PASSWORD = os.getenv(__DB_PASSWORD)
 
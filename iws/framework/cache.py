@@ -0,0 +1,94 @@
+#
+# Author: Rohtash Lakra
+#
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache(object):
+    """TTLCache is a bounded, thread-safe, time-to-live cache.
+
+    The entries expire 'ttl' seconds after they are put, the least recently used entry is evicted when the cache
+    grows beyond the 'maxSize' entries. The hits/misses are counted to monitor the cache's effectiveness.
+    """
+
+    def __init__(self, maxSize: int = 1024, ttl: float = 300.0, timer: Callable[[], float] = time.monotonic):
+        if maxSize <= 0:
+            raise ValueError(f"Invalid maxSize={maxSize}!")
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value of the key if cached and not expired otherwise the default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expireAt = entry
+                if expireAt > self.timer():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                self._evict(key, value)
+
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Caches the value of the key for the 'ttl' seconds"""
+        with self._lock:
+            self._entries[key] = (value, self.timer() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                oldKey, (oldValue, _) = self._entries.popitem(last=False)
+                self._onEvict(oldKey, oldValue)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Removes the key from the cache and returns True if it was cached otherwise False"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._evict(key, entry[0])
+
+            return entry is not None
+
+    def clear(self) -> None:
+        """Removes all the entries and resets the counters"""
+        with self._lock:
+            for key, (value, _) in list(self._entries.items()):
+                self._evict(key, value)
+
+            self.hits = 0
+            self.misses = 0
+
+    def hitRatio(self) -> float:
+        """Returns the ratio of the hits of all the lookups"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _evict(self, key: Hashable, value: Any) -> None:
+        del self._entries[key]
+        self._onEvict(key, value)
+
+    def _onEvict(self, key: Hashable, value: Any) -> None:
+        """The hook called (within the lock) when an entry is removed from the cache"""
+        pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{self.__class__.__name__} <maxSize={self.maxSize}, ttl={self.ttl}, size={len(self)}, "
+                f"hits={self.hits}, misses={self.misses}>")
+
+    def __repr__(self) -> str:
+        """Returns the string representation of this object"""
+        return str(self)
@@ -3,14 +3,17 @@
 #
 import logging
 import sqlite3
+from functools import partial
 from pathlib import Path
-from typing import Union, Iterable
+from typing import Union, Iterable, Dict, Any
 
 import click
 from flask import Flask, g, current_app
-from sqlalchemy import Engine, URL, create_engine
+from sqlalchemy import Engine, URL, create_engine, event, make_url
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, StaticPool
 
+from framework.db.search import createFullTextIndex
 from framework.enums import KeyEnum
 from framework.orm.sqlalchemy.schema import BaseSchema
 
@@ -18,18 +21,47 @@ logger = logging.getLogger(__name__)
 
 
 @staticmethod
-def createEngine(dbUri: Union[str, URL], debug: bool = False) -> Engine:
+def createEngine(dbUri: Union[str, URL], debug: bool = False, pragmas: Dict[str, Any] = None, poolSize: int = 5,
+                 maxOverflow: int = 10) -> Engine:
     """Create a new :class:`Engine` instance.
 
     The debug=True parameter indicates that SQL emitted by connections will be logged to standard out.
+    The pragmas (i.e. 'SQLITE_PERFORMANCE_PROFILE') are applied on every new (pooled) SQLite connection.
     """
-    logger.debug(f"+createEngine({dbUri}, {debug})")
-    engine = create_engine(dbUri, pool_recycle=3600, echo=debug)
+    logger.debug(f"+createEngine({dbUri}, {debug}, {pragmas}, {poolSize}, {maxOverflow})")
+    dbUrl = make_url(dbUri)
+    if dbUrl.get_backend_name() == "sqlite":
+        if dbUrl.database in (None, "", ":memory:"):
+            # an in-memory database lives as long as its connection, share the only one
+            engine = create_engine(dbUrl, poolclass=StaticPool, connect_args={"check_same_thread": False},
+                                   echo=debug)
+        else:
+            # file-based database, pooled connections shared across (gthread) worker threads
+            busyTimeout = (pragmas or {}).get("busy_timeout", 5000)
+            engine = create_engine(dbUrl, poolclass=QueuePool, pool_size=poolSize, max_overflow=maxOverflow,
+                                   pool_recycle=3600, echo=debug,
+                                   connect_args={"check_same_thread": False, "timeout": busyTimeout / 1000})
+
+        if pragmas:
+            event.listen(engine, "connect", partial(applyPragmas, pragmas=pragmas))
+    else:
+        engine = create_engine(dbUrl, pool_recycle=3600, echo=debug)
+
     engine.execution_options(isolation_level="AUTOCOMMIT")
     logger.debug(f"-createEngine(), engine={engine}")
     return engine
 
 
+def applyPragmas(dbapiConnection, connectionRecord, pragmas: Dict[str, Any]) -> None:
+    """Applies the SQLite pragmas on a new DBAPI connection (engine's 'connect' event)."""
+    cursor = dbapiConnection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
 @staticmethod
 def createDatabase(engine: Engine) -> None:
     """ Creates the database. """
@@ -43,6 +75,15 @@ def createDatabase(engine: Engine) -> None:
     # AbstractEntity.metadata.create_all(bind=self.engine)
     try:
         BaseSchema.metadata.create_all(bind=engine)
+        # 'create_all()' creates the indexes with their (missing) tables only, the new indexes of the existing tables
+        for table in BaseSchema.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+        # the FTS5 virtual tables of the full-text indexed tables, see 'fullTextIndex'
+        with engine.begin() as connection:
+            for table in BaseSchema.metadata.sorted_tables:
+                createFullTextIndex(connection, table)
     except Exception as ex:
         logger.error(f"Error while creating database! Exception={ex}")
 
@@ -72,6 +113,22 @@ KEY_CONNECTION = 'connection'
 KEY_POOL_NAME = 'sqlite3_pool'
 SQLITE_PREFIX = 'sqlite:///'
 
+# SQLite performance profile (PRAGMA name => value), each value is overridden by the app's config 'DB_<NAME>' (see
+# 'Config', i.e. the environment variables) in '_init_configs'.
+SQLITE_PERFORMANCE_PROFILE = {
+    # readers don't block the writer and the writer doesn't block readers
+    "journal_mode": "WAL",
+    # safe with WAL, fsync only on checkpoints
+    "synchronous": "NORMAL",
+    # memory-mapped I/O (in bytes)
+    "mmap_size": 256 * 1024 * 1024,
+    # page cache per connection (negative value is in KiB)
+    "cache_size": -64000,
+    # wait (in milliseconds) on a locked database instead of failing with 'database is locked'
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
 
 class DatabaseConnector(object):
     """Database Connector"""
@@ -102,6 +159,10 @@ class SQLite3Connector(DatabaseConnector):
         self.db_password = None
         self.db_uri = None
         self.engine: Engine = None
+        self.echo = False
+        self.pool_size = 5
+        self.max_overflow = 10
+        self.pragmas: Dict[str, Any] = dict(SQLITE_PERFORMANCE_PROFILE)
         # self.metadata = None
         # self.session = None
 
@@ -146,6 +207,14 @@ class SQLite3Connector(DatabaseConnector):
             self.db_uri = ''.join([SQLITE_PREFIX, self.db_name])
             self.db_password = self.app.config.get("DB_PASSWORD")
             current_app.logger.debug(f"db_name={self.db_name}, db_password={self.db_password}, db_uri={self.db_uri}")
+            # performance profile
+            self.echo = bool(self.app.config.get("DB_ECHO", False))
+            self.pool_size = int(self.app.config.get("DB_POOL_SIZE", 5))
+            self.max_overflow = int(self.app.config.get("DB_MAX_OVERFLOW", 10))
+            self.pragmas = {name: self.app.config.get(f"DB_{name.upper()}", value)
+                            for name, value in SQLITE_PERFORMANCE_PROFILE.items()}
+            current_app.logger.debug(f"echo={self.echo}, pool_size={self.pool_size}, "
+                                     f"max_overflow={self.max_overflow}, pragmas={self.pragmas}")
 
     def init_db(self, configs: dict = None):
         """Initializes the database"""
@@ -158,7 +227,8 @@ class SQLite3Connector(DatabaseConnector):
                 # Set up the SQLAlchemy Database to be a local file 'posts.db'
                 self.app.config['SQLALCHEMY_DATABASE_URI'] = self.db_uri
                 # SQLAlchemy DB Creation
-                self.engine = createEngine(self.db_uri, debug=True)
+                self.engine = createEngine(self.db_uri, debug=self.echo, pragmas=self.pragmas,
+                                           poolSize=self.pool_size, maxOverflow=self.max_overflow)
                 createDatabase(self.engine)
 
             else:
@@ -0,0 +1,93 @@
+#
+# Author: Rohtash Lakra
+# References:
+# - https://www.sqlite.org/fts5.html
+#
+import re
+from typing import Optional, Dict
+
+from sqlalchemy import Connection, Table, text
+
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+# the keys of the 'Table.info' listing the full-text indexed columns and their bm25 weights, see 'fullTextIndex'
+FULL_TEXT_COLUMNS = "full_text_columns"
+FULL_TEXT_WEIGHTS = "full_text_weights"
+# the words (and the optional trailing '*' of the prefix queries) of a search text
+_WORD_PATTERN = re.compile(r"\w+\*?")
+
+
+def fullTextIndex(table: Table, columns: Dict[str, float]) -> None:
+    """Declares the full-text (FTS5) index of the table's columns (with their bm25 weights), created by
+    'createDatabase'. The 'rank' of the matches is the bm25 score of the weighted columns, the lower the better.
+    """
+    table.info[FULL_TEXT_COLUMNS] = tuple(columns.keys())
+    table.info[FULL_TEXT_WEIGHTS] = tuple(columns.values())
+
+
+def fullTextTableName(table: Table) -> str:
+    """Returns the name of the table's FTS5 virtual table"""
+    return f"{table.name}_fts"
+
+
+def createFullTextIndex(connection: Connection, table: Table) -> bool:
+    """Creates the table's FTS5 'external content' virtual table and the triggers syncing it on the table's
+    inserts/updates/deletes. The index is built from the existing rows when created, returns True if created.
+
+    The virtual table stores the index only (the text is read from the table), with the 2 and 3 characters prefix
+    indexes for the prefix queries.
+    """
+    columns = table.info.get(FULL_TEXT_COLUMNS)
+    if not columns:
+        return False
+
+    ftsName = fullTextTableName(table)
+    exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                                {"name": ftsName}).first()
+    if exists:
+        return False
+
+    logger.info(lambda: f"Creating the full-text index [{ftsName}] of {table.name}{columns}")
+    names = ", ".join(columns)
+    newValues = ", ".join(f"new.{column}" for column in columns)
+    oldValues = ", ".join(f"old.{column}" for column in columns)
+    statements = [
+        f"CREATE VIRTUAL TABLE {ftsName} USING fts5({names}, content='{table.name}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {ftsName}_ai AFTER INSERT ON {table.name} BEGIN "
+        f"INSERT INTO {ftsName}(rowid, {names}) VALUES (new.id, {newValues}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {ftsName}_ad AFTER DELETE ON {table.name} BEGIN "
+        f"INSERT INTO {ftsName}({ftsName}, rowid, {names}) VALUES ('delete', old.id, {oldValues}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {ftsName}_au AFTER UPDATE ON {table.name} BEGIN "
+        f"INSERT INTO {ftsName}({ftsName}, rowid, {names}) VALUES ('delete', old.id, {oldValues}); "
+        f"INSERT INTO {ftsName}(rowid, {names}) VALUES (new.id, {newValues}); END",
+        # the default 'rank' i.e. 'ORDER BY rank' (which the FTS5 sorts itself)
+        f"INSERT INTO {ftsName}({ftsName}, rank) "
+        f"VALUES ('rank', 'bm25({', '.join(str(it) for it in table.info[FULL_TEXT_WEIGHTS])})')",
+        # indexes the existing rows
+        f"INSERT INTO {ftsName}({ftsName}) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
+
+    return True
+
+
+def matchQuery(searchText: Optional[str], prefix: bool = True) -> Optional[str]:
+    """Returns the FTS5 MATCH query of the search text, or None if it has no word.
+
+    Each word is quoted (so the FTS5 operators/syntax of the user's text are matched as plain words) and all the words
+    must match. The words ending with '*', and the last word if 'prefix' (i.e. search as you type), are prefix queries.
+    """
+    words = _WORD_PATTERN.findall(searchText or "")
+    if not words:
+        return None
+
+    terms = []
+    for index, word in enumerate(words):
+        isPrefix = word.endswith("*") or (prefix and index == len(words) - 1)
+        terms.append(f'"{word.rstrip("*")}"' + ("*" if isPrefix else ""))
+
+    return " ".join(terms)
@@ -4,9 +4,11 @@
 # https://docs.sqlalchemy.org/en/20/orm/session_basics.html#when-do-i-construct-a-session-when-do-i-commit-it-and-when-do-i-close-it
 # 
 import logging
-from typing import Iterable
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
 
-from sqlalchemy import select
+from flask import Flask, current_app, g, has_request_context
+from sqlalchemy import Engine, select
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -125,3 +127,75 @@ class SessionManager:
                 session.commit()
                 logger.debug(f"Deleted [{len(instances)}] instances successfully!")
         logger.debug(f"-delete_all()")
+
+
+class RequestScopedSession:
+    """RequestScopedSession is a unit-of-work per HTTP request.
+
+    The first repository call of a request checks out one pooled connection and opens one session bound to it, all the
+    other repository calls of the same request reuse them. The session is committed (or rolled back on error), closed
+    and the connection is returned to the pool when the request is torn down. Outside a request (i.e. scripts, tests),
+    'openSession()' falls back to a short-lived session per call.
+
+    The session doesn't expire its objects on commit (the mapped models are built after the repository calls), so the
+    repositories' reads (i.e. 'filterStatement()', 'findById()') re-populate the objects of its identity map.
+    """
+
+    EXTENSION_NAME = "request_scoped_session"
+
+    def __init__(self, app: Flask = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        """Registers the unit-of-work with the app's request lifecycle"""
+        app.extensions[self.EXTENSION_NAME] = self
+        app.teardown_request(self.teardown)
+
+    def currentSession(self, engine: Engine) -> Session:
+        """Returns the session of the current request for the engine, opens it on the first use"""
+        sessions = g.setdefault("_db_sessions", {})
+        session = sessions.get(engine)
+        if session is None:
+            session = Session(bind=engine.connect(), expire_on_commit=False)
+            sessions[engine] = session
+            logger.debug(f"Opened request session for engine={engine}")
+
+        return session
+
+    def teardown(self, exception: Optional[BaseException] = None):
+        """Commits/rolls back, closes the request's sessions and returns their connections to the pool"""
+        sessions = g.pop("_db_sessions", None)
+        if not sessions:
+            return
+
+        for engine, session in sessions.items():
+            connection = session.get_bind()
+            try:
+                if session.in_transaction():
+                    if exception is None:
+                        session.commit()
+                    else:
+                        session.rollback()
+            except Exception as ex:
+                logger.error(f"Failed to end the request session! Error={ex}")
+                session.rollback()
+            finally:
+                session.close()
+                connection.close()
+                logger.debug(f"Closed request session for engine={engine}")
+
+
+@contextmanager
+def openSession(engine: Engine) -> Iterator[Session]:
+    """Returns the request-scoped session, when called within a request of an app having 'RequestScopedSession'
+    registered, otherwise a new session, which is closed on exit.
+    """
+    requestSession = current_app.extensions.get(RequestScopedSession.EXTENSION_NAME) \
+        if has_request_context() else None
+    if requestSession is not None:
+        # owned by the request, closed on the request's teardown
+        yield requestSession.currentSession(engine)
+    else:
+        with Session(bind=engine, expire_on_commit=False) as session:
+            yield session
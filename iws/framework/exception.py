@@ -65,7 +65,7 @@ class AuthorizationException(AbstractException):
     """ Authorization Exception """
     
     def __init__(self, messages: List[Optional[str]] = None, **kwargs):
-        super().__init__(httpStatus=HTTPStatus.UNAUTHORIZED, messages=messages, kwargs=kwargs)
+        super().__init__(httpStatus=HTTPStatus.FORBIDDEN, messages=messages, kwargs=kwargs)
 
 
 class RecordNotFoundException(AbstractException):
@@ -1,11 +1,16 @@
 #
 # Author: Rohtash Lakra
 #
+from framework.security.authorization import Grants
+
 
 def checkPermission(user, permission_name) -> bool:
-    """Checks if the user has a specific permission"""
-    for role in user.roles:
-        for permission in role.permissions:
-            if permission.name == permission_name:
-                return True
-    return False
+    """Checks if the user (or its compiled grants) has a specific permission.
+
+    Prefer the 'Grants' (see 'RoleService.findGrants') for the repeated checks, a user's roles are compiled per call.
+    """
+    if not isinstance(user, Grants):
+        user = Grants.compile((role.id, role.name, permission.name)
+                              for role in user.roles for permission in role.permissions)
+
+    return permission_name in user.permissions
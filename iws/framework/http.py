@@ -96,6 +96,7 @@ class HTTPStatus(AutoUpperCase):
     204	No Content - The request was successful, but the response has no content.
     400	Bad Request - The request was malformed.
     401	Unauthorized - The client is not authorized to perform the requested action.
+    403	Forbidden - The client is authenticated but has no access rights to the content.
     404	Not Found - The requested resource was not found.
     409 Conflict - This response is sent when a request conflicts with the current state of the server. In WebDAV remote web authoring, 409 responses are errors sent to the client so that a user might be able to resolve a conflict and resubmit the request.
     415	Unsupported Media Type - The server does not support the request data format.
@@ -113,6 +114,7 @@ class HTTPStatus(AutoUpperCase):
     NO_CONTENT = (204, 'No Content')  # The request was successful, but the response has no content.
     BAD_REQUEST = (400, 'Bad Request')  # The request was malformed.
     UNAUTHORIZED = (401, 'Unauthorized')  # The client is not authorized to perform the requested action.
+    FORBIDDEN = (403, 'Forbidden')  # The client is authenticated but has no access rights to the content.
     NOT_FOUND = (404, 'Not Found')  # The requested resource was not found.
     CONFLICT = (409, 'Conflict')  # This response is sent when a request conflicts with the current state of the server.
     UNSUPPORTED_MEDIA_TYPE = (415, 'Unsupported Media Type')  # The server does not support the request data format.
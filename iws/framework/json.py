@@ -1,15 +1,28 @@
 #
 # Author: Rohtash Lakra
 #
+import dataclasses
 import functools
-import inspect
 import json
 import typing as t
 import uuid
-from datetime import datetime as dt
+from abc import ABC, abstractmethod
+from datetime import date, datetime as dt, time
 from decimal import Decimal
+from enum import Enum
 
-from sqlalchemy.orm import DeclarativeMeta
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel as PydanticBaseModel
+from sqlalchemy import inspect as sqlInspect
+from sqlalchemy.orm import DeclarativeBase, DeclarativeMeta
+
+from framework.timing import timed
+
+try:
+    import orjson
+except ImportError:
+    # the standard 'json' is used
+    orjson = None
 
 
 def wrap_default(default_fn: t.Callable) -> t.Callable:
@@ -63,6 +76,138 @@ class JSONEncoder(json.JSONEncoder):
         return super().default(instance)
 
 
+def toJSONCompatible(instance: t.Any) -> t.Any:
+    """The 'default' hook of the JSON backends, returns the JSON-compatible object of an instance the backend can't
+    encode natively (the returned object is encoded recursively, so the models are dumped in the python mode).
+
+    -   :class:`datetime.datetime`, :class:`datetime.date` and :class:`datetime.time` are serialized to ISO 8601
+        strings (as by the pydantic and the orjson).
+    -   :class:`decimal.Decimal` is serialized to a float.
+    -   :class:`uuid.UUID` is serialized to a string.
+    -   The pydantic models and the ORM schemas are serialized to their fields/columns.
+    """
+    if isinstance(instance, PydanticBaseModel):
+        return instance.model_dump()
+
+    if isinstance(instance, DeclarativeBase):
+        return {column.key: getattr(instance, column.key) for column in sqlInspect(instance).mapper.column_attrs}
+
+    if isinstance(instance, (dt, date, time)):
+        return instance.isoformat()
+
+    if isinstance(instance, Decimal):
+        return float(instance)
+
+    if isinstance(instance, uuid.UUID):
+        return str(instance)
+
+    if isinstance(instance, Enum):
+        return instance.value
+
+    if isinstance(instance, (set, frozenset, tuple)):
+        return list(instance)
+
+    if dataclasses.is_dataclass(instance) and not isinstance(instance, type):
+        return dataclasses.asdict(instance)
+
+    if hasattr(instance, "to_json"):
+        return instance.to_json()
+
+    if hasattr(instance, "__dict__"):
+        return {key: value for key, value in vars(instance).items() if not key.startswith("_")}
+
+    raise TypeError(f"Object of type {type(instance).__name__} is not JSON serializable")
+
+
+class JSONBackend(ABC):
+    """JSONBackend encodes/decodes the JSON, the fastest available backend is used by default (see 'jsonBackend')."""
+
+    name: str = None
+
+    @abstractmethod
+    def dumps(self, instance: t.Any, sortKeys: bool = False, indent: bool = False) -> bytes:
+        """Returns the UTF-8 encoded JSON of the instance"""
+        pass
+
+    @abstractmethod
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        """Returns the object of the JSON data"""
+        pass
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return f"{type(self).__name__} <name={self.name}>"
+
+
+class StdJSONBackend(JSONBackend):
+    """StdJSONBackend uses the standard 'json' module"""
+
+    name = "json"
+
+    # @override
+    def dumps(self, instance: t.Any, sortKeys: bool = False, indent: bool = False) -> bytes:
+        return json.dumps(instance, default=toJSONCompatible, ensure_ascii=False, sort_keys=sortKeys,
+                          indent=2 if indent else None, separators=None if indent else (",", ":")).encode()
+
+    # @override
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        return json.loads(data)
+
+
+class OrJSONBackend(JSONBackend):
+    """OrJSONBackend uses the 'orjson', which encodes the dicts, lists, datetimes, UUIDs, enums and dataclasses
+    natively (in Rust) and calls 'toJSONCompatible()' for the rest.
+    """
+
+    name = "orjson"
+
+    # @override
+    def dumps(self, instance: t.Any, sortKeys: bool = False, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if sortKeys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(instance, default=toJSONCompatible, option=option)
+
+    # @override
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        return orjson.loads(data)
+
+
+# the orjson, if installed, otherwise the standard json
+jsonBackend: JSONBackend = OrJSONBackend() if orjson else StdJSONBackend()
+
+
+class JSONProvider(DefaultJSONProvider):
+    """JSONProvider is the Flask's JSON provider (i.e. 'app.json'), which encodes the 'jsonify()' and the dict/list
+    responses with the 'backend' straight into the response's bytes.
+    """
+
+    backend: JSONBackend = jsonBackend
+    # the models' fields are kept in their declaration order
+    sort_keys = False
+
+    # @override
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        return self.backend.dumps(obj, sortKeys=kwargs.get("sort_keys", self.sort_keys),
+                                  indent=bool(kwargs.get("indent"))).decode()
+
+    # @override
+    def loads(self, s: t.Union[str, bytes], **kwargs: t.Any) -> t.Any:
+        return self.backend.loads(s)
+
+    # @override
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        with timed("serialize"):
+            data = self.backend.dumps(obj, sortKeys=self.sort_keys, indent=indent)
+
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
+
 class JSONUtils:
     """ Central point to serialize and deserialize to/from JSON. """
 
@@ -98,30 +243,12 @@ class JSONUtils:
 
 
 class JsonEncoder(JSONEncoder):
-
-    @wrap_default
-    def default(self, o):
-        return super().default(o)
+    """JsonEncoder encodes any object with the 'toJSONCompatible()' (i.e. the models, the ORM schemas and the public
+    attributes of the other objects).
+    """
 
     def default(self, instance):
-        # return super().default(instance)
-        if hasattr(instance, "to_json"):
-            return self.default(instance.to_json())
-        elif hasattr(instance, "__dict__"):
-            obj_dict = dict((key, value) for key, value in inspect.getmembers(instance)
-                            if not key.startswith("__")
-                            and not inspect.isabstract(value)
-                            and not inspect.isbuiltin(value)
-                            and not inspect.isfunction(value)
-                            and not inspect.isgenerator(value)
-                            and not inspect.isgeneratorfunction(value)
-                            and not inspect.ismethod(value)
-                            and not inspect.ismethoddescriptor(value)
-                            and not inspect.isroutine(value)
-                            )
-            return self.default(obj_dict)
-
-        return instance
+        return toJSONCompatible(instance)
 
 
 class AbstractJSONHandler(JSONEncoder):
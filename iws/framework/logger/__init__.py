@@ -6,18 +6,28 @@
 # reqeustIdFilter = RequestIdFilter()
 # https://dev.to/camillehe1992/mask-sensitive-data-using-python-built-in-logging-module-45fa
 
+import atexit
+import copy
 import json
 import logging
+import os
+import queue
 import re
+import threading
+import weakref
+from collections import Counter
 from copy import deepcopy
+from logging.handlers import QueueHandler, QueueListener
 from sys import stdout
+from typing import Iterable, List
 
 import requests
 from flask import Flask, g, has_request_context, request
 from flask.logging import default_handler
 from flask_log_request_id import RequestID, RequestIDLogFilter
 
-from framework.enums import EnvType, KeyEnum
+from framework.enums import KeyEnum
+from framework.settings import getSettings
 
 UTF_8 = 'utf-8'
 LOG_LEVEL = logging.DEBUG
@@ -29,6 +39,11 @@ DATE_FORMAT_TZ = "%Y-%m-%d %H:%M:%S %z"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 DATE_FORMAT_MSEC = "%Y-%m-%d %H:%M:%S.%f,%03d"
 
+# the bounded queue of the asynchronous log pipeline, the records are dropped when it's full
+LOG_QUEUE_SIZE = 10000
+# the max number of the records written per batch by the pipeline's listener
+LOG_BATCH_SIZE = 256
+
 # Configure app default loggers
 logging.basicConfig(level=LOG_LEVEL, format=DETAILED_LOG_FORMAT, force=True)
 logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
@@ -59,30 +74,57 @@ sensitive_keys = (
 )
 
 
+# the replacement of the sensitive data
+MASK = "******"
+
+
 class SensitiveDataFilter(logging.Filter):
+    """SensitiveDataFilter masks the sensitive data of the log records, i.e. the values of the 'sensitive_keys' and the
+    matches of the 'sensitive_regex_patterns'.
+
+    All the patterns are compiled into a single regex (an alternation of the keys' and the data's patterns) when the
+    filter is created, so each message (and string arg) is scanned once, whatever the number of the patterns/keys.
+    The records below the 'level' are not emitted (i.e. by the handler of the filter) and are skipped.
+    """
     sensitive_regex_patterns = sensitive_regex_patterns
     sensitive_keys = sensitive_keys
 
+    def __init__(self, name: str = "", level: int = logging.NOTSET):
+        super().__init__(name)
+        self.level = level
+        alternatives = []
+        if self.sensitive_keys:
+            keys = "|".join(re.escape(key) for key in self.sensitive_keys)
+            alternatives.append(rf"'(?P<key>{keys})': '[^']+'")
+
+        alternatives.extend(f"(?:{pattern})" for pattern in self.sensitive_regex_patterns)
+        self.pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    @staticmethod
+    def _mask(match: re.Match) -> str:
+        """Returns the masked key's value or the masked data of the match"""
+        if match.lastgroup == "key":
+            return f"'{match.group('key')}': '{MASK}'"
+
+        return MASK
+
     def filter(self, record):
+        if record.levelno < self.level or self.pattern is None:
+            return True
+
         try:
-            record.args = self.mask_sensitive_args(record.args)
+            if record.args:
+                record.args = self.mask_sensitive_args(record.args)
             record.msg = self.mask_sensitive_data(record.msg)
-            return True
         except Exception as ex:
             logger.error(f"Error={ex}")
-            return True
+
+        return True
 
     def mask_sensitive_args(self, args):
         if isinstance(args, dict):
-            masked_args = args.copy()
-            for key in args.keys():
-                if key in sensitive_keys:
-                    masked_args[key] = "******"
-                else:
-                    # mask sensitive data in dict values
-                    masked_args[key] = self.mask_sensitive_data(args[key])
-
-            return masked_args
+            return {key: MASK if key in self.sensitive_keys else self.mask_sensitive_data(value)
+                    for key, value in args.items()}
 
         # when there are multi arg in record.args
         return tuple([self.mask_sensitive_data(arg) for arg in args])
@@ -92,26 +134,243 @@ class SensitiveDataFilter(logging.Filter):
         if isinstance(message, dict):
             return self.mask_sensitive_args(message)
 
-        # mask sensitive data in message
+        # mask sensitive data in message, in a single pass
         if isinstance(message, str):
-            for pattern in self.sensitive_regex_patterns:
-                message = re.sub(pattern, "******", message)
-
-            # replace sensitive data with asterisks
-            for key in self.sensitive_keys:
-                pattern_str = rf"'{key}': '[^']+'"
-                replace = f"'{key}': '******'"
-                message = re.sub(pattern_str, replace, message)
+            message = self.pattern.sub(self._mask, message)
 
         return message
 
 
+class LazyLogger(logging.LoggerAdapter):
+    """Logger facade that defers building the log messages until a record is actually emitted.
+
+    The message can be a callable (i.e. a lambda wrapping an f-string), which is only invoked when the level is enabled,
+    so the (expensive) stringification of ORM/Pydantic objects is skipped when i.e. DEBUG is off.
+
+    Example:
+        ```python
+        logger = getLogger(__name__)
+        logger.debug(lambda: f"-findByFilter(), schemaObjects={schemaObjects}")
+        logger.debug("-findByFilter(), schemaObjects=%s", schemaObjects)
+        ```
+    """
+
+    def __init__(self, logger: logging.Logger, extra=None):
+        super().__init__(logger, extra)
+
+    def isDebugEnabled(self) -> bool:
+        """Returns True if the DEBUG level is enabled for this logger otherwise False."""
+        return self.isEnabledFor(logging.DEBUG)
+
+    def process(self, msg, kwargs):
+        """Builds the message, only called when the record is going to be logged."""
+        if callable(msg):
+            msg = msg()
+
+        return msg, kwargs
+
+
+def getLogger(name: str = None) -> LazyLogger:
+    """Returns the lazy logger facade of the logger with the specified name."""
+    return LazyLogger(logging.getLogger(name))
+
+
+class AsyncQueueHandler(QueueHandler):
+    """AsyncQueueHandler enqueues the records of the request's threads without ever blocking them, the records are
+    dropped (and counted) when the bounded queue is full.
+
+    The message is merged with its args and the request's context (i.e. the request id) is captured here, on the
+    request's thread, the rest (formatting, masking and writing) is done by the 'BatchQueueListener'. The args are
+    masked before they are merged, the sensitive keys of the (dict) args aren't in the merged message anymore.
+    """
+
+    def __init__(self, queue_: queue.Queue):
+        super().__init__(queue_)
+        self.sensitiveDataFilter = SensitiveDataFilter()
+        self._dropLock = threading.Lock()
+        self.dropped = 0
+        self.droppedByLevel = Counter()
+
+    # @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.args:
+            record.args = self.sensitiveDataFilter.mask_sensitive_args(record.args)
+        record.msg = record.getMessage()
+        record.args = None
+        if has_request_context():
+            if hasattr(g, "log_request_id"):
+                record.log_request_id = g.log_request_id
+            if hasattr(record, "extra_info"):
+                record.request_context = captureRequestContext()
+
+        return record
+
+    # @override
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropLock:
+                self.dropped += 1
+                self.droppedByLevel[record.levelname] += 1
+
+
+class BatchQueueListener(QueueListener):
+    """BatchQueueListener drains up to 'batchSize' records per wake-up of its thread and writes them to its handlers.
+
+    The records of a batch are formatted and written with a single write/flush per stream handler (the handlers with
+    their own emit logic, i.e. rotating files, handle the records one by one). The records dropped by the queue's
+    handler since the last batch are reported with a warning.
+    """
+
+    def __init__(self, queue_: queue.Queue, *handlers: logging.Handler, batchSize: int = LOG_BATCH_SIZE,
+                 queueHandler: AsyncQueueHandler = None):
+        super().__init__(queue_, *handlers, respect_handler_level=True)
+        self.batchSize = batchSize
+        self.queueHandler = queueHandler
+        self._reportedDrops = 0
+
+    # @override
+    def enqueue_sentinel(self) -> None:
+        # the queue might be full, the listener frees it
+        self.queue.put(self._sentinel)
+
+    # @override
+    def _monitor(self) -> None:
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batchSize and batch[-1] is not self._sentinel:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            size = len(batch)
+            stopped = batch[-1] is self._sentinel
+            if stopped:
+                batch.pop()
+
+            self.handleBatch(batch)
+            for _ in range(size):
+                self.queue.task_done()
+
+            if stopped:
+                break
+
+    def handleBatch(self, records: List[logging.LogRecord]) -> None:
+        """Writes the records to the handlers respecting their levels"""
+        if self.queueHandler is not None and self.queueHandler.dropped > self._reportedDrops:
+            dropped = self.queueHandler.dropped - self._reportedDrops
+            self._reportedDrops += dropped
+            records.append(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": logging.getLevelName(logging.WARNING),
+                "msg": f"Dropped {dropped} log records, the log queue is full!"}))
+
+        for handler in self.handlers:
+            handlerRecords = [record for record in records if record.levelno >= handler.level]
+            if type(handler) in (logging.StreamHandler, logging.FileHandler) and handler.stream is not None:
+                self._write(handler, handlerRecords)
+            else:
+                for record in handlerRecords:
+                    handler.handle(record)
+
+    @staticmethod
+    def _write(handler: logging.StreamHandler, records: Iterable[logging.LogRecord]) -> None:
+        """Writes the filtered and formatted records with a single write/flush"""
+        lines = []
+        for record in records:
+            try:
+                result = handler.filter(record)
+                if result:
+                    lines.append(handler.format(result if isinstance(result, logging.LogRecord) else record))
+            except Exception:
+                handler.handleError(record)
+
+        if lines:
+            handler.acquire()
+            try:
+                handler.stream.write(handler.terminator.join(lines) + handler.terminator)
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+            finally:
+                handler.release()
+
+
+class AsyncLogPipeline(object):
+    """AsyncLogPipeline moves the logging I/O off the request's threads: the loggers have its 'queueHandler', which
+    only enqueues the records, and its listener's thread formats, masks and writes them to the handlers in batches.
+
+    The listener is restarted in the forked (i.e. gunicorn's worker) processes.
+    """
+
+    def __init__(self, handlers: Iterable[logging.Handler], queueSize: int = LOG_QUEUE_SIZE,
+                 batchSize: int = LOG_BATCH_SIZE):
+        self.queueSize = queueSize
+        self.queueHandler = AsyncQueueHandler(queue.Queue(maxsize=queueSize))
+        self.listener = BatchQueueListener(self.queueHandler.queue, *handlers, batchSize=batchSize,
+                                           queueHandler=self.queueHandler)
+        self._started = False
+        _pipelines.add(self)
+
+    @property
+    def dropped(self) -> int:
+        """Returns the number of the records dropped on a full queue"""
+        return self.queueHandler.dropped
+
+    def start(self) -> None:
+        """Starts the listener's thread"""
+        if not self._started:
+            self.listener.start()
+            self._started = True
+
+    def stop(self) -> None:
+        """Writes the queued records and stops the listener's thread"""
+        if self._started:
+            self._started = False
+            self.listener.stop()
+
+    def _afterFork(self) -> None:
+        # the parent's thread and the queue's locks aren't usable in the child, its queued records are the parent's
+        self.queueHandler.queue = self.listener.queue = queue.Queue(maxsize=self.queueSize)
+        self.listener._thread = None
+        if self._started:
+            self._started = False
+            self.start()
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return f"{type(self).__name__} <queueSize={self.queueSize}, batchSize={self.listener.batchSize}, " \
+               f"dropped={self.dropped}>"
+
+
+# the pipelines of the process, stopped on exit and restarted in the forked processes
+_pipelines = weakref.WeakSet()
+
+
+def _stopPipelines() -> None:
+    for pipeline in list(_pipelines):
+        pipeline.stop()
+
+
+def _restartPipelines() -> None:
+    for pipeline in list(_pipelines):
+        pipeline._afterFork()
+
+
+atexit.register(_stopPipelines)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restartPipelines)
+
+
 class DefaultLogger(logging.LoggerAdapter):
     """Default logger for an application that handles displaying debugging data for critical errors, when 'extra' arg
     is passed and contains 'debug_data' in dict.
     """
 
-    def __init__(self, app: Flask, level: int = LOG_LEVEL, extra={}):
+    def __init__(self, app: Flask, level: int = LOG_LEVEL, extra={}, queueSize: int = LOG_QUEUE_SIZE,
+                 batchSize: int = LOG_BATCH_SIZE):
         self.app = app
         app.logger.setLevel(level)
         super().__init__(app.logger, extra)
@@ -139,24 +398,33 @@ class DefaultLogger(logging.LoggerAdapter):
         app.logger.removeHandler(default_handler)
 
         # update log handlers with customer json formatter
-        for handler in app.logger.handlers:
-            # all log formatter and request-id filter
+        handlers = list(app.logger.handlers)
+        for handler in handlers:
+            # all log formatter and masking filter
             handler.setFormatter(LogJSONFormatter(fmt=DETAILED_LOG_FORMAT))
-            handler.addFilter(RequestIDLogFilter())
-            handler.addFilter(SensitiveDataFilter())
+            handler.addFilter(SensitiveDataFilter(level=handler.level))
+
+        # the request's threads only enqueue the records, the pipeline's thread formats, masks and writes them
+        self.logPipeline = None
+        if handlers:
+            self.logPipeline = AsyncLogPipeline(handlers, queueSize=queueSize, batchSize=batchSize)
+            # the request id is captured on the request's thread
+            self.logPipeline.queueHandler.addFilter(RequestIDLogFilter())
+            app.logger.handlers = [self.logPipeline.queueHandler]
+            self.logPipeline.start()
 
     def logConfig(self):
         logger.debug("logConfig()")
         # logger = self.app.logger
         # register logger here root logger
-        if EnvType.is_production(EnvType.get_env_type()):
+        if getSettings().production:
             logFileName = self.app.get_env(KeyEnum.LOG_FILE_NAME.name)
             logFileHandler = logging.FileHandler(logFileName)
             logger.debug(f"logFileName={logFileName}, logFileHandler=[{logFileHandler}]")
             # set format and filters
             logFileHandler.setFormatter(LogJSONFormatter(fmt=DETAILED_LOG_FORMAT))
             logFileHandler.addFilter(RequestIDLogFilter())
-            logFileHandler.addFilter(SensitiveDataFilter())
+            logFileHandler.addFilter(SensitiveDataFilter(level=logFileHandler.level))
             # logging.getLogger().addHandler(logFileHandler)
             logging.basicConfig(filename=logFileName, encoding=UTF_8, level=LOG_LEVEL, format=DETAILED_LOG_FORMAT)
             requests.packages.urllib3.add_stderr_logger()
@@ -200,6 +468,36 @@ def mask_data(data: dict):
     return data
 
 
+def captureRequestContext() -> dict:
+    """Returns the request's details (i.e. endpoint, payload, headers, user and session) logged with the records having
+    the 'extra_info'.
+    """
+    context = {
+        'endpoint': request.full_path if request else None,
+    }
+    # Must use try/except otherwise tests fail
+    try:
+        # Attempt to capture request payload
+        context['request_payload'] = request.get_json() if request.is_json else request.get_data(as_text=True)
+    except Exception as ex:
+        logger.error(f"Log formatting error={ex}")
+        # Fallback if the request body can't be accessed
+        context['request_payload'] = None
+
+    # If a request context is active, capture user and session info
+    if has_request_context():
+        if request:
+            context['headers'] = {k: v for k, v in dict(request.headers).items() if not k.startswith("Cloudfront")}
+        # Add request-related data
+        context.update({
+            'user_id': g.user_security.get('user_id') if hasattr(g, 'user_security') else None,
+            'session_id': g.get('user_session_id'),
+            'platform': g.user_agent.get('platform') if hasattr(g, 'user_agent') else None
+        })
+
+    return context
+
+
 class LogJSONFormatter(logging.Formatter):
 
     def __init__(self, *args, **kwargs):
@@ -230,45 +528,26 @@ class LogJSONFormatter(logging.Formatter):
         message = record.getMessage()
 
         # skipping logger formatting for testing
-        if EnvType.is_testing(EnvType.get_env_type()):
+        if getSettings().testing:
             return message
 
         log_message = f'[{self.formatTime(record, DATE_FORMAT_MSEC)}] [{record.process}] [{record.levelname}]'
 
-        if has_request_context() and hasattr(g, 'log_request_id'):
+        # the request's context is captured by the 'AsyncQueueHandler' when formatted on the pipeline's thread
+        if hasattr(record, 'log_request_id'):
+            log_message += f' [{record.log_request_id}]'
+        elif has_request_context() and hasattr(g, 'log_request_id'):
             log_message += f' [{g.log_request_id}]'
 
         try:
             if hasattr(record, 'extra_info'):
-                log_record = {
-                    'message': message,
-                    'endpoint': request.full_path if request else None,
-                }
-                # Must use try/except otherwise tests fail
-                try:
-                    # Attempt to capture request payload
-                    log_record['request_payload'] = request.get_json() if request.is_json else request.get_data(
-                        as_text=True)
-                except Exception as ex:
-                    logger.error(f"Log formatting error={ex}")
-                    # Fallback if the request body can't be accessed
-                    log_record['request_payload'] = None
-
-                # If a request context is active, capture user and session info
-                if has_request_context():
-                    if request:
-                        log_record['headers'] = {k: v for k, v in dict(request.headers).items() if
-                                                 not k.startswith("Cloudfront")}
-                    # Add request-related data
-                    log_record.update({
-                        'user_id': g.user_security.get('user_id') if hasattr(g, 'user_security') else None,
-                        'session_id': g.get('user_session_id'),
-                        'platform': g.user_agent.get('platform') if hasattr(g, 'user_agent') else None
-                    })
+                log_record = {'message': message}
+                request_context = getattr(record, 'request_context', None)
+                log_record.update(request_context if request_context is not None else captureRequestContext())
 
                 if isinstance(record.extra_info, dict) and record.extra_info:
                     # only if the user_id is present in the log_record will personal information be masked
-                    if log_record['user_id']:
+                    if log_record.get('user_id'):
                         update_data = mask_data(deepcopy(record.extra_info))
                     else:
                         update_data = record.extra_info
@@ -0,0 +1,493 @@
+#
+# Author: Rohtash Lakra
+# Reference(s):
+#  - https://prometheus.io/docs/instrumenting/exposition_formats/
+#  - https://prometheus.github.io/client_python/multiprocess/
+#
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from flask import Flask, Response, g, request
+from sqlalchemy import Engine
+
+from framework.cache import TTLCache
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+# the content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# the latency buckets (in seconds) of the histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# the key of the request's start time in the 'g'
+START_TIME_KEY = "metricsStartTime"
+
+Labels = Tuple[str, ...]
+
+
+def formatValue(value: float) -> str:
+    """Returns the value in the exposition format"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value))
+
+
+def formatLabels(labelNames: Sequence[str], labels: Sequence[str]) -> str:
+    """Returns the '{name="value",...}' of the labels, the values are escaped"""
+    if not labelNames:
+        return ""
+
+    pairs = []
+    for name, value in zip(labelNames, labels):
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(object):
+    """Metric is a family of the samples of a name, keyed by the values of its labels"""
+
+    type: str = None
+
+    def __init__(self, name: str, help: str, labelNames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        self._values: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> List[list]:
+        """Returns the [labels, value] of the samples"""
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def reset(self) -> None:
+        """Removes all the samples"""
+        with self._lock:
+            self._values.clear()
+
+    def family(self) -> dict:
+        """Returns the (JSON-compatible) family of this metric and its samples"""
+        return {"type": self.type, "help": self.help, "labelNames": list(self.labelNames), "samples": self.collect()}
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return f"{type(self).__name__} <name={self.name}, labelNames={self.labelNames}>"
+
+
+class CounterMetric(Metric):
+    """CounterMetric is a monotonically increasing value, summed across the processes"""
+
+    type = "counter"
+
+    def inc(self, labels: Labels = (), value: float = 1.0) -> None:
+        """Increments the value of the labels"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+
+class HistogramMetric(Metric):
+    """HistogramMetric counts the observed values in the buckets, summed across the processes.
+
+    The value of the labels is the [counts per bucket (not cumulative, the last is '+Inf'), sum, count].
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelNames: Sequence[str] = (), buckets: Sequence[float] = None):
+        super().__init__(name, help, labelNames)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Observes the value of the labels"""
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+
+        with self._lock:
+            sample = self._values.get(labels)
+            if sample is None:
+                sample = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+            sample[0][index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    # @override
+    def collect(self) -> List[list]:
+        with self._lock:
+            return [[list(labels), [list(counts), total, count]] for labels, (counts, total, count) in
+                    self._values.items()]
+
+    # @override
+    def family(self) -> dict:
+        family = super().family()
+        family["buckets"] = list(self.buckets)
+        return family
+
+
+class GaugeMetric(Metric):
+    """GaugeMetric is a value of a process, i.e. set or computed by its 'function' (returning the values by their
+    labels) when collected. The gauges are per process (i.e. labeled with the 'pid') across the processes.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelNames: Sequence[str] = (),
+                 function: Callable[[], Dict[Labels, float]] = None):
+        super().__init__(name, help, labelNames)
+        self.function = function
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        """Sets the value of the labels"""
+        with self._lock:
+            self._values[labels] = value
+
+    # @override
+    def collect(self) -> List[list]:
+        if self.function is not None:
+            try:
+                return [[list(labels), value] for labels, value in self.function().items()]
+            except Exception as ex:
+                logger.error(f"Error collecting gauge={self.name}, error={ex}")
+                return []
+
+        return super().collect()
+
+
+def mergeFamilies(families: Dict[str, dict], processFamilies: Dict[str, dict], pid: str = None,
+                  gauges: bool = True) -> None:
+    """Adds the samples of the process's families to the (merged) families, keyed by their labels: the counters and
+    the histograms are summed and the gauges (if 'gauges') are labeled with the 'pid' (if any).
+    """
+    for name, family in processFamilies.items():
+        merged = families.get(name)
+        if merged is None:
+            merged = families[name] = dict(family, samples={})
+            if family["type"] == "gauge" and pid is not None:
+                merged["labelNames"] = family["labelNames"] + ["pid"]
+
+        samples = merged["samples"]
+        for labels, value in family["samples"]:
+            key = tuple(labels)
+            if family["type"] == "gauge":
+                if gauges:
+                    samples[key + (pid,) if pid is not None else key] = value
+            elif family["type"] == "histogram":
+                counts, total, count = samples.get(key, [[0] * len(value[0]), 0.0, 0])
+                samples[key] = [[a + b for a, b in zip(counts, value[0])], total + value[1], count + value[2]]
+            else:
+                samples[key] = samples.get(key, 0.0) + value
+
+
+def listSamples(families: Dict[str, dict]) -> Dict[str, dict]:
+    """Returns the (merged) families with their samples as the [labels, value] lists"""
+    for family in families.values():
+        family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+
+    return families
+
+
+class MetricsRegistry(object):
+    """MetricsRegistry holds the metrics of the process and renders them in the text exposition format.
+
+    With a 'directory' (i.e. shared by the gunicorn's workers), each process flushes its samples (at most every
+    'flushInterval' seconds, the last ones by a trailing flush and on exit) to its own file, and the rendering
+    aggregates the files of all the processes: the counters and the histograms are summed (the exited processes'
+    included) and the live processes' gauges are labeled with their 'pid'. A process reusing the pid of an exited one
+    continues its counters and histograms instead of overwriting them.
+    """
+
+    def __init__(self, directory: str = None, flushInterval: float = 1.0):
+        self.directory = directory
+        self.flushInterval = flushInterval
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._flushLock = threading.Lock()
+        self._lastFlush = 0.0
+        self._timer = None
+        # the counters and the histograms of an exited process with the same pid, loaded on the first use
+        self._seed = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _registries.add(self)
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = existing = metric
+            elif type(existing) is not type(metric):
+                raise ValueError(f"The metric '{metric.name}' is already registered as {existing.type}!")
+
+            return existing
+
+    def counter(self, name: str, help: str, labelNames: Sequence[str] = ()) -> CounterMetric:
+        """Returns the registered counter of the name, registers it if missing"""
+        return self._register(CounterMetric(name, help, labelNames))
+
+    def histogram(self, name: str, help: str, labelNames: Sequence[str] = (),
+                  buckets: Sequence[float] = None) -> HistogramMetric:
+        """Returns the registered histogram of the name, registers it if missing"""
+        return self._register(HistogramMetric(name, help, labelNames, buckets))
+
+    def gauge(self, name: str, help: str, labelNames: Sequence[str] = (),
+              function: Callable[[], Dict[Labels, float]] = None) -> GaugeMetric:
+        """Returns the registered gauge of the name, registers it if missing (the function replaces the existing)"""
+        gauge = self._register(GaugeMetric(name, help, labelNames, function))
+        if function is not None:
+            gauge.function = function
+
+        return gauge
+
+    def collect(self) -> Dict[str, dict]:
+        """Returns the families of the metrics of this process"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return {metric.name: metric.family() for metric in metrics}
+
+    def filePath(self, pid: int) -> str:
+        """Returns the path of the samples' file of the process"""
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def _loadSeed(self) -> Dict[str, dict]:
+        # the file of this pid, before this process writes it, is an exited process's one
+        if self._seed is None:
+            self._seed = {}
+            try:
+                with open(self.filePath(os.getpid())) as file:
+                    self._seed = {name: family for name, family in json.load(file).items()
+                                  if family["type"] != "gauge"}
+            except FileNotFoundError:
+                pass
+            except (ValueError, OSError) as ex:
+                logger.error(f"Error loading metrics={self.filePath(os.getpid())}, error={ex}")
+
+        return self._seed
+
+    def processFamilies(self) -> Dict[str, dict]:
+        """Returns the families of the metrics of this process, continuing the exited process's with the same pid"""
+        families = {}
+        mergeFamilies(families, self.collect())
+        if self.directory:
+            mergeFamilies(families, self._loadSeed())
+
+        return listSamples(families)
+
+    def flush(self, force: bool = False) -> None:
+        """Writes the samples of this process to its file (atomically), at most every 'flushInterval' seconds. The
+        throttled samples are written by a (single) trailing flush, so an idle process's last samples aren't held back.
+        """
+        if not self.directory:
+            return
+
+        with self._flushLock:
+            elapsed = time.monotonic() - self._lastFlush
+            if not force and elapsed < self.flushInterval:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flushInterval - elapsed, self._trailingFlush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+
+            self._lastFlush = time.monotonic()
+
+        filePath = self.filePath(os.getpid())
+        tempPath = f"{filePath}.{threading.get_ident()}.tmp"
+        try:
+            families = self.processFamilies()
+            with open(tempPath, "w") as file:
+                json.dump(families, file)
+            os.replace(tempPath, filePath)
+        except OSError as ex:
+            logger.error(f"Error flushing metrics={filePath}, error={ex}")
+
+    def close(self) -> None:
+        """Cancels the trailing flush and stops flushing on exit, i.e. when the directory is removed"""
+        with self._flushLock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        _registries.discard(self)
+
+    def _trailingFlush(self) -> None:
+        with self._flushLock:
+            self._timer = None
+
+        self.flush(force=True)
+
+    def aggregate(self) -> Dict[str, dict]:
+        """Returns the families of the metrics aggregated across the processes (of the directory)"""
+        if not self.directory:
+            return self.collect()
+
+        pid = os.getpid()
+        processes = {pid: self.processFamilies()}
+        for filePath in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                filePid = int(os.path.basename(filePath)[len("metrics-"):-len(".json")])
+                if filePid != pid:
+                    with open(filePath) as file:
+                        processes[filePid] = json.load(file)
+            except (ValueError, OSError) as ex:
+                logger.debug(lambda: f"Skipping metrics={filePath}, error={ex}")
+
+        families: Dict[str, dict] = {}
+        for processId, processFamilies in processes.items():
+            alive = processId == pid or isAlive(processId)
+            mergeFamilies(families, processFamilies, pid=str(processId), gauges=alive)
+
+        return listSamples(families)
+
+    def render(self) -> str:
+        """Returns the (aggregated) metrics in the text exposition format"""
+        lines = []
+        for name, family in self.aggregate().items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelNames = family["labelNames"]
+            for labels, value in family["samples"]:
+                if family["type"] == "histogram":
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucketCount in zip(list(family["buckets"]) + [math.inf], counts):
+                        cumulative += bucketCount
+                        bucketLabels = formatLabels(labelNames + ["le"], labels + [formatValue(bound)])
+                        lines.append(f"{name}_bucket{bucketLabels} {formatValue(cumulative)}")
+                    lines.append(f"{name}_sum{formatLabels(labelNames, labels)} {formatValue(total)}")
+                    lines.append(f"{name}_count{formatLabels(labelNames, labels)} {formatValue(count)}")
+                else:
+                    lines.append(f"{name}{formatLabels(labelNames, labels)} {formatValue(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _afterFork(self) -> None:
+        # the forked process starts with its own (empty) samples, the parent's are in the parent's file
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        for metric in metrics:
+            metric.reset()
+        self._flushLock = threading.Lock()
+        self._lastFlush = 0.0
+        self._timer = None
+        self._seed = None
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return f"{type(self).__name__} <directory={self.directory}, metrics={len(self._metrics)}>"
+
+
+# the registries of the process, flushed on exit and reset in the forked processes
+_registries = weakref.WeakSet()
+
+
+def flushRegistries() -> None:
+    """Flushes the samples of all the registries, i.e. when the (gunicorn's worker) process exits"""
+    for registry in list(_registries):
+        registry.flush(force=True)
+
+
+def _resetRegistries() -> None:
+    for registry in list(_registries):
+        registry._afterFork()
+
+
+atexit.register(flushRegistries)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_resetRegistries)
+
+
+def isAlive(pid: int) -> bool:
+    """Returns True if the process is running otherwise False"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class RequestMetrics(object):
+    """RequestMetrics counts the requests and observes their latencies per blueprint/endpoint, the responses with the
+    5xx status are counted as the errors.
+    """
+
+    def __init__(self, app: Flask = None, registry: MetricsRegistry = None):
+        self.registry = registry
+        self.requests = None
+        self.latencies = None
+        self.errors = None
+        if app is not None:
+            self.init_app(app, registry)
+
+    def init_app(self, app: Flask, registry: MetricsRegistry) -> None:
+        """Registers the metrics and the request's hooks"""
+        self.registry = registry
+        labelNames = ("blueprint", "endpoint", "method")
+        self.requests = registry.counter("http_requests_total", "The number of the HTTP requests.",
+                                         labelNames + ("status",))
+        self.latencies = registry.histogram("http_request_duration_seconds", "The latency of the HTTP requests.",
+                                            labelNames)
+        self.errors = registry.counter("http_request_errors_total", "The number of the HTTP requests failed (5xx).",
+                                       labelNames)
+        app.before_request(self.beforeRequest)
+        app.after_request(self.afterRequest)
+
+    @staticmethod
+    def beforeRequest() -> None:
+        setattr(g, START_TIME_KEY, time.perf_counter())
+
+    def afterRequest(self, response: Response) -> Response:
+        startTime = g.pop(START_TIME_KEY, None)
+        if startTime is not None:
+            # the unmatched (i.e. 404) requests share a label, the paths aren't labels
+            labels = (request.blueprint or "", request.endpoint or "unmatched", request.method)
+            self.requests.inc(labels + (str(response.status_code),))
+            self.latencies.observe(time.perf_counter() - startTime, labels)
+            if response.status_code >= 500:
+                self.errors.inc(labels)
+            self.registry.flush()
+
+        return response
+
+
+def registerPoolMetrics(registry: MetricsRegistry, engine: Engine) -> None:
+    """Registers the gauges of the engine's connection pool (if supported by the pool)"""
+    pool = engine.pool
+    for name, attribute, help in (("db_pool_size", "size", "The size of the DB connection pool."),
+                                  ("db_pool_checked_out", "checkedout", "The DB connections checked out."),
+                                  ("db_pool_overflow", "overflow", "The DB connections over the pool's size.")):
+        if hasattr(pool, attribute):
+            registry.gauge(name, help, function=lambda attribute=attribute: {(): getattr(engine.pool, attribute)()})
+
+
+def registerCacheMetrics(registry: MetricsRegistry, caches: Dict[str, TTLCache]) -> None:
+    """Registers the gauges of the caches' hit ratios and sizes"""
+    registry.gauge("cache_hit_ratio", "The ratio of the hits of the cache's lookups.", ("cache",),
+                   function=lambda: {(name,): cache.hitRatio() for name, cache in caches.items()})
+    registry.gauge("cache_entries", "The number of the cached entries.", ("cache",),
+                   function=lambda: {(name,): len(cache) for name, cache in caches.items()})
+
+
+def registerWorkerMetrics(registry: MetricsRegistry, version: str) -> None:
+    """Registers the gauges of the worker (i.e. process) info"""
+    startTime = time.time()
+    registry.gauge("iws_worker_info", "The info of the worker.", ("version",), function=lambda: {(version,): 1})
+    registry.gauge("process_start_time_seconds", "The start time of the worker since the epoch.",
+                   function=lambda: {(): startTime})
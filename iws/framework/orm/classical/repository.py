@@ -1,16 +1,15 @@
 #
 # Author: Rohtash Lakra
 #
-
-import logging
 from typing import Mapping, Iterable, Dict, Any, List, Optional
 
 from werkzeug.datastructures import MultiDict
 
+from framework.logger import getLogger
 from framework.orm.repository import AbstractRepository
 from globals import connector
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class ClassicalRepository(AbstractRepository):
@@ -24,7 +23,7 @@ class ClassicalRepository(AbstractRepository):
 
     def execute(self, statement, params={}, many: bool = False):
         """Executes the query"""
-        logger.info(f"execute({statement}, {params}, {many}), connector => {connector}")
+        logger.info(lambda: f"execute({statement}, {params}, {many}), connector => {connector}")
         # print(f"execute({params}, {many}), connector => {connector}")
         connection = connector.get_connection()
         if many:
@@ -33,7 +32,7 @@ class ClassicalRepository(AbstractRepository):
             return connection.execute(statement, params)
 
     def build_filters(self, filters, connector='AND', operators={}, return_tuple=False):
-        logger.debug(f"+build_filters({filters}, {connector}, {operators}, {return_tuple})")
+        logger.debug(lambda: f"+build_filters({filters}, {connector}, {operators}, {return_tuple})")
         filter_clause = ""
         query_params = {}
         if filters:
@@ -86,14 +85,14 @@ class ClassicalRepository(AbstractRepository):
 
         # return response
         if return_tuple:
-            logger.debug(f"-build_filters(), filter_clause={filter_clause}, query_params={query_params}")
+            logger.debug(lambda: f"-build_filters(), filter_clause={filter_clause}, query_params={query_params}")
             return filter_clause, query_params
         else:
-            logger.debug(f"-build_filters(), filter_clause={filter_clause}")
+            logger.debug(lambda: f"-build_filters(), filter_clause={filter_clause}")
             filter_clause
 
     def where_clause(self, filters, connector='AND', operators={}):
-        logger.debug(f"where_clause({filters}, {connector}, {operators})")
+        logger.debug(lambda: f"where_clause({filters}, {connector}, {operators})")
         filter_clause, query_params = self.build_filters(filters, connector, operators, return_tuple=True)
         return 'WHERE ' + filter_clause, query_params if filters else filter_clause
 
@@ -101,7 +100,7 @@ class ClassicalRepository(AbstractRepository):
         return "{}=%({})s".format(field, field)
 
     def build_update_set_fields(self, update_json):
-        logger.debug(f"+build_update_set_fields({update_json})")
+        logger.debug(lambda: f"+build_update_set_fields({update_json})")
         update_keys = list(update_json.keys())
         update_fields = "{} {}".format(
             ", ".join([self.__format_field(update_key) for update_key in update_keys[0:-1]]),
@@ -110,7 +109,7 @@ class ClassicalRepository(AbstractRepository):
         # update_fields = ''.join([update_key + '=%(' + update_key + ')s, ' for update_key in update_keys[0:-1]]) + update_keys[-1] + '=%(' + update_keys[-1] + ')s'
 
         update_set_fields = "SET {}".format(update_fields)
-        logger.debug(f"-build_update_set_fields(), update_set_fields={update_set_fields}")
+        logger.debug(lambda: f"-build_update_set_fields(), update_set_fields={update_set_fields}")
         return update_set_fields
 
     def save(self, instance):
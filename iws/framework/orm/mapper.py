@@ -1,13 +1,18 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
+import functools
+import operator
 from abc import abstractmethod
+from typing import Dict, Iterable, List, Optional, Type
 
+from sqlalchemy import inspect
+
+from framework.logger import getLogger
 from framework.orm.pydantic.model import BaseModel
 from framework.orm.sqlalchemy.schema import BaseSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class Mapper:
@@ -15,36 +20,36 @@ class Mapper:
     @classmethod
     def isPydantic(cls, instance: object) -> bool:
         """ Checks whether an object is pydantic. """
-        logger.debug(f"isPydantic({instance}), type={type(instance)}, name={type(instance).__class__.__name__}")
+        logger.debug(lambda: f"isPydantic({instance}), type={type(instance)}, name={type(instance).__class__.__name__}")
         return type(instance).__class__.__name__ == "ModelMetaclass"
 
     @classmethod
     @abstractmethod
     def fromSchema(cls, schemaObject: BaseSchema) -> BaseModel:
-        logger.debug(f"fromSchema({schemaObject})")
+        logger.debug(lambda: f"fromSchema({schemaObject})")
         pass
 
     @classmethod
     @abstractmethod
     def fromModel(cls, modelObject: BaseModel) -> BaseSchema:
-        logger.debug(f"fromModel({modelObject})")
+        logger.debug(lambda: f"fromModel({modelObject})")
         pass
 
     @classmethod
     @abstractmethod
     def fromSchemas(cls, schemaObjects: list[BaseSchema]) -> list[BaseModel]:
-        logger.debug(f"fromSchemas({schemaObjects})")
+        logger.debug(lambda: f"fromSchemas({schemaObjects})")
         pass
 
     @classmethod
     @abstractmethod
     def fromModels(cls, modelObjects: list[BaseModel]) -> list[BaseSchema]:
-        logger.debug(f"fromModels({modelObjects})")
+        logger.debug(lambda: f"fromModels({modelObjects})")
         pass
 
     @classmethod
     def fromPydanticModel(cls, modelInstance: BaseModel) -> BaseSchema:
-        logger.debug(f"+fromPydanticModel({modelInstance})")
+        logger.debug(lambda: f"+fromPydanticModel({modelInstance})")
         classObject = cls()
         properties = dict(modelInstance)
         for key, value in properties.items():
@@ -55,12 +60,12 @@ class Mapper:
             except AttributeError as e:
                 raise AttributeError(e)
 
-        logger.debug(f"-fromPydanticModel(), classObject={classObject}")
+        logger.debug(lambda: f"-fromPydanticModel(), classObject={classObject}")
         return classObject
 
     @classmethod
     def parsePydanticModel(cls, modelInstance: BaseModel) -> BaseSchema:
-        logger.debug(f"+parsePydanticModel({modelInstance})")
+        logger.debug(lambda: f"+parsePydanticModel({modelInstance})")
         if Mapper.isPydantic(modelInstance):
             try:
                 schemaInstance = cls.parsePydanticModel(dict(modelInstance))
@@ -78,17 +83,95 @@ class Mapper:
             for key, model in modelInstance.items():
                 schemaInstance[key] = cls.parsePydanticModel(model)
 
-        logger.debug(f"-parsePydanticModel(), schemaInstance={schemaInstance}")
+        logger.debug(lambda: f"-parsePydanticModel(), schemaInstance={schemaInstance}")
         return schemaInstance
 
     @classmethod
     # @abstractmethod
     def fromSQLAlchemySchema(cls, baseSchema: BaseSchema) -> BaseModel:
-        logger.debug(f"fromSQLAlchemySchema({baseSchema})")
+        logger.debug(lambda: f"fromSQLAlchemySchema({baseSchema})")
         return None
 
     @classmethod
     # @abstractmethod
     def parseSQLAlchemySchema(cls, baseSchema: BaseSchema) -> BaseModel:
-        logger.debug(f"parseSQLAlchemySchema({baseSchema})")
+        logger.debug(lambda: f"parseSQLAlchemySchema({baseSchema})")
         return None
+
+
+class SchemaMapper(object):
+    """SchemaMapper maps the (trusted) database rows i.e. the schema objects of a class to their models.
+
+    The schema's columns that are the model's fields and the defaults of the model's other fields are resolved once
+    (on the first use), and the models are built with 'model_construct' of all the fields, i.e. the rows are neither
+    introspected with 'inspect()' nor re-validated by the models' (logging) validators per row. The relationships
+    (i.e. 'addresses') are mapped in bulk with their own mappers, if loaded and not empty.
+    """
+
+    def __init__(self, schemaClass: Type[BaseSchema], modelClass: Type[BaseModel],
+                 relationships: Optional[Dict[str, "SchemaMapper"]] = None):
+        self.schemaClass = schemaClass
+        self.modelClass = modelClass
+        self.relationships = relationships or {}
+        self._keys = None
+        self._getter = None
+        self._defaults = None
+        self._factories = None
+
+    def _compile(self) -> None:
+        """Resolves the keys of the schema's columns which are the model's fields, their accessor and the defaults of
+        the model's other fields"""
+        fields = self.modelClass.model_fields
+        keys = tuple(attribute.key for attribute in inspect(self.schemaClass).column_attrs if attribute.key in fields)
+        getter = operator.attrgetter(*keys)
+        self._defaults = {}
+        self._factories = {}
+        for name, field in fields.items():
+            if name in keys:
+                continue
+            elif field.default_factory is not None:
+                # called directly, the pydantic inspects the factory's signature per call
+                self._factories[name] = field.default_factory
+            elif isinstance(field.default, (type(None), bool, int, float, str, tuple, frozenset)):
+                self._defaults[name] = field.default
+            else:
+                # a mutable default, copied per model
+                self._factories[name] = functools.partial(field.get_default, call_default_factory=True)
+
+        # a single key's attrgetter returns the value, not a tuple
+        self._getter = getter if len(keys) > 1 else lambda schemaObject: (getter(schemaObject),)
+        self._keys = keys
+        logger.debug(lambda: f"Compiled {self}")
+
+    def fromSchema(self, schemaObject: BaseSchema) -> Optional[BaseModel]:
+        """Returns the model of the schema object"""
+        if schemaObject is None:
+            return None
+
+        if self._getter is None:
+            self._compile()
+
+        values = dict(self._defaults)
+        values.update(zip(self._keys, self._getter(schemaObject)))
+        for name, factory in self._factories.items():
+            values[name] = factory()
+
+        for name, mapper in self.relationships.items():
+            children = getattr(schemaObject, name)
+            if children:
+                values[name] = mapper.fromSchemas(children)
+
+        return self.modelClass.model_construct(set(self._keys), **values)
+
+    def fromSchemas(self, schemaObjects: Iterable[BaseSchema]) -> List[BaseModel]:
+        """Returns the models of the schema objects"""
+        return [self.fromSchema(schemaObject) for schemaObject in schemaObjects or []]
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{self.__class__.__name__} <{self.schemaClass.__name__} -> {self.modelClass.__name__}, "
+                f"keys={self._keys}, relationships={list(self.relationships.keys())}>")
+
+    def __repr__(self) -> str:
+        """Returns the string representation of this object"""
+        return str(self)
@@ -0,0 +1,133 @@
+#
+# Author: Rohtash Lakra
+#
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from werkzeug.datastructures import MultiDict
+
+from framework.exception import ValidationException
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+# the key of the last record of a page i.e. (created_at, id)
+PageKey = Tuple[datetime, int]
+
+
+class PageRequest(object):
+    """PageRequest represents the keyset (cursor) pagination parameters of a list request.
+
+    The records are ordered by their '(created_at, id)' key and a page starts right after the key of the previous
+    page's last record, so every page is an index range scan of 'limit' rows (no OFFSET) whatever its depth.
+    The key is passed to the clients as an opaque cursor.
+    """
+
+    # the request parameters
+    LIMIT = "limit"
+    CURSOR = "cursor"
+    TOTAL = "total"
+    KEYS = (LIMIT, CURSOR, TOTAL)
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, after: Optional[PageKey] = None, withTotal: bool = False):
+        self.limit = limit
+        self.after = after
+        self.withTotal = withTotal
+
+    @classmethod
+    def fromFilters(cls, filters: Dict[str, Any]) -> Tuple["PageRequest", Dict[str, Any]]:
+        """Returns the page request and the rest of the filters (i.e. without the pagination parameters), the
+        multiple values of a 'MultiDict' (i.e. the request's args) key are kept."""
+        logger.debug(lambda: f"+fromFilters({filters})")
+        filters = filters.copy() if isinstance(filters, MultiDict) else dict(filters or {})
+        limit = filters.pop(cls.LIMIT, None)
+        cursor = filters.pop(cls.CURSOR, None)
+        withTotal = str(filters.pop(cls.TOTAL, "false")).lower() in ("true", "1", "yes")
+        try:
+            limit = int(limit) if limit else cls.DEFAULT_LIMIT
+        except ValueError:
+            limit = 0
+
+        if not 0 < limit <= cls.MAX_LIMIT:
+            raise ValidationException(messages=[f"The 'limit' must be between 1 and {cls.MAX_LIMIT}!"])
+
+        pageRequest = cls(limit=limit, after=cls.decodeCursor(cursor) if cursor else None, withTotal=withTotal)
+        logger.debug(lambda: f"-fromFilters(), pageRequest={pageRequest}, filters={filters}")
+        return pageRequest, filters
+
+    @staticmethod
+    def encodeCursor(key: PageKey) -> str:
+        """Returns the opaque cursor of the key"""
+        createdAt, id = key
+        return base64.urlsafe_b64encode(json.dumps([createdAt.isoformat(), id]).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decodeCursor(cursor: str) -> PageKey:
+        """Returns the key of the cursor"""
+        try:
+            createdAt, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return datetime.fromisoformat(createdAt), int(id)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as ex:
+            logger.error(f"Invalid cursor={cursor}! Error={ex}")
+            raise ValidationException(messages=["The 'cursor' is invalid!"])
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{self.__class__.__name__} <limit={self.limit}, after={self.after}, "
+                f"withTotal={self.withTotal}>")
+
+    def __repr__(self) -> str:
+        """Returns the string representation of this object"""
+        return str(self)
+
+
+class Page(object):
+    """Page represents a page of the records and the cursor of the next page, if any"""
+
+    def __init__(self, items: List[Any], limit: int, nextCursor: Optional[str] = None, total: Optional[int] = None):
+        self.items = items
+        self.limit = limit
+        self.nextCursor = nextCursor
+        self.total = total
+
+    @classmethod
+    def of(cls, items: List[Any], pageRequest: PageRequest, total: Optional[int] = None) -> "Page":
+        """Builds the page of the records loaded with one extra record (i.e. 'limit + 1') to know if there's a next
+        page without counting the records."""
+        nextCursor = None
+        if len(items) > pageRequest.limit:
+            items = items[:pageRequest.limit]
+            nextCursor = PageRequest.encodeCursor((items[-1].created_at, items[-1].id))
+
+        return cls(items, pageRequest.limit, nextCursor, total)
+
+    def hasNext(self) -> bool:
+        """Returns True if there's a next page otherwise False"""
+        return self.nextCursor is not None
+
+    def toMetadata(self) -> Dict[str, Any]:
+        """Returns the pagination metadata of the response"""
+        metadata = {"limit": self.limit, "size": len(self.items), "has_next": self.hasNext(),
+                    "next_cursor": self.nextCursor}
+        if self.total is not None:
+            metadata["total"] = self.total
+
+        return metadata
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{self.__class__.__name__} <limit={self.limit}, size={len(self)}, nextCursor={self.nextCursor}, "
+                f"total={self.total}>")
+
+    def __repr__(self) -> str:
+        """Returns the string representation of this object"""
+        return str(self)
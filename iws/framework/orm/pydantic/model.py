@@ -5,8 +5,6 @@
 #
 from __future__ import annotations
 
-import json
-import logging
 from datetime import datetime
 from enum import unique, auto
 from typing import Optional, Dict, List, Any, Union
@@ -27,12 +25,18 @@ from framework.exception import (
     ValidationException,
     DuplicateRecordException,
     RecordNotFoundException,
-    AuthenticationException
+    AuthenticationException,
+    AuthorizationException
 )
 from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import Page
 from framework.utils import Utils
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
+
+# field names cache of the models, keyed by (class, by_alias)
+_fieldNamesCache: Dict[tuple, tuple] = {}
 
 
 @unique
@@ -75,18 +79,22 @@ class AbstractModel(PydanticBaseModel):
     
     def getAllFields(self, alias=False) -> list:
         # return list(self.schema(by_alias=alias).get("properties").keys())
-        return list(self.model_json_schema(by_alias=alias).get("properties").keys())
+        # return list(self.model_json_schema(by_alias=alias).get("properties").keys())
+        return type(self).getClassFields(by_alias=alias)
     
     @classmethod
     def getClassFields(cls, by_alias=False) -> list[str]:
-        field_names = []
-        for key, value in cls.model_fields.items():
-            if by_alias and value.alias:
-                field_names.append(value.alias)
-            else:
-                field_names.append(key)
+        """Returns the field names of this class (in the declaration order). The names are computed once per class and
+        cached, so that the per-response cost doesn't include building the model's JSON schema.
+        """
+        key = (cls, by_alias)
+        fieldNames = _fieldNamesCache.get(key)
+        if fieldNames is None:
+            fieldNames = tuple(value.alias if by_alias and value.alias else name
+                               for name, value in cls.model_fields.items())
+            _fieldNamesCache[key] = fieldNames
         
-        return field_names
+        return list(fieldNames)
     
     @model_validator(mode="before")
     @classmethod
@@ -98,7 +106,7 @@ class AbstractModel(PydanticBaseModel):
             @model_validator(mode="before")
             @classmethod
         """
-        logger.debug(f"+preValidator(), values={values}")
+        logger.debug(lambda: f"+preValidator(), values={values}")
         # <class 'pydantic._internal._model_construction.ModelMetaclass'>
         # if isinstance(values, dict):
         #     if 'created_at' in values:
@@ -106,7 +114,7 @@ class AbstractModel(PydanticBaseModel):
         #     if 'updated_at' in values:
         #         raise ValueError("'updated_at' should not be included!")
         
-        logger.debug(f"-preValidator(), values={values}")
+        logger.debug(lambda: f"-preValidator(), values={values}")
         return values
     
     @model_validator(mode="after")
@@ -114,7 +122,7 @@ class AbstractModel(PydanticBaseModel):
         """After validators: run after the whole model has been validated. As such, they are defined as instance methods
         and can be seen as post-initialization hooks. Important note: the validated instance should be returned.
         """
-        logger.debug(f"postValidator() => type={type(self)}, values={values}")
+        logger.debug(lambda: f"postValidator() => type={type(self)}, values={values}")
         return self
     
     # @model_validator(mode="wrap")
@@ -128,13 +136,14 @@ class AbstractModel(PydanticBaseModel):
     
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
     
     def toJSONObject(self) -> Any:
         # return {column.key: getattr(self, column.key) for column in inspect(self).mapper.column_attrs}
         logger.debug(
-            f"{self.getClassName()} => type={type(self)}, object={str(self)}, json={self.model_dump(mode='json')}")
+            lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}, "
+                    f"json={self.model_dump(mode='json')}")
         return self.model_dump(mode="json")
     
     def _auditable(self) -> str:
@@ -218,7 +227,7 @@ class BaseModel(AbstractModel):
             @model_validator(mode="before")
             @classmethod
         """
-        logger.debug(f"+preValidator(), type={type(values)} values={values}")
+        logger.debug(lambda: f"+preValidator(), type={type(values)} values={values}")
         # <class 'pydantic._internal._model_construction.ModelMetaclass'>
         if not isinstance(values, dict):
             raise ValueError("Invalid 'Model' type!")
@@ -232,7 +241,7 @@ class BaseModel(AbstractModel):
         #     if 'updated_at' in values:
         #         raise ValueError("'updated_at' should not be included!")
         
-        logger.debug(f"-preValidator(), values={values}")
+        logger.debug(lambda: f"-preValidator(), values={values}")
         return values
     
     @model_validator(mode="after")
@@ -240,7 +249,7 @@ class BaseModel(AbstractModel):
         """After validators: run after the whole model has been validated. As such, they are defined as instance methods
         and can be seen as post-initialization hooks. Important note: the validated instance should be returned.
         """
-        logger.debug(f"postValidator() => type={type(self)}, values={values}")
+        logger.debug(lambda: f"postValidator() => type={type(self)}, values={values}")
         return self
     
     def get_id(self):
@@ -278,20 +287,20 @@ class NamedModel(BaseModel):
     @model_validator(mode="before")
     @classmethod
     def preValidator(cls, values: Any) -> Any:
-        logger.debug(f"+preValidator(), values={values}")
+        logger.debug(lambda: f"+preValidator(), values={values}")
         # logging.error(f"Model [{cls}] failed to validate values={values}!")
         superPreValidated = super().preValidator(values)
         if isinstance(values, dict):
             if "name" not in values:
                 raise ValueError("The model 'name' should be provided!")
         
-        logger.debug(f"-preValidator(), values={values}")
+        logger.debug(lambda: f"-preValidator(), values={values}")
         return values
     
     @field_validator('name')
     @classmethod
     def nameValidator(cls, value: str):
-        logger.info(f"nameValidator({value})")
+        logger.info(lambda: f"nameValidator({value})")
         if value is None or len(value.strip()) == 0:
             raise ValueError("The model 'name' should not be null or empty!")
         
@@ -317,7 +326,7 @@ class ErrorModel(AbstractModel):
     
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json(exclude=["created_at", "updated_at"])
     
     @staticmethod
@@ -331,7 +340,7 @@ class ErrorModel(AbstractModel):
             exception: exception for the error message
             is_critical: is error a critical error
         """
-        logger.debug(f"buildError({httpStatus}, {message}, {exception}, {is_critical})")
+        logger.debug(lambda: f"buildError({httpStatus}, {message}, {exception}, {is_critical})")
         
         # set message, if missing
         if message is None:
@@ -371,55 +380,57 @@ class ResponseModel(AbstractModel):
     message: Optional[str] = None
     data: Optional[List[BaseModel]] = None
     errors: Optional[List[ErrorModel]] = None
+    # i.e. the pagination details of the data, see 'addPage()'
+    metadata: Optional[Dict[str, Any]] = None
     
     def to_json(self) -> str:
-        """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
-        jsonObjects = {field: getattr(self, field) for field in self.getAllFields()}
-        jsonObjects.pop("created_at")
-        jsonObjects.pop("updated_at")
-        # logger.debug(f"jsonObjects type={type(jsonObjects)}, jsonObjects={jsonObjects}")
-        # parse list of data to json
-        if jsonObjects['data']:
-            jsonData = []
-            for item in jsonObjects['data']:
-                # logger.debug(f"entry type={type(item)}, item={item}, json={item.to_json()}")
-                jsonData.append(json.loads(item.to_json()))
-            
-            jsonObjects['data'] = jsonData
-        
-        # parse list of errors to json
-        if jsonObjects['errors']:
-            jsonErrors = []
-            for item in jsonObjects['errors']:
-                # logger.debug(f"entry type={type(item)}, item={item}, json={item.to_json()}")
-                jsonErrors.append(json.loads(item.to_json()))
-            
-            jsonObjects['errors'] = jsonErrors
-        
-        return jsonObjects
+        """Returns the JSON representation of this object.
+
+        The envelope is serialized in a single pass, each item is dumped once straight into a python object (no JSON
+        string => dict => JSON string round trips), so the cost grows linearly with the number of items. The native
+        values (i.e. datetime, Decimal, UUID) are left to the JSON provider ('framework.json.JSONProvider'), which
+        encodes them natively with the orjson.
+        """
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, status={self.status}, "
+                             f"data={self.dataSize()}, errors={self.errorSize()}")
+        return self.toJSONObject()
     
     def toJSONObject(self) -> Any:
         # return {column.key: getattr(self, column.key) for column in inspect(self).mapper.column_attrs}
-        # return self.model_dump(mode="json", serialize_as_any=True)
-        # return self.model_dump(mode="json")
-        jsonObject = self.model_dump(mode="json")
-        for entry in self.data:
-            logger.debug(f"entry type={type(entry)}, object={entry}")
+        jsonObject = {field: getattr(self, field) for field in self.getAllFields()}
+        jsonObject.pop("created_at")
+        jsonObject.pop("updated_at")
+        # only the paginated responses have the metadata
+        if self.metadata is None:
+            jsonObject.pop("metadata")
+        # items are dumped with their own (sub)class serializers, 'List[BaseModel]' would only keep the base fields.
+        if self.data:
+            jsonObject["data"] = [item.model_dump() for item in self.data]
         
-        jsonObject["data"] = self.data.model_dump(mode="json")
-        jsonObject["errors"] = self.errors.model_dump(mode="json")
+        if self.errors:
+            jsonObject["errors"] = [item.model_dump(exclude={"created_at", "updated_at"})
+                                    for item in self.errors]
         
         return jsonObject
     
+    def dataSize(self) -> int:
+        """Returns the number of data items in this response"""
+        return len(self.data) if self.data else 0
+    
+    def errorSize(self) -> int:
+        """Returns the number of errors in this response"""
+        return len(self.errors) if self.errors else 0
+    
     def __str__(self) -> str:
         """Returns the string representation of this object"""
         return f"{self.getClassName()} <status={self.status}, data={self.data}, errors={self.errors}>"
     
     def addInstance(self, instance: AbstractModel = None):
-        """Adds an object into the list of data or errors"""
-        logger.debug(
-            f"+addInstance({instance}) => type={type(instance)}, object={str(instance)}, json={instance.to_json()}")
+        """Adds an object into the list of data or errors.
+
+        Appending is O(1), the instance is neither validated nor serialized here (it's done once in 'to_json()').
+        """
+        logger.debug(lambda: f"+addInstance() => type={type(instance)}")
         if isinstance(instance, ErrorModel):
             if self.errors is None and instance:
                 self.errors = []
@@ -432,16 +443,23 @@ class ResponseModel(AbstractModel):
             
             self.data.append(instance)
         else:
-            logger.debug(f"Invalid instance:{instance}!")
+            logger.debug(lambda: f"Invalid instance:{instance}!")
         
-        logger.debug(f"-addInstance(), data={self.data}, errors={self.errors}, json={self.to_json()}")
+        logger.debug(lambda: f"-addInstance(), data={self.dataSize()}, errors={self.errorSize()}")
     
     def addInstances(self, instances: List[AbstractModel] = None):
-        logger.debug(f"+addInstances(), instances={instances}")
-        for instance in instances:
+        logger.debug(lambda: f"+addInstances(), instances={len(instances) if instances else 0}")
+        for instance in instances or []:
             self.addInstance(instance)
         
-        logger.debug(f"-addInstances()")
+        logger.debug(lambda: f"-addInstances(), data={self.dataSize()}, errors={self.errorSize()}")
+    
+    def addPage(self, page: Page):
+        """Adds the items of the page into the data and its pagination details (i.e. next cursor) into the metadata"""
+        logger.debug(lambda: f"+addPage(), page={page}")
+        self.addInstances(page.items)
+        self.metadata = page.toMetadata()
+        logger.debug(lambda: f"-addPage(), metadata={self.metadata}")
     
     def hasError(self) -> bool:
         """Returns true if any errors otherwise false"""
@@ -450,9 +468,9 @@ class ResponseModel(AbstractModel):
     @classmethod
     def buildResponse(cls, httpStatus: HTTPStatus, instance: AbstractModel = None, message: str = None,
                       exception: Exception = None, is_critical: bool = False):
-        logger.debug(f"+buildResponse({httpStatus}, {instance}, {message}, {exception}, {is_critical})")
+        logger.debug(lambda: f"+buildResponse({httpStatus}, {instance}, {message}, {exception}, {is_critical})")
         if isinstance(instance, ErrorModel):  # check if an ErrorModel entity
-            logger.debug(f"isinstance(entity, ErrorModel) => {isinstance(instance, ErrorModel)}")
+            logger.debug(lambda: f"isinstance(entity, ErrorModel) => {isinstance(instance, ErrorModel)}")
             errorModel = ErrorModel.buildError(httpStatus, message, exception, is_critical)
             # update entity's message and exception if missing
             if not errorModel.message:
@@ -462,7 +480,7 @@ class ResponseModel(AbstractModel):
             response = ResponseModel(status=httpStatus.statusCode)
             response.addInstance(errorModel)
         elif isinstance(instance, BaseModel):
-            logger.debug(f"isinstance(entity, AbstractModel) => {isinstance(instance, BaseModel)}")
+            logger.debug(lambda: f"isinstance(entity, AbstractModel) => {isinstance(instance, BaseModel)}")
             response = ResponseModel(status=httpStatus.statusCode)
             # build errorModel response, if exception is provided
             if HTTPStatus.isStatusSuccess(httpStatus):
@@ -471,67 +489,68 @@ class ResponseModel(AbstractModel):
             else:
                 response.addInstance(ErrorModel.buildError(httpStatus, message, exception, is_critical))
         elif not HTTPStatus.isStatusSuccess(httpStatus):
-            logger.debug(f"not HTTPStatus.isStatusSuccess() => {HTTPStatus.isStatusSuccess(httpStatus)}")
+            logger.debug(lambda: f"not HTTPStatus.isStatusSuccess() => {HTTPStatus.isStatusSuccess(httpStatus)}")
             response = ResponseModel(status=httpStatus.statusCode)
             # build errorModel response, if exception is provided
             response.addInstance(ErrorModel.buildError(httpStatus, message, exception, is_critical))
         else:
-            logger.debug(f"else => ")
+            logger.debug(lambda: f"else => ")
             response = ResponseModel(status=httpStatus.statusCode)
             if exception:
-                logger.debug(f"if exception => type={type(exception)}, exception={exception}")
+                logger.debug(lambda: f"if exception => type={type(exception)}, exception={exception}")
                 # build errorModel response, if exception is provided
                 response.addInstance(ErrorModel.buildError(httpStatus, message, exception, is_critical))
         
-        logger.debug(f"-buildResponse(), response={response}")
+        logger.debug(lambda: f"-buildResponse(), response={response}")
         return response
     
     @classmethod
     def buildResponseWithException(cls, exception: AbstractException):
-        logger.debug(f"+buildResponseWithException() => type={type(exception)}")
+        logger.debug(lambda: f"+buildResponseWithException() => type={type(exception)}")
         # build response and add errorModel in the list
         if isinstance(exception, ValidationException):  # check if an AbstractException entity
-            logger.debug(f"ValidationException => {isinstance(exception, ValidationException)}")
+            logger.debug(lambda: f"ValidationException => {isinstance(exception, ValidationException)}")
             response = ResponseModel(status=exception.httpStatus.statusCode)
             for message in exception.messages:
                 response.addInstance(ErrorModel.buildError(httpStatus=exception.httpStatus, message=message))
         elif isinstance(exception, DuplicateRecordException):
-            logger.debug(f"DuplicateRecordException => {isinstance(exception, DuplicateRecordException)}")
+            logger.debug(lambda: f"DuplicateRecordException => {isinstance(exception, DuplicateRecordException)}")
             response = ResponseModel(status=exception.httpStatus.statusCode)
             lastMessage = exception.messages[-1] if exception.messages else None
             response.addInstance(ErrorModel.buildError(httpStatus=exception.httpStatus, message=lastMessage))
         elif isinstance(exception, RecordNotFoundException):
-            logger.debug(f"NoRecordFoundException => {isinstance(exception, RecordNotFoundException)}")
+            logger.debug(lambda: f"NoRecordFoundException => {isinstance(exception, RecordNotFoundException)}")
             response = ResponseModel(status=exception.httpStatus.statusCode)
             lastMessage = exception.messages[-1] if exception.messages else None
             response.addInstance(ErrorModel.buildError(httpStatus=exception.httpStatus, message=lastMessage))
             # response = ResponseModel.buildResponse(HTTPStatus.CONFLICT, message=str(exception))
-        elif isinstance(exception, AuthenticationException):
-            logger.debug(f"NoRecordFoundException => {isinstance(exception, RecordNotFoundException)}")
+        elif isinstance(exception, (AuthenticationException, AuthorizationException)):
+            logger.debug(lambda: f"AuthenticationException => {isinstance(exception, AuthenticationException)}")
             response = ResponseModel(status=exception.httpStatus.statusCode)
             lastMessage = exception.messages[-1] if exception.messages else None
             response.addInstance(ErrorModel.buildError(httpStatus=exception.httpStatus, message=lastMessage))
         elif isinstance(exception, AbstractException):
-            logger.debug(f"isinstance(exception, AbstractException) => {isinstance(exception, AbstractException)}")
+            logger.debug(
+                lambda: f"isinstance(exception, AbstractException) => {isinstance(exception, AbstractException)}")
             response = ResponseModel(status=exception.httpStatus.statusCode)
             for message in exception.messages:
                 response.addInstance(ErrorModel.buildError(httpStatus=exception.httpStatus, message=message))
             
             response = ResponseModel.buildResponse(HTTPStatus.CONFLICT, message=str(exception))
         elif isinstance(exception, Exception):
-            logger.debug(f"isinstance(exception, Exception) => {isinstance(exception, Exception)}")
+            logger.debug(lambda: f"isinstance(exception, Exception) => {isinstance(exception, Exception)}")
             response = ResponseModel(status=HTTPStatus.INTERNAL_SERVER_ERROR)
             # build errorModel response, if exception is provided
             response.addInstance(ErrorModel.buildError(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(exception)))
         
-        logger.debug(f"-buildResponseWithException(), type={type(exception)} response={response}")
+        logger.debug(lambda: f"-buildResponseWithException(), type={type(exception)} response={response}")
         return response
     
     @classmethod
     def jsonResponseWithException(cls, exception: AbstractException):
-        logger.debug(f"+jsonResponseWithException({exception})")
+        logger.debug(lambda: f"+jsonResponseWithException({exception})")
         response = cls.buildResponseWithException(exception).to_json()
-        logger.debug(f"-jsonResponseWithException(), response={response}")
+        logger.debug(lambda: f"-jsonResponseWithException(), response={response}")
         return response
     
     @classmethod
@@ -541,7 +560,7 @@ class ResponseModel(AbstractModel):
     
     @classmethod
     def jsonResponses(cls, httpStatus: HTTPStatus, instances: Optional[List[AbstractModel]] = []):
-        logger.debug(f"jsonResponses() => httpStatus={httpStatus}")
+        logger.debug(lambda: f"jsonResponses() => httpStatus={httpStatus}")
         response = ResponseModel.buildResponse(httpStatus=httpStatus)
         for instance in instances:
             response.addInstance(instance)
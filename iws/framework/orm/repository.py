@@ -1,17 +1,18 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from abc import ABC, abstractmethod
 from enum import auto
-from typing import Iterable, Any, Dict, List, Optional
+from typing import Iterable, Any, Dict, List, Optional, ContextManager
 
 from sqlalchemy import Engine
 from sqlalchemy.orm import Session
 
+from framework.db.session import openSession
 from framework.enums import AutoUpperCase
+from framework.logger import getLogger
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 
@@ -76,12 +77,16 @@ class AbstractRepository(ABC):
     def get_engine(self) -> Engine:
         return self.__engine
 
+    def openSession(self) -> ContextManager[Session]:
+        """Returns the session of the current request (unit-of-work), if any, otherwise a new session"""
+        return openSession(self.get_engine())
+
     @abstractmethod
     def save(self, instance):
         """Saves the instance using context manager"""
-        logger.debug(f"+save(), instance={instance}")
+        logger.debug(lambda: f"+save(), instance={instance}")
         if instance:
-            with Session(self.get_engine()) as session:
+            with self.openSession() as session:
                 try:
                     session.begin()
                     session.add(instance)
@@ -93,14 +98,14 @@ class AbstractRepository(ABC):
                     session.commit()
                     logger.debug("Persisted a instance successfully!")
 
-        logger.debug(f"-save()")
+        logger.debug(lambda: f"-save()")
 
     @abstractmethod
     def save_all(self, instances: Iterable[object]):
         """Saves the instances using context manager"""
-        logger.debug(f"+save_all(), instances={instances}")
+        logger.debug(lambda: f"+save_all(), instances={instances}")
         if instances:
-            with Session(self.get_engine()) as session:
+            with self.openSession() as session:
                 try:
                     session.begin()
                     session.add_all(instances)
@@ -110,5 +115,5 @@ class AbstractRepository(ABC):
                     raise ex
                 else:
                     session.commit()
-                    logger.debug(f"Persisted [{len(instances)}] instances successfully!")
-        logger.debug(f"-save_all()")
+                    logger.debug(lambda: f"Persisted [{len(instances)}] instances successfully!")
+        logger.debug(lambda: f"-save_all()")
@@ -1,19 +1,79 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
-from typing import Iterable, Dict, Any
+import functools
+import sqlite3
+from enum import auto
+from typing import Iterable, Dict, Any, Union, Tuple
 from typing import List, Optional
 
-from sqlalchemy import text, Engine
+from sqlalchemy import text, Engine, select, literal_column, delete, update, inspect, Column, tuple_, String, func, \
+    bindparam, Select
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound, SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, ONETOMANY, noload, selectinload, joinedload, raiseload
 from sqlalchemy.orm.mapper import Mapper
+from werkzeug.datastructures import MultiDict
 
+from framework.enums import AutoUpperCase
+from framework.exception import ValidationException
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
 from framework.orm.repository import AbstractRepository
 from framework.orm.sqlalchemy.schema import BaseSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
+
+# SQLite's limit of the host parameters in a statement (SQLITE_MAX_VARIABLE_NUMBER), raised to 32766 in v3.32.0
+SQLITE_MAX_PARAMETERS = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+class LoadStrategy(AutoUpperCase):
+    """LoadStrategy class contains the loader strategies of a query's relationships"""
+
+    # never loaded, the relationship is empty (i.e. None/[])
+    NONE = auto()
+    # loaded with an additional 'SELECT ... WHERE fk IN (...)' statement per relationship
+    SELECTIN = auto()
+    # loaded in the same statement with a 'LEFT OUTER JOIN' (one row per child)
+    JOINED = auto()
+    # raises an error on access, to catch the unexpected loads
+    RAISE = auto()
+
+
+# the strategy of all or (by name) of each relationship of a query, the schema's 'lazy' default is used otherwise
+LoadPlan = Union[LoadStrategy, Dict[str, LoadStrategy]]
+
+LOADERS = {
+    LoadStrategy.NONE: noload,
+    LoadStrategy.SELECTIN: selectinload,
+    LoadStrategy.JOINED: joinedload,
+    LoadStrategy.RAISE: raiseload,
+}
+
+# the names of the bound parameters of the keyset pagination, see 'SqlAlchemyRepository.paginate'
+AFTER_CREATED_AT = "_after_created_at"
+AFTER_ID = "_after_id"
+PAGE_LIMIT = "_page_limit"
+
+
+@functools.lru_cache(maxsize=256)
+def _filterStatement(schemaObject: BaseSchema, shape: Tuple[Tuple[str, bool], ...], loadPlanKey: Any,
+                     after: Optional[bool]) -> Select:
+    """Builds the SELECT statement of a filters' shape (i.e. their sorted keys and if matched with IN), the values are
+    bound parameters named by the keys. The statements are cached, SQLAlchemy caches their compiled SQL.
+
+    The loaded rows overwrite the objects already in the (request's) session's identity map, so a re-read gets the
+    current columns and the relationships of its own load plan.
+    """
+    loadPlan = dict(loadPlanKey) if isinstance(loadPlanKey, tuple) else loadPlanKey
+    statement = (select(schemaObject)
+                 .options(*SqlAlchemyRepository.loaderOptions(schemaObject, loadPlan))
+                 .execution_options(populate_existing=True))
+    for key, isList in shape:
+        column = getattr(schemaObject, key)
+        statement = statement.where(column.in_(bindparam(key, expanding=True)) if isList else column == bindparam(key))
+
+    return SqlAlchemyRepository.paginate(statement, schemaObject, after)
 
 
 class SqlAlchemyRepository(AbstractRepository):
@@ -24,16 +84,16 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def save(self, instance: BaseSchema) -> BaseSchema:
         """Returns records by filter or empty list"""
-        logger.debug(f"+{self.__class__.__name__}.save({instance})")
+        logger.debug(lambda: f"+{self.__class__.__name__}.save({instance})")
         if instance is not None:
-            with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+            with self.openSession() as session:
                 try:
                     session.add(instance)
                     # Commit:
                     # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
                     # object closed and discarded, the underlying DBAPI connection returned to the connection pool.
                     session.commit()
-                    logger.debug(f"Persisted a instance successfully!")
+                    logger.debug(lambda: f"Persisted a instance successfully!")
                 except Exception as ex:
                     logger.error(f"Transaction failed while saving record! Error={ex}")
                     # on rollback, the same closure of state as that of commit proceeds.
@@ -47,32 +107,24 @@ class SqlAlchemyRepository(AbstractRepository):
                 else:
                     # Refresh to get any other DB-generated values
                     session.refresh(instance)
-                finally:
-                    # close the Session.
-                    # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                    # Neither of these steps are usually essential.
-                    # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                    # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                    # is removed.
-                    session.close()
         else:
             logger.warning(f"No instance provided to persist!")
 
-        logger.debug(f"-{self.__class__.__name__}.save(), instance={instance}")
+        logger.debug(lambda: f"-{self.__class__.__name__}.save(), instance={instance}")
         return instance
 
     def save_all(self, instances: Iterable[BaseSchema]) -> None:
         """Returns records by filter or empty list"""
-        logger.debug(f"+{self.__class__.__name__}.save_all({instances})")
+        logger.debug(lambda: f"+{self.__class__.__name__}.save_all({instances})")
         if instances is not None:
-            with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+            with self.openSession() as session:
                 try:
                     session.add_all(instances)
                     # Commit:
                     # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
                     # object closed and discarded, the underlying DBAPI connection returned to the connection pool.
                     session.commit()
-                    logger.debug(f"Persisted [{len(instances)}] instances successfully!")
+                    logger.debug(lambda: f"Persisted [{len(instances)}] instances successfully!")
                 except Exception as ex:
                     logger.error(f"Transaction failed while saving record! Error={ex}")
                     # on rollback, the same closure of state as that of commit proceeds.
@@ -83,18 +135,10 @@ class SqlAlchemyRepository(AbstractRepository):
                     # on rollback, the same closure of state as that of commit proceeds.
                     session.rollback()
                     raise
-                finally:
-                    # close the Session.
-                    # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                    # Neither of these steps are usually essential.
-                    # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                    # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                    # is removed.
-                    session.close()
         else:
             logger.warning(f"No instances provided to persist!")
 
-        logger.debug(f"-{self.__class__.__name__}.save_all()")
+        logger.debug(lambda: f"-{self.__class__.__name__}.save_all()")
 
     def filter(self, filters: Dict[str, Any]) -> List[Optional[BaseSchema]]:
         """Filters the records of the provided table by parses filters dict.
@@ -106,22 +150,220 @@ class SqlAlchemyRepository(AbstractRepository):
 
         pass
 
-    def findById(self, schemaObject: BaseSchema, id: int) -> Optional[BaseSchema]:
+    @staticmethod
+    def loaderOptions(schemaObject: BaseSchema, loadPlan: Optional[LoadPlan] = None) -> list:
+        """Builds the loader options of the load plan, a single strategy is applied to all the relationships."""
+        if loadPlan is None:
+            return []
+
+        if isinstance(loadPlan, LoadStrategy):
+            loadPlan = {name: loadPlan for name in inspect(schemaObject).relationships.keys()}
+
+        return [LOADERS[strategy](getattr(schemaObject, name)) for name, strategy in loadPlan.items()]
+
+    @staticmethod
+    def buildCriteria(schemaObject: BaseSchema, filters: Dict[str, Any]) -> list:
+        """Builds the WHERE criteria of the normalized filters, a list is matched with 'IN' otherwise with '='."""
+        criteria = []
+        for key, value in SqlAlchemyRepository.normalizeFilters(schemaObject, filters).items():
+            column = getattr(schemaObject, key)
+            if isinstance(value, list):
+                criteria.append(column.in_(value))
+            else:
+                criteria.append(column == value)
+
+        return criteria
+
+    @staticmethod
+    def normalizeFilters(schemaObject: BaseSchema, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the filters in a canonical shape i.e. sorted by the keys, the multiple values of a 'MultiDict' key
+        (i.e. '?id=1&id=2') and the list/tuple/set values as lists (matched with 'IN').
+
+        The keys must be the columns of the schema.
+        """
+        if not filters:
+            return {}
+
+        columns = inspect(schemaObject).columns
+        items = filters.lists() if isinstance(filters, MultiDict) else filters.items()
+        normalized = {}
+        for key, value in sorted(items):
+            if key not in columns:
+                raise ValidationException(messages=[f"The filter '{key}' is not supported!"])
+
+            if isinstance(filters, MultiDict):
+                normalized[key] = value[0] if len(value) == 1 else value
+            else:
+                normalized[key] = list(value) if isinstance(value, (list, tuple, set)) else value
+
+        return normalized
+
+    @staticmethod
+    def filterStatement(schemaObject: BaseSchema, filters: Dict[str, Any], loadPlan: LoadPlan = None,
+                        pageRequest: PageRequest = None) -> Tuple[Select, Dict[str, Any]]:
+        """Returns the (cached) statement of the filters' shape and its parameters (i.e. the values of the filters and
+        of the page request), so the hot filters (i.e. {'email': ...}) skip the statement's construction."""
+        parameters = SqlAlchemyRepository.normalizeFilters(schemaObject, filters)
+        shape = tuple((key, isinstance(value, list)) for key, value in parameters.items())
+        loadPlanKey = tuple(sorted(loadPlan.items())) if isinstance(loadPlan, dict) else loadPlan
+        after = None
+        if pageRequest is not None:
+            after = pageRequest.after is not None
+            parameters.update(SqlAlchemyRepository.pageParameters(pageRequest))
+
+        return _filterStatement(schemaObject, shape, loadPlanKey, after), parameters
+
+    @staticmethod
+    def paginate(statement: Select, schemaObject: BaseSchema, after: Optional[bool]) -> Select:
+        """Applies the keyset pagination to the statement, if 'after' is not None, with the (after the cursor's key)
+        criteria if 'after' is True. The values are bound by the 'pageParameters()'.
+
+        The records are ordered by the '(created_at, id)' index and filtered with a row-value comparison
+        '(created_at, id) > (?, ?)', so a deep page is an index range scan like the first one. One more record than
+        the limit is loaded to know if there's a next page, see 'Page.of'.
+        """
+        if after is None:
+            return statement
+
+        if after:
+            key = tuple_(schemaObject.created_at, schemaObject.id)
+            statement = statement.where(key > tuple_(bindparam(AFTER_CREATED_AT, type_=String()), bindparam(AFTER_ID)))
+
+        return statement.order_by(schemaObject.created_at, schemaObject.id).limit(bindparam(PAGE_LIMIT))
+
+    @staticmethod
+    def pageParameters(pageRequest: PageRequest) -> Dict[str, Any]:
+        """Returns the values of the page request's bound parameters"""
+        parameters = {PAGE_LIMIT: pageRequest.limit + 1}
+        if pageRequest.after:
+            createdAt, id = pageRequest.after
+            # SQLite compares the stored text, bound as the default 'CURRENT_TIMESTAMP' text (without the microseconds)
+            parameters[AFTER_CREATED_AT] = createdAt.isoformat(sep=" ", timespec="microseconds"
+                                                               if createdAt.microsecond else "seconds")
+            parameters[AFTER_ID] = id
+
+        return parameters
+
+    def count(self, schemaObject: BaseSchema, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records of the provided table matching the filters"""
+        logger.debug(lambda: f"+{self.__class__.__name__}.count({schemaObject}, {filters})")
+        with self.openSession() as session:
+            try:
+                result = session.scalar(select(func.count())
+                                        .select_from(schemaObject)
+                                        .where(*self.buildCriteria(schemaObject, filters)))
+            except Exception as ex:
+                logger.error(f"Exception while counting [{schemaObject}]! Error={ex}")
+                session.rollback()
+                raise ex
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.count(), result={result}")
+        return result
+
+    def exists(self, schemaObject: BaseSchema, filters: Dict[str, Any]) -> bool:
+        """Returns True if any record of the provided table matches the filters otherwise False.
+
+        It issues a single 'SELECT EXISTS (SELECT 1 FROM ... WHERE ... LIMIT 1)' without loading any row.
+        """
+        logger.debug(lambda: f"+{self.__class__.__name__}.exists({schemaObject}, {filters})")
+        subquery = (select(literal_column("1"))
+                    .select_from(schemaObject)
+                    .where(*self.buildCriteria(schemaObject, filters))
+                    .limit(1))
+        with self.openSession() as session:
+            try:
+                result = bool(session.scalar(select(subquery.exists())))
+            except Exception as ex:
+                logger.error(f"Exception while checking [{schemaObject}] exists! Error={ex}")
+                session.rollback()
+                raise ex
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.exists(), result={result}")
+        return result
+
+    def deleteByIds(self, schemaObject: BaseSchema, ids: Iterable[int], cascades: List[Column] = None) -> int:
+        """Deletes the records of the provided table by ids with set-based 'DELETE ... WHERE id IN (...)' statements,
+        chunked to SQLite's parameter limit, in one transaction, and returns the number of deleted records.
+
+        The bulk statements bypass the ORM's (in-memory) cascades, so they are applied explicitly, as the ORM would:
+        - the association (secondary) rows of the many-to-many relationships are deleted.
+        - the children of the one-to-many relationships with 'delete' cascade are deleted (recursively).
+        - the foreign-key of the children of the other one-to-many relationships is set to NULL.
+        - the rows referencing the ids with any of the 'cascades' (foreign-key) columns are deleted.
+
+        Parameters:
+        - schemaObject (BaseSchema): The schema class that represents the db schema.
+        - ids (Iterable[int]): The primary keys of the records to delete.
+        - cascades (List[Column]): The foreign-key columns, not mapped as relationships, referencing the ids.
+        """
+        logger.debug(lambda: f"+{self.__class__.__name__}.deleteByIds({schemaObject}, {ids}, {cascades})")
+        ids = list(dict.fromkeys(ids or []))
+        results = 0
+        if ids:
+            with self.openSession() as session:
+                try:
+                    results = self._deleteByIds(session, schemaObject, ids, cascades)
+                    session.commit()
+                    logger.debug(lambda: f"Deleted [{results}] rows successfully.")
+                except Exception as ex:
+                    logger.error(f"Exception while bulk deleting [{schemaObject}] records! Error={ex}")
+                    session.rollback()
+                    raise ex
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.deleteByIds(), results={results}")
+        return results
+
+    def _deleteByIds(self, session: Session, schemaObject: BaseSchema, ids: List[Any],
+                     cascades: List[Column] = None) -> int:
+        """Deletes the records (and their cascades) by ids in chunks within the session's transaction."""
+        mapper = inspect(schemaObject)
+        primaryKey = mapper.primary_key[0]
+        results = 0
+        for index in range(0, len(ids), SQLITE_MAX_PARAMETERS):
+            chunk = ids[index:index + SQLITE_MAX_PARAMETERS]
+            for column in cascades or []:
+                session.execute(delete(column.table).where(column.in_(chunk)))
+
+            for relationship in mapper.relationships:
+                for local, remote in relationship.synchronize_pairs:
+                    # the referenced values of the parents being deleted
+                    referenced = chunk if local is primaryKey else select(local).where(primaryKey.in_(chunk))
+                    if relationship.secondary is not None:
+                        session.execute(delete(relationship.secondary).where(remote.in_(referenced)))
+                    elif relationship.direction is ONETOMANY:
+                        child = relationship.mapper
+                        if relationship.cascade.delete:
+                            childIds = session.scalars(select(child.primary_key[0]).where(remote.in_(referenced)))
+                            self._deleteByIds(session, child.class_, childIds.all())
+                        elif not relationship.passive_deletes:
+                            session.execute(
+                                update(remote.table).where(remote.in_(referenced)).values({remote.name: None}))
+
+            results += session.execute(delete(schemaObject).where(primaryKey.in_(chunk))).rowcount
+
+        return results
+
+    def findById(self, schemaObject: BaseSchema, id: int, loadPlan: LoadPlan = None) -> Optional[BaseSchema]:
         """Finds the record by id in the provided table and parses object's dict.
 
         Parameters:
         - schemaObject (BaseSchema): The schema class that represents the db schema.
         - id (int): id of the object
+        - loadPlan (LoadPlan): The loader strategies of the relationships.
 
         - return: Optional[BaseSchema]
         """
-        logger.debug(f"+{self.__class__.__name__}.findById({schemaObject}, {id})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+{self.__class__.__name__}.findById({schemaObject}, {id})")
+        with self.openSession() as session:
             try:
-                schemaObject = session.query(schemaObject).filter(schemaObject.id == id).one()
+                schemaObject = (session.query(schemaObject)
+                                .options(*self.loaderOptions(schemaObject, loadPlan))
+                                .populate_existing()
+                                .filter(schemaObject.id == id)
+                                .one())
                 # rows = session.execute(text(query)).fetchall()
                 # results = [row._asdict() for row in rows]
-                logger.debug(f"Loaded a [{type(schemaObject)}] record. schemaObject={schemaObject}")
+                logger.debug(lambda: f"Loaded a [{type(schemaObject)}] record. schemaObject={schemaObject}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -147,31 +389,23 @@ class SqlAlchemyRepository(AbstractRepository):
                 logger.error(f"Exception while loading [{type(schemaObject)}]!")
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-{self.__class__.__name__}.findById(), schemaObject={schemaObject}")
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.findById(), schemaObject={schemaObject}")
         return schemaObject
 
-    def findAll(self, schemaObject: BaseSchema, filters: Dict[str, Any]) -> List[Optional[BaseSchema]]:
+    def findAll(self, schemaObject: BaseSchema, filters: Dict[str, Any], loadPlan: LoadPlan = None,
+                pageRequest: PageRequest = None) -> List[Optional[BaseSchema]]:
         """Returns the records by filter or empty list"""
-        logger.debug(f"+{self.__class__.__name__}.findAll({schemaObject}, {filters})")
+        logger.debug(lambda: f"+{self.__class__.__name__}.findAll({schemaObject}, {filters}, {loadPlan}, "
+                             f"{pageRequest})")
         schemaObjects = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             try:
-                if filters:
-                    schemaObjects = session.query(schemaObject).filter_by(**filters).all()
-                else:
-                    schemaObjects = session.query(schemaObject).all()
+                statement, parameters = self.filterStatement(schemaObject, filters, loadPlan, pageRequest)
+                schemaObjects = session.scalars(statement, parameters).unique().all()
 
-                logger.debug(f"Loaded [{len(schemaObjects)}] records. schemaObjects={schemaObjects}")
+                logger.debug(lambda: f"Loaded [{len(schemaObjects)}] records. schemaObjects={schemaObjects}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -197,16 +431,8 @@ class SqlAlchemyRepository(AbstractRepository):
                 logger.error(f"Exception while loading permissions!")
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-{self.__class__.__name__}.findAll(), schemaObjects={schemaObjects}")
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.findAll(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def updateObjects(self, table: str, update_json=[]) -> Optional[List[dict]]:
@@ -217,12 +443,12 @@ class SqlAlchemyRepository(AbstractRepository):
 
         :return: Optional[List[dict]]
         """
-        logger.debug(f"{self.__class__.__name__}.updateObjects({table}, {update_json})")
+        logger.debug(lambda: f"{self.__class__.__name__}.updateObjects({table}, {update_json})")
         query = f'UPDATE {table} {self.build_update_set_fields(update_json)}'
-        with Session(self.get_engine()) as session:
+        with self.openSession() as session:
             try:
                 rows = session.execute(text(query), ).fetchall()
-                logger.debug(f"Updated [{rows.rowcount}] rows => {rows}")
+                logger.debug(lambda: f"Updated [{rows.rowcount}] rows => {rows}")
                 return rows
             except SQLAlchemyError as ex:
                 logger.error(f"SQLAlchemyError while updating records! Error={ex}")
@@ -235,14 +461,14 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def update(self, mapper: Mapper[BaseSchema], mappings: List[BaseSchema]) -> List[Optional[BaseSchema]]:
         """Updates an instance into database via the ORM flush process."""
-        logger.debug(f"+{self.__class__.__name__}.update(), mapper={mapper}, mappings={mappings}")
+        logger.debug(lambda: f"+{self.__class__.__name__}.update(), mapper={mapper}, mappings={mappings}")
         if mappings is not None:
-            with Session(self.get_engine()) as session:
+            with self.openSession() as session:
                 try:
                     session.bulk_update_mappings(mapper, mappings)
                     session.flush()
                     session.commit()
-                    logger.debug(f"Persisted a instance successfully!")
+                    logger.debug(lambda: f"Persisted a instance successfully!")
                 except Exception as ex:
                     logger.error(f"Failed transaction with error:{ex}")
                     session.rollback()
@@ -252,5 +478,5 @@ class SqlAlchemyRepository(AbstractRepository):
         else:
             logger.warning(f"No instance provided to update!")
 
-        logger.debug(f"-{self.__class__.__name__}.update(), mappings={mappings}")
+        logger.debug(lambda: f"-{self.__class__.__name__}.update(), mappings={mappings}")
         return mappings
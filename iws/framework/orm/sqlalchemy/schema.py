@@ -7,19 +7,19 @@
 #
 from __future__ import annotations
 
-import logging
 from datetime import datetime
 from enum import unique, auto
 from math import ceil
 from typing import Any
 
-from sqlalchemy import func, orm, String, event, inspect
-from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
+from sqlalchemy import func, orm, String, event, inspect, Index
+from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, declared_attr
 from sqlalchemy.orm.query import attributes
 
 from framework.enums import AutoUpperCase
+from framework.logger import getLogger
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 @unique
@@ -42,7 +42,7 @@ class Pagination(object):
     """
 
     def __init__(self, query, page: int, page_size: int, total: int, items):
-        logger.debug(f"+Pagination({query}, {page}, {page_size}, {total})")
+        logger.debug(lambda: f"+Pagination({query}, {page}, {page_size}, {total})")
 
         #: The query object that was used to create this pagination object.
         self.query = query
@@ -67,7 +67,7 @@ class Pagination(object):
         self.next_page = self.page + 1
         #: True if a next page exists.
         self.has_next = self.page < self.pages
-        logger.debug(f"-Pagination()")
+        logger.debug(lambda: f"-Pagination()")
 
     def prev(self, throw_error: bool = False):
         """Returns a `Pagination` object for the previous page."""
@@ -97,7 +97,7 @@ class BaseQuery(orm.Query):
     def paginate(self, page: int, page_size: int = 20, throw_error: bool = True):
         """Return `Pagination` instance using already defined query parameters.
         """
-        logger.debug(f"+paginate({page}, {page_size}, {throw_error})")
+        logger.debug(lambda: f"+paginate({page}, {page_size}, {throw_error})")
         if throw_error and page < 1:
             raise IndexError
 
@@ -115,7 +115,7 @@ class BaseQuery(orm.Query):
             total = self.order_by(None).count()
 
         pagination = Pagination(self, page, page_size, total, items)
-        logger.debug(f"-paginate(), pagination={pagination}")
+        logger.debug(lambda: f"-paginate(), pagination={pagination}")
         return pagination
 
 
@@ -256,18 +256,18 @@ class AbstractSchema(DeclarativeBase):
         Alternatively, the same Table objects can be used in fully “classical” style, without using Declarative at all.
         A constructor similar to that supplied by Declarative is illustrated:
         """
-        logger.debug(f"+{self.getClassName()}({kwargs})")
+        logger.debug(lambda: f"+{self.getClassName()}({kwargs})")
         self.setAttributes(**kwargs)
-        logger.debug(f"-{self.getClassName()}()")
+        logger.debug(lambda: f"-{self.getClassName()}()")
 
     def setAttributes(self, **kwargs):
         """
         Alternatively, the same Table objects can be used in fully “classical” style, without using Declarative at all.
         A constructor similar to that supplied by Declarative is illustrated:
         """
-        logger.debug(f"+setAttributes({kwargs})")
+        logger.debug(lambda: f"+setAttributes({kwargs})")
         for key in kwargs:
-            logger.debug(f"{key}={kwargs[key]}, ({type(kwargs[key])})")
+            logger.debug(lambda: f"{key}={kwargs[key]}, ({type(kwargs[key])})")
             # handle error - AttributeError: 'dict' object has no attribute '_sa_instance_state'
             # setattr(self, key, kwargs[key])
             if isinstance(kwargs[key], list):
@@ -277,7 +277,7 @@ class AbstractSchema(DeclarativeBase):
             else:
                 setattr(self, key, kwargs[key])
 
-        logger.debug(f"-setAttributes()")
+        logger.debug(lambda: f"-setAttributes()")
 
     def getClassName(self) -> str:
         """Returns the name of the class."""
@@ -345,6 +345,11 @@ class BaseSchema(AbstractSchema):
     # primary_key=True, therefore will be NOT NULL
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        """The '(created_at, id)' index of each table for the keyset pagination, see 'SqlAlchemyRepository.paginate'"""
+        return (Index(f"ix_{cls.__tablename__}_created_at_id", "created_at", "id"),)
+
     def __str__(self) -> str:
         """Returns the string representation of this object"""
         return "{} <id={}, {}>".format(self.getClassName(), self.id, self.auditable())
@@ -353,7 +358,7 @@ class BaseSchema(AbstractSchema):
 @event.listens_for(BaseSchema.metadata, "column_reflect")
 def column_reflect(inspector, table, column_info):
     # set column.key = "attr_<lower_case_name>"
-    logger.info(f"column_reflect({table}, {column_info})")
+    logger.info(lambda: f"column_reflect({table}, {column_info})")
     # column_info["key"] = "attr_%s" % column_info["name"].lower()
 
 
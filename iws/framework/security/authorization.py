@@ -0,0 +1,119 @@
+#
+# Author: Rohtash Lakra
+#
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple, Union
+
+from framework.cache import TTLCache
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+# a name or the names of the required roles/permissions
+Names = Union[str, Iterable[str], None]
+
+
+def toNames(names: Names) -> FrozenSet[str]:
+    """Returns the names as a frozenset"""
+    if not names:
+        return frozenset()
+
+    return frozenset([names] if isinstance(names, str) else names)
+
+
+@dataclass(frozen=True)
+class Grants(object):
+    """Grants represents the effective roles and permissions of a principal, compiled into the frozensets once when
+    loaded, so an authorization check is a set lookup whatever the number of the roles and their permissions."""
+
+    roles: FrozenSet[str] = frozenset()
+    permissions: FrozenSet[str] = frozenset()
+    # the ids of the roles, the grants are invalidated when a role changes
+    roleIds: FrozenSet[int] = frozenset()
+
+    @classmethod
+    def compile(cls, rows: Iterable[Tuple[int, str, Optional[str]]]) -> "Grants":
+        """Compiles the (role's id, role's name, permission's name) rows, the permission is None for a role without
+        any permission."""
+        roleIds, roles, permissions = set(), set(), set()
+        for roleId, roleName, permissionName in rows:
+            roleIds.add(roleId)
+            roles.add(roleName)
+            if permissionName is not None:
+                permissions.add(permissionName)
+
+        return cls(roles=frozenset(roles), permissions=frozenset(permissions), roleIds=frozenset(roleIds))
+
+    def hasAnyRole(self, roles: FrozenSet[str]) -> bool:
+        """Returns True if any of the roles is granted otherwise False"""
+        return not self.roles.isdisjoint(roles)
+
+    def hasPermissions(self, permissions: FrozenSet[str]) -> bool:
+        """Returns True if all the permissions are granted otherwise False"""
+        return permissions <= self.permissions
+
+    def allows(self, roles: FrozenSet[str] = frozenset(), permissions: FrozenSet[str] = frozenset()) -> bool:
+        """Returns True if any of the roles (if required) and all the permissions are granted otherwise False"""
+        return (not roles or self.hasAnyRole(roles)) and self.hasPermissions(permissions)
+
+
+class GrantCache(TTLCache):
+    """GrantCache caches the compiled grants of the principals by their ids.
+
+    The principals are indexed by their roles' ids, so the grants of all the principals of a role are invalidated at
+    once when its permissions are assigned/revoked.
+    """
+
+    def __init__(self, maxSize: int = 1024, ttl: float = 300.0, **kwargs):
+        super().__init__(maxSize=maxSize, ttl=ttl, **kwargs)
+        self._principals: Dict[int, Set[Any]] = {}
+        # incremented by the invalidations, the grants loaded meanwhile are not cached
+        self._version = 0
+
+    def getGrants(self, principalId: Any, loader: Callable[[Any], Grants]) -> Grants:
+        """Returns the cached grants of the principal, loaded (and cached) by the loader on a miss"""
+        grants = self.get(principalId)
+        if grants is None:
+            version = self._version
+            grants = loader(principalId)
+            with self._lock:
+                if version == self._version:
+                    self.putGrants(principalId, grants)
+
+        return grants
+
+    def putGrants(self, principalId: Any, grants: Grants) -> None:
+        """Caches the grants of the principal"""
+        with self._lock:
+            self.put(principalId, grants)
+            for roleId in grants.roleIds:
+                self._principals.setdefault(roleId, set()).add(principalId)
+
+    def invalidateRoles(self, roleIds: Iterable[int]) -> int:
+        """Removes the cached grants of all the principals of the roles and returns their count"""
+        with self._lock:
+            self._version += 1
+            principalIds = set()
+            for roleId in roleIds:
+                principalIds.update(self._principals.pop(roleId, ()))
+
+            for principalId in principalIds:
+                self.invalidate(principalId)
+
+        logger.debug(lambda: f"invalidateRoles({roleIds}), principals={len(principalIds)}")
+        return len(principalIds)
+
+    # @override
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            super().clear()
+
+    # @override
+    def _onEvict(self, key: Hashable, value: Any) -> None:
+        for roleId in value.roleIds:
+            principalIds = self._principals.get(roleId)
+            if principalIds is not None:
+                principalIds.discard(key)
+                if not principalIds:
+                    del self._principals[roleId]
@@ -3,11 +3,14 @@
 #
 
 import base64
+import functools
 import json
 import logging
 import secrets
 import string
+from typing import Iterable, List, Optional
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,44 @@ class SecurityException(Exception):
     pass
 
 
+class AESGCMCipher(object):
+    """AESGCMCipher is an AES-GCM cipher context of a key and nonce.
+
+    The key material (the 'AESGCM' instance, the nonce and associated data bytes) is prepared once, the context holds no
+    per-call state, so it's safe to share across the threads.
+    """
+
+    def __init__(self, enc_key: str, enc_nonce: str, extra_data: Optional[bytes] = None):
+        try:
+            self._aesgcm = AESGCM(enc_key.encode(UTF_8))
+        except ValueError as ex:
+            raise SecurityException(str(ex)) from ex
+
+        self._nonce = enc_nonce.encode(UTF_8)
+        self._extra_data = extra_data
+
+    def encrypt(self, data: str) -> str:
+        """Encrypts the text and returns the base64 encoded cipher text"""
+        return base64.b64encode(self._aesgcm.encrypt(self._nonce, data.encode(UTF_8), self._extra_data)).decode(UTF_8)
+
+    def decrypt(self, data: str) -> dict:
+        """Decrypts the base64 encoded cipher text and returns its JSON object"""
+        try:
+            decrypted = self._aesgcm.decrypt(self._nonce, base64.b64decode(data), self._extra_data)
+        except (InvalidTag, ValueError) as ex:
+            raise SecurityException("Invalid encrypted data!") from ex
+
+        return json.loads(decrypted)
+
+    def encryptAll(self, items: Iterable[str]) -> List[str]:
+        """Encrypts the texts in a batch (i.e. a token fan-out)"""
+        return [self.encrypt(item) for item in items]
+
+    def decryptAll(self, items: Iterable[str]) -> List[dict]:
+        """Decrypts the base64 encoded cipher texts in a batch"""
+        return [self.decrypt(item) for item in items]
+
+
 class CryptoUtils:
     """"""
 
@@ -50,28 +91,26 @@ class CryptoUtils:
         return token
 
     @staticmethod
-    def encrypt_with_aesgcm(enc_key: str, enc_nonce: str, data: str) -> str:
-        logger.debug(f"+encrypt_with_aesgcm({enc_key}, {enc_nonce}, {data})")
-        if not (enc_key or enc_nonce):
+    @functools.lru_cache(maxsize=8)
+    def cipher(enc_key: str, enc_nonce: str, extra_data: Optional[bytes] = None) -> AESGCMCipher:
+        """Returns the (cached) cipher context of the key and nonce, it's created once per key and thread-safe."""
+        if not (enc_key and enc_nonce):
             raise SecurityException("Either security key or nonce is wrong!")
 
-        aesgcm = AESGCM(enc_key.encode(UTF_8))
-        data_bytes = aesgcm.encrypt(enc_nonce.encode(UTF_8), data.encode(UTF_8), CryptoUtils.extra_data)
-        encrypted = base64.b64encode(data_bytes).decode(UTF_8)
-        logger.debug(f"-encrypt_with_aesgcm(), encrypted={encrypted}")
+        return AESGCMCipher(enc_key, enc_nonce, extra_data)
+
+    @staticmethod
+    def encrypt_with_aesgcm(enc_key: str, enc_nonce: str, data: str) -> str:
+        logger.debug(f"+encrypt_with_aesgcm()")
+        encrypted = CryptoUtils.cipher(enc_key, enc_nonce, CryptoUtils.extra_data).encrypt(data)
+        logger.debug(f"-encrypt_with_aesgcm()")
         return encrypted
 
     @staticmethod
     def decrypt_with_aesgcm(enc_key: str, enc_nonce: str, data: str) -> dict:
-        logger.debug(f"+decrypt_with_aesgcm({enc_key}, {enc_nonce}, {data})")
-        if not (enc_key or enc_nonce):
-            raise SecurityException("Either security key or nonce is wrong!")
-
-        aesgcm = AESGCM(enc_key.encode(UTF_8))
-        data_bytes = base64.b64decode(data)
-        decrypted = aesgcm.decrypt(enc_nonce.encode(UTF_8), data_bytes, CryptoUtils.extra_data).decode(UTF_8)
-        decrypted = json.loads(decrypted)
-        logger.debug(f"-decrypt_with_aesgcm(), type={type(decrypted)}, decrypted={decrypted}")
+        logger.debug(f"+decrypt_with_aesgcm()")
+        decrypted = CryptoUtils.cipher(enc_key, enc_nonce, CryptoUtils.extra_data).decrypt(data)
+        logger.debug(f"-decrypt_with_aesgcm(), type={type(decrypted)}")
         return decrypted
 
     @staticmethod
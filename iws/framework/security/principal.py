@@ -0,0 +1,78 @@
+#
+# Author: Rohtash Lakra
+#
+import hashlib
+import time
+from typing import Any, Dict, Hashable, Optional, Set
+
+from framework.cache import TTLCache
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+
+class PrincipalCache(TTLCache):
+    """PrincipalCache caches the authenticated principals (users) by the SHA-256 digest of their auth tokens.
+
+    The raw tokens are never kept in memory. The digests are indexed by the principal's id, so all the cached tokens
+    of a principal are invalidated at once when its profile or security record changes. A token's own expiry (i.e.
+    the user security's 'expire_at') is checked on every hit, it's never served beyond it.
+
+    The cache (and its invalidation) is per process: the other (gunicorn's) workers keep serving a revoked principal
+    until its entry's 'ttl' expires, so the 'ttl' is kept short (see 'AUTH_CACHE_TTL').
+    """
+
+    def __init__(self, maxSize: int = 1024, ttl: float = 300.0, **kwargs):
+        super().__init__(maxSize=maxSize, ttl=ttl, **kwargs)
+        self._digests: Dict[Any, Set[bytes]] = {}
+        # the (epoch) expiry of the tokens, by their digests
+        self._tokenExpiry: Dict[bytes, float] = {}
+
+    @staticmethod
+    def tokenDigest(token: str) -> bytes:
+        """Returns the SHA-256 digest of the token"""
+        return hashlib.sha256(token.encode()).digest()
+
+    def getPrincipal(self, token: str) -> Optional[Any]:
+        """Returns the cached principal of the token, if the token isn't expired, otherwise None"""
+        digest = self.tokenDigest(token)
+        with self._lock:
+            principal = self.get(digest)
+            expireAt = self._tokenExpiry.get(digest)
+            if principal is not None and expireAt is not None and expireAt <= time.time():
+                # an expired token is a miss, it's authenticated (and rejected) again
+                self.hits -= 1
+                self.misses += 1
+                self.invalidate(digest)
+                return None
+
+            return principal
+
+    def putPrincipal(self, token: str, principal: Any, expireAt: Optional[float] = None) -> None:
+        """Caches the authenticated principal of the token, until the token's (epoch) 'expireAt' if any"""
+        digest = self.tokenDigest(token)
+        with self._lock:
+            self.put(digest, principal)
+            if digest in self._entries:
+                self._digests.setdefault(principal.id, set()).add(digest)
+                if expireAt is not None:
+                    self._tokenExpiry[digest] = expireAt
+
+    def invalidatePrincipal(self, principalId: Any) -> int:
+        """Removes all the cached tokens of the principal and returns their count"""
+        with self._lock:
+            digests = self._digests.pop(principalId, set())
+            for digest in digests:
+                self.invalidate(digest)
+
+        logger.debug(lambda: f"invalidatePrincipal({principalId}), tokens={len(digests)}")
+        return len(digests)
+
+    # @override
+    def _onEvict(self, key: Hashable, value: Any) -> None:
+        self._tokenExpiry.pop(key, None)
+        digests = self._digests.get(value.id)
+        if digests is not None:
+            digests.discard(key)
+            if not digests:
+                del self._digests[value.id]
@@ -5,6 +5,7 @@ import logging
 from abc import abstractmethod
 from typing import List, Optional, Dict, Any
 
+from framework.orm.pagination import Page, PageRequest
 from framework.orm.pydantic.model import BaseModel
 from framework.orm.sqlalchemy.schema import SchemaOperation
 
@@ -39,6 +40,20 @@ class AbstractService(object):
         logger.debug(f"existsByFilter({filters})")
         pass
 
+    @abstractmethod
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        logger.debug(f"countByFilter({filters})")
+        pass
+
+    def findPage(self, filters: Dict[str, Any], pageRequest: PageRequest) -> Page:
+        """Returns a page of the records based on the provided filters, counted only if requested"""
+        logger.debug(f"+findPage({filters}, {pageRequest})")
+        modelObjects = self.findByFilter(filters, pageRequest=pageRequest)
+        total = self.countByFilter(filters) if pageRequest.withTotal else None
+        page = Page.of(modelObjects, pageRequest, total)
+        logger.debug(f"-findPage(), page={page}")
+        return page
+
     def load(schema_class, json, only=None, exclude=[], partial=False, many=False):
         return schema_class(only=only, exclude=exclude, partial=partial, many=many).load_and_not_raise(json)
 
@@ -0,0 +1,49 @@
+#
+# Author: Rohtash Lakra
+#
+from dataclasses import dataclass
+from typing import Optional
+
+from framework.enums import EnvType
+
+
+@dataclass(frozen=True)
+class RuntimeSettings(object):
+    """RuntimeSettings is the runtime environment resolved once (i.e. at the app's creation), so the hot paths (i.e.
+    the log formatter) don't probe the environment variables per call.
+    """
+
+    # the name of the env type, i.e. 'DEV', 'testing'
+    envType: str
+    development: bool = False
+    production: bool = False
+    testing: bool = False
+
+    @classmethod
+    def resolve(cls, envType: str = None) -> "RuntimeSettings":
+        """Resolves the settings of the env type, the current environment's one by default"""
+        envType = envType or EnvType.get_env_type()
+        return cls(envType=envType, development=EnvType.is_development(envType),
+                   production=EnvType.is_production(envType), testing=EnvType.is_testing(envType))
+
+
+# the resolved settings, see 'getSettings()'
+_settings: Optional[RuntimeSettings] = None
+
+
+def getSettings() -> RuntimeSettings:
+    """Returns the resolved runtime settings, resolved on the first call"""
+    global _settings
+    if _settings is None:
+        _settings = RuntimeSettings.resolve()
+
+    return _settings
+
+
+def reloadSettings(envType: str = None) -> RuntimeSettings:
+    """Re-resolves the runtime settings, i.e. after the environment is (re)loaded from the '.env' file or changed by
+    the tests.
+    """
+    global _settings
+    _settings = RuntimeSettings.resolve(envType)
+    return _settings
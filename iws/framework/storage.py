@@ -0,0 +1,112 @@
+#
+# Author: Rohtash Lakra
+#
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Union
+
+from framework.logger import getLogger
+
+logger = getLogger(__name__)
+
+# the hex digest of the SHA-256 hash
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass(frozen=True)
+class Blob(object):
+    """Blob represents the metadata of a stored content"""
+
+    # the hex digest of the content's SHA-256 hash i.e. the blob's address
+    sha256: str
+    # in bytes
+    size: int
+    # False when an identical content was already stored (deduplicated)
+    created: bool = True
+
+
+class BlobStore(object):
+    """BlobStore is a local filesystem content-addressed store of the blobs keyed by their SHA-256 hash.
+
+    The contents are streamed in chunks to a temp file while hashed, so the memory of a write is constant (a chunk)
+    whatever the content's size, and then atomically renamed to '<root>/<ab>/<cd>/<sha256>'. The identical contents
+    are stored once, the later writes discard their temp file.
+    """
+
+    # 1 MiB
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, rootPath: Union[str, Path], chunkSize: int = CHUNK_SIZE):
+        if chunkSize <= 0:
+            raise ValueError(f"Invalid chunkSize={chunkSize}!")
+        # absolute, the relative paths are resolved by the current directory not by the (flask) app's root path
+        self.rootPath = Path(rootPath).absolute()
+        self.chunkSize = chunkSize
+
+    def path(self, sha256: str) -> Path:
+        """Returns the path of the blob's content"""
+        if not sha256 or not SHA256_PATTERN.match(sha256):
+            raise ValueError(f"Invalid sha256={sha256}!")
+
+        return self.rootPath.joinpath(sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        """Returns True if the blob's content is stored otherwise False"""
+        return self.path(sha256).is_file()
+
+    def write(self, stream: BinaryIO) -> Blob:
+        """Streams the content of the stream in chunks to the store and returns its blob"""
+        logger.debug(lambda: f"+write({stream})")
+        tempPath = self.rootPath.joinpath("tmp")
+        tempPath.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        tempFd, tempName = tempfile.mkstemp(dir=tempPath)
+        try:
+            with os.fdopen(tempFd, "wb") as tempFile:
+                while chunk := stream.read(self.chunkSize):
+                    digest.update(chunk)
+                    tempFile.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            blobPath = self.path(sha256)
+            created = not blobPath.is_file()
+            if created:
+                blobPath.parent.mkdir(parents=True, exist_ok=True)
+                # atomic, the concurrent writes of the same content replace it with the identical bytes
+                os.replace(tempName, blobPath)
+        finally:
+            if os.path.exists(tempName):
+                os.remove(tempName)
+
+        blob = Blob(sha256=sha256, size=size, created=created)
+        logger.debug(lambda: f"-write(), blob={blob}")
+        return blob
+
+    def open(self, sha256: str) -> BinaryIO:
+        """Opens the blob's content for reading"""
+        return self.path(sha256).open("rb")
+
+    def delete(self, sha256: str) -> bool:
+        """Deletes the blob's content and returns True if it was stored otherwise False.
+
+        The blobs are shared by the identical contents, the caller must ensure no metadata references the blob.
+        """
+        try:
+            self.path(sha256).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return f"{self.__class__.__name__} <rootPath={self.rootPath}, chunkSize={self.chunkSize}>"
+
+    def __repr__(self) -> str:
+        """Returns the string representation of this object"""
+        return str(self)
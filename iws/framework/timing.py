@@ -0,0 +1,165 @@
+#
+# Author: Rohtash Lakra
+# Reference(s):
+#  - https://www.w3.org/TR/server-timing/
+#  - https://docs.sqlalchemy.org/en/20/faq/performance.html#query-profiling
+#
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import Engine, event
+
+from framework.logger import getLogger
+from framework.orm.sqlalchemy.schema import AbstractSchema
+
+logger = getLogger(__name__)
+
+# the key of the request's timings in the 'g'
+TIMINGS_KEY = "requestTimings"
+# the key of the DB statement's start time in the connection's info
+STATEMENT_START_KEY = "statementStartTimes"
+
+
+class RequestTimings(object):
+    """RequestTimings collects the durations (in seconds) of the phases (i.e. db, auth, serialize) of a request, the
+    DB statements it executed and the ORM objects loaded (or refreshed) from their rows.
+    """
+
+    __slots__ = ("startTime", "durations", "statements", "ormLoads")
+
+    def __init__(self):
+        self.startTime = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.statements = 0
+        self.ormLoads = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        """Adds the duration of the phase"""
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Returns the wall time since the request started"""
+        return time.perf_counter() - self.startTime
+
+    def toServerTiming(self, total: float) -> str:
+        """Returns the value of the 'Server-Timing' header, the durations are in milliseconds"""
+        metrics = [f"total;dur={total * 1000:.2f}"]
+        for name, seconds in self.durations.items():
+            if name == "db":
+                # the duration is of the statements' execution only, not of fetching their rows
+                metrics.append(f'db;dur={seconds * 1000:.2f};'
+                               f'desc="execution of {self.statements} statements, {self.ormLoads} ORM loads"')
+            else:
+                metrics.append(f"{name};dur={seconds * 1000:.2f}")
+
+        return ", ".join(metrics)
+
+    def toLogFields(self, total: float) -> dict:
+        """Returns the structured log fields, the durations are in milliseconds"""
+        fields = {"total_ms": round(total * 1000, 2), "db_statements": self.statements,
+                  "db_orm_loads": self.ormLoads}
+        for name, seconds in self.durations.items():
+            fields[f"{name}_ms"] = round(seconds * 1000, 2)
+
+        return fields
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{type(self).__name__} <durations={self.durations}, statements={self.statements}, "
+                f"ormLoads={self.ormLoads}>")
+
+
+def currentTimings() -> Optional[RequestTimings]:
+    """Returns the timings of the current request, if instrumented otherwise None"""
+    return g.get(TIMINGS_KEY) if has_request_context() else None
+
+
+@contextmanager
+def timed(name: str):
+    """Adds the duration of the block to the current request's phase"""
+    timings = currentTimings()
+    if timings is None:
+        yield
+        return
+
+    startTime = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - startTime)
+
+
+def _beforeCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(STATEMENT_START_KEY, []).append(time.perf_counter())
+
+
+def _afterCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    startTimes = conn.info.get(STATEMENT_START_KEY)
+    if not startTimes:
+        return
+
+    elapsed = time.perf_counter() - startTimes.pop()
+    timings = currentTimings()
+    if timings is not None:
+        timings.add("db", elapsed)
+        timings.statements += 1
+
+
+def _onLoad(target, context, attrs=None):
+    timings = currentTimings()
+    if timings is not None:
+        timings.ormLoads += 1
+
+
+class ServerTiming(object):
+    """ServerTiming instruments the requests: the wall time, the DB time (with the count of the statements and the
+    ORM loads, by the engine's and the schemas' events) and the phases timed with 'timed()' (i.e. auth and serialize)
+    are emitted as the 'Server-Timing' header and as the structured log fields (i.e. 'server_timing').
+
+    The DB time covers the statements' execution only (the cursor's 'execute'), not the fetching of their rows. The
+    ORM loads count the schema objects loaded ('load') or refreshed ('refresh', i.e. 'populate_existing') from the
+    rows, so the rows of the Core and 'text()' statements aren't counted.
+    """
+
+    def __init__(self, app: Flask = None, engine: Engine = None):
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app: Flask, engine: Engine = None) -> None:
+        """Registers the request's hooks and the engine's events"""
+        logger.debug(lambda: f"+init_app({app}, {engine})")
+        if engine is not None and not event.contains(engine, "before_cursor_execute", _beforeCursorExecute):
+            event.listen(engine, "before_cursor_execute", _beforeCursorExecute)
+            event.listen(engine, "after_cursor_execute", _afterCursorExecute)
+
+        # the ORM objects loaded (new in the session) or refreshed (already in the session) from the rows
+        for name in ("load", "refresh"):
+            if not event.contains(AbstractSchema, name, _onLoad):
+                event.listen(AbstractSchema, name, _onLoad, propagate=True)
+
+        app.before_request(self.beforeRequest)
+        app.after_request(self.afterRequest)
+        app.teardown_request(self.teardownRequest)
+        logger.debug(lambda: f"-init_app()")
+
+    @staticmethod
+    def beforeRequest() -> None:
+        setattr(g, TIMINGS_KEY, RequestTimings())
+
+    @staticmethod
+    def afterRequest(response: Response) -> Response:
+        timings = currentTimings()
+        if timings is not None:
+            total = timings.elapsed()
+            response.headers["Server-Timing"] = timings.toServerTiming(total)
+            fields = timings.toLogFields(total)
+            logger.info(lambda: f"{request.method} {request.path} {response.status_code} {fields}",
+                        extra={"server_timing": fields})
+
+        return response
+
+    @staticmethod
+    def teardownRequest(exception: BaseException = None) -> None:
+        g.pop(TIMINGS_KEY, None)
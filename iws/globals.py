@@ -1,7 +1,23 @@
 #
 # Author: Rohtash Lakra
 #
+from common.config import Config
 from framework.db.connector import SQLite3Connector
+from framework.db.session import RequestScopedSession
+from framework.metrics import MetricsRegistry
+from framework.security.authorization import GrantCache
+from framework.security.principal import PrincipalCache
+from framework.storage import BlobStore
 
 # global connector object
 connector = SQLite3Connector()
+# global request-scoped session (unit-of-work) object
+requestSession = RequestScopedSession()
+# global authenticated-principal cache object
+principalCache = PrincipalCache(maxSize=Config.AUTH_CACHE_SIZE, ttl=Config.AUTH_CACHE_TTL)
+# global compiled-grants (roles and permissions) cache object
+grantCache = GrantCache(maxSize=Config.AUTH_CACHE_SIZE, ttl=Config.AUTH_CACHE_TTL)
+# global content-addressed blob store object
+blobStore = BlobStore(Config.BLOB_STORE_PATH, chunkSize=Config.BLOB_CHUNK_SIZE)
+# global metrics registry object
+metrics = MetricsRegistry(Config.METRICS_DIR)
@@ -66,6 +66,26 @@ loglevel = 'debug'
 # Redirect stdout/stderr to specified file in errorlog.
 capture_output = True
 
+# The directory shared by the workers to aggregate their metrics, see 'MetricsRegistry'.
+metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    """Removes the previous run's metrics, so the counters restart with the server (but not with a worker)."""
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for file_name in os.listdir(metrics_dir):
+            if file_name.startswith("metrics-") and file_name.endswith(".json"):
+                os.remove(os.path.join(metrics_dir, file_name))
+
+
+def worker_exit(server, worker):
+    """Flushes the worker's last metrics (throttled since its last flush) before it exits."""
+    if metrics_dir:
+        from framework.metrics import flushRegistries
+        flushRegistries()
+
+
 # data to log as json
 log_data = {
     "loglevel": loglevel,
@@ -75,6 +95,7 @@ log_data = {
     "timeout": timeout,
     "errorlog": errorlog,
     "accesslog": accesslog,
+    "metrics_dir": metrics_dir,
     # Additional, non-gunicorn variables
 }
 print(json.dumps(log_data))
@@ -4,12 +4,13 @@
 #
 import json
 import time
-from io import BytesIO
 
-from flask import current_app, render_template, request, redirect, send_file
+from flask import abort, current_app, render_template, request, redirect, send_file
 
+from framework.exception import RecordNotFoundException
+from globals import blobStore
 from post.v1 import bp as bp_v1_posts
-from rest.post.schema import Document
+from rest.post.service import DocumentService
 
 
 @bp_v1_posts.get("/")
@@ -55,15 +56,13 @@ def upload():
     print(f"request.method={request.method}")
     if request.method == 'POST':
         file = request.files['file']
-        file_data = file.read()
-        # post = Post(title=file.filename, author=file.filename)
-        # attachment = Attachment(post=post, filename=file.filename, data=file_data)
-        # post.addAttachment(attachment)
-        # connector.save(post)
-        document = Document(filename=file.filename, data=file_data)
-        # connector.save(document)
+        # streamed in chunks to the blob store, the content is never fully read into the memory
+        document = DocumentService().upload(file.stream, file.filename, file.mimetype)
         upload_metadata = {
-            "message": f'Uploaded: {file.filename}'
+            "message": f'Uploaded: {file.filename}',
+            "id": document.id,
+            "sha256": document.sha256,
+            "size": document.size,
         }
         # return f'Uploaded: {file.filename}'
         return render_template('post/index.html', upload_metadata=upload_metadata)
@@ -71,7 +70,25 @@ def upload():
     return render_template('post/upload_file.html')
 
 
-@bp_v1_posts.route('/download/<upload_id>')
-def download(upload_id):
-    document = Document.query.filter_by(id=upload_id).first()
-    return send_file(BytesIO(document.data), download_name=document.filename, as_attachment=True)
+@bp_v1_posts.route('/download/<int:upload_id>')
+def download(upload_id: int):
+    """Downloads the document's content from the blob store.
+
+    The file is passed (not its bytes) to the server's 'wsgi.file_wrapper' (i.e. sendfile) or to the front server
+    with 'USE_X_SENDFILE'. The content's hash is its strong ETag, so the conditional requests are answered with
+    '304 Not Modified' and the (If-)Range requests with '206 Partial Content' to resume the large downloads.
+    """
+    try:
+        document = DocumentService().findById(upload_id)
+    except RecordNotFoundException as ex:
+        abort(404, description=ex.messages[0] if ex.messages else None)
+
+    if not blobStore.exists(document.sha256):
+        current_app.logger.error(f"The content of document={document.id} is missing, sha256={document.sha256}")
+        abort(404, description=f"The content of the document with id={upload_id} doesn't exist!")
+
+    response = send_file(blobStore.path(document.sha256), mimetype=document.mime_type,
+                         download_name=document.filename, as_attachment=True, conditional=True, etag=document.sha256)
+    # advertised on the full responses too, so the clients know the download can be resumed
+    response.accept_ranges = "bytes"
+    return response
@@ -1,12 +1,17 @@
 import functools
 import logging
+from typing import FrozenSet, Optional
 
 from flask import request, make_response, Response
 
-from framework.exception import AuthenticationException
+from framework.exception import AuthenticationException, AuthorizationException
 from framework.http import HTTPStatus
 from framework.orm.pydantic.model import ResponseModel
+from framework.security.authorization import Names, toNames
 from framework.security.jwt import TokenTypeEnum
+from framework.timing import timed
+from globals import principalCache
+from rest.role.service import RoleService
 from rest.user.service import UserService
 
 logger = logging.getLogger(__name__)
@@ -14,44 +19,72 @@ logger = logging.getLogger(__name__)
 
 def authErrorResponse(message: str = None) -> Response:
     logger.error(f'httpStatus={HTTPStatus.UNAUTHORIZED}, message={message}')
-    authException = AuthenticationException(HTTPStatus.UNAUTHORIZED, messages=[message])
+    authException = AuthenticationException(messages=[message])
     response = ResponseModel.buildResponseWithException(authException)
     return make_response(response.to_json(), response.status)
 
 
-# TODO- validate token expiry
-def auth(func_name=None, role=None):
+def forbiddenResponse(message: str = None) -> Response:
+    logger.error(f'httpStatus={HTTPStatus.FORBIDDEN}, message={message}')
+    response = ResponseModel.buildResponseWithException(AuthorizationException(messages=[message]))
+    return make_response(response.to_json(), response.status)
+
+
+def auth(func_name=None, role: Names = None, permission: Names = None):
+    """Authenticates the request's bearer token and, if required, authorizes the user to have any of the role(s)
+    and all the permission(s). The user's roles and permissions are compiled once (see 'RoleService.findGrants'), so
+    the check is a set lookup."""
     assert callable(func_name) or func_name is None
+    roles = toNames(role)
+    permissions = toNames(permission)
 
     def _decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            bearer_token = request.headers.get('Authorization', None)
-            # validate request contains bearer token
-            if not bearer_token:
-                return authErrorResponse('Missing Bearer Token in the request!')
-
-            # validate the token is valid
-            try:
-                auth_token = parse_bearer_token(bearer_token)
-            except ValueError as ex:
-                return authErrorResponse("Invalid Token!")
-
-            userService = UserService()
-            userObject = userService.authenticate(TokenTypeEnum.AUTH, auth_token)
-            logger.debug(f"userObject={userObject}")
-            if userObject and userObject.isAuthenticated():
-                logger.debug(f"AUTH userObject={userObject}")
-                return func(*args, **kwargs)
+            with timed("auth"):
+                errorResponse = authorize(roles, permissions)
 
-            # if reaches here, always throw an error
-            return authErrorResponse(HTTPStatus.UNAUTHORIZED.name)
+            return errorResponse if errorResponse is not None else func(*args, **kwargs)
 
         return wrapper
 
     return _decorator(func_name) if callable(func_name) else _decorator
 
 
+def authorize(roles: FrozenSet[str], permissions: FrozenSet[str]) -> Optional[Response]:
+    """Returns the error response if the request isn't authenticated or authorized otherwise None"""
+    bearer_token = request.headers.get('Authorization', None)
+    # validate request contains bearer token
+    if not bearer_token:
+        return authErrorResponse('Missing Bearer Token in the request!')
+
+    # validate the token is valid
+    try:
+        auth_token = parse_bearer_token(bearer_token)
+    except ValueError as ex:
+        return authErrorResponse("Invalid Token!")
+
+    # a cached principal is authenticated without building the service (no crypto and database lookups)
+    userObject = principalCache.getPrincipal(auth_token)
+    if userObject is None:
+        userService = UserService()
+        try:
+            userObject = userService.authenticate(TokenTypeEnum.AUTH, auth_token)
+        except AuthenticationException as ex:
+            return authErrorResponse(ex.messages[-1] if ex.messages else None)
+
+    logger.debug(f"userObject={userObject}")
+    if userObject and userObject.isAuthenticated():
+        logger.debug(f"AUTH userObject={userObject}")
+        if (roles or permissions) and not RoleService().findGrants(userObject.id).allows(roles, permissions):
+            return forbiddenResponse(HTTPStatus.FORBIDDEN.name)
+
+        return None
+
+    # if reaches here, always throw an error
+    return authErrorResponse(HTTPStatus.UNAUTHORIZED.name)
+
+
 def parse_bearer_token(auth_header):
     """
     Parses the bearer token from an Authorization header.
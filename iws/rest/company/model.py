@@ -1,16 +1,15 @@
 #
 # Author: Rohtash Lakra
 #
-
-import logging
 from typing import Optional, List, Any
 
 from pydantic import model_validator
 from typing_extensions import Self
 
+from framework.logger import getLogger
 from framework.orm.pydantic.model import NamedModel
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class Company(NamedModel):
@@ -25,18 +24,18 @@ class Company(NamedModel):
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     @model_validator(mode="before")
     @classmethod
     def preValidator(cls, values: Any) -> Any:
-        logger.debug(f"preValidator({values})")
+        logger.debug(lambda: f"preValidator({values})")
         return values
 
     @model_validator(mode="after")
     def postValidator(self, values) -> Self:
-        logger.debug(f"postValidator({values})")
+        logger.debug(lambda: f"postValidator({values})")
         return self
 
     def __str__(self) -> str:
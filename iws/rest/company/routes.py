@@ -10,6 +10,7 @@ from flask import make_response, request
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import ResponseModel
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from rest.company.model import Company
@@ -90,18 +91,16 @@ def get():
     logger.debug(f"+get() => request={request}, args={request.args}, is_json:{request.is_json}")
     try:
         companyService = CompanyService()
-        # if len(request.args) == 1:
-        #     return companyService.findById(request.args.get('id'))
-        # else:
-        #     companies = companyService.findByFilter(request.args)
-        companies = companyService.findByFilter(request.args)
+        pageRequest, filters = PageRequest.fromFilters(request.args)
+        page = companyService.findPage(filters, pageRequest)
 
         # build success response
         response = ResponseModel.buildResponse(HTTPStatus.OK)
-        if companies:
-            response.addInstances(companies)
-        else:
+        response.addPage(page)
+        if not page.items:
             response.message = "No Records Exist!"
+    except ValidationException as ex:
+        response = ResponseModel.buildResponseWithException(ex)
     except Exception as ex:
         response = ResponseModel.buildResponse(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(ex), exception=ex)
 
@@ -21,8 +21,8 @@ class CompanySchema(NamedSchema):
     parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("companies.id"))
 
     # not Optional[], therefore will be NOT NULL
-    # the parent and its immediate child collection or reference can be populated from a single SQL statement
-    branches: Mapped[List[Optional["CompanySchema"]]] = relationship("CompanySchema", lazy="joined", join_depth=2)
+    # the immediate branches of the companies are populated with one additional 'SELECT ... IN' statement
+    branches: Mapped[List[Optional["CompanySchema"]]] = relationship("CompanySchema", lazy="selectin", join_depth=1)
 
     # not Optional[], therefore will be NOT NULL
     active: Mapped[bool] = mapped_column(unique=False, default=False)
@@ -1,12 +1,14 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from typing import List, Optional, Dict, Any
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import BaseModel
+from framework.orm.sqlalchemy.repository import LoadPlan, LoadStrategy
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from framework.service import AbstractService
 from rest.company.mapper import CompanyMapper
@@ -14,18 +16,21 @@ from rest.company.model import Company
 from rest.company.repository import CompanyRepository
 from rest.company.schema import CompanySchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class CompanyService(AbstractService):
 
+    # the relationships loaded for the companies listing (only the immediate branches are mapped)
+    LIST_LOAD_PLAN = {"branches": LoadStrategy.SELECTIN}
+
     def __init__(self):
         logger.debug("CompanyService()")
         super().__init__()
         self.repository = CompanyRepository()
 
     def validate(self, operation: SchemaOperation, company: Company) -> None:
-        logger.debug(f"+validate({operation}, {company})")
+        logger.debug(lambda: f"+validate({operation}, {company})")
         # super().validate(operation, company)
         error_messages = []
 
@@ -46,37 +51,41 @@ class CompanyService(AbstractService):
         # throw an error if any validation error
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validate()")
+        logger.debug(lambda: f"-validate()")
 
     def findById(self, id: int) -> Company:
         return CompanyMapper.fromSchema(self.repository.findById(CompanySchema, id))
 
     # @override
-    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[BaseModel]]:
-        logger.debug(f"+findByFilter({filters})")
-        companySchemas = self.repository.filter(filters)
-        companyModels = []
-        for companySchema in companySchemas:
-            roleModel = CompanyMapper.fromSchema(companySchema)
-            companyModels.append(roleModel)
-
-        logger.debug(f"-findByFilter(), companyModels={companyModels}")
+    def findByFilter(self, filters: Dict[str, Any], loadPlan: LoadPlan = LIST_LOAD_PLAN,
+                     pageRequest: PageRequest = None) -> List[Optional[BaseModel]]:
+        logger.debug(lambda: f"+findByFilter({filters}, {loadPlan}, {pageRequest})")
+        companySchemas = self.repository.filter(filters, loadPlan, pageRequest)
+        companyModels = CompanyMapper.fromSchemas(companySchemas)
+        logger.debug(lambda: f"-findByFilter(), companyModels={companyModels}")
         return companyModels
 
     # @override
     def existsByFilter(self, filters: Dict[str, Any]) -> bool:
         """Returns True if the records exist by filter otherwise False"""
-        logger.debug(f"+existsByFilter({filters})")
-        companySchemas = self.repository.filter(filters)
-        result = True if companySchemas else False
-        logger.debug(f"-existsByFilter(), result={result}")
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.repository.exists(CompanySchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records matching the filter"""
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.repository.count(CompanySchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
         return result
 
     def validates(self, operation: SchemaOperation, roles: List[Company]) -> None:
-        logger.debug(f"+validates({operation}, {roles})")
+        logger.debug(lambda: f"+validates({operation}, {roles})")
         error_messages = []
 
         # validate the object
@@ -89,14 +98,14 @@ class CompanyService(AbstractService):
         # throw an error if any validation error
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validates()")
+        logger.debug(lambda: f"-validates()")
 
     def create(self, company: Company) -> Company:
         """Crates a new company"""
-        logger.debug(f"+create({company})")
+        logger.debug(lambda: f"+create({company})")
         if self.existsByFilter({"name": company.name}):
             raise DuplicateRecordException(HTTPStatus.CONFLICT, f"[{company.name}] company already exists!")
 
@@ -107,23 +116,23 @@ class CompanyService(AbstractService):
             companySchema = self.repository.filter({"name": company.name})
 
         company = CompanyMapper.fromSchema(companySchema)
-        logger.debug(f"-create(), company={company}")
+        logger.debug(lambda: f"-create(), company={company}")
         return company
 
     def bulkCreate(self, roles: List[Company]) -> List[Company]:
         """Crates a new company"""
-        logger.debug(f"+bulkCreate({roles})")
+        logger.debug(lambda: f"+bulkCreate({roles})")
         results = []
         for company in roles:
             result = self.create(company)
             results.append(result)
 
-        logger.debug(f"-bulkCreate(), results={results}")
+        logger.debug(lambda: f"-bulkCreate(), results={results}")
         return results
 
     def update(self, company: Company) -> Company:
         """Updates the company"""
-        logger.debug(f"+update({company})")
+        logger.debug(lambda: f"+update({company})")
         # self.validate(SchemaOperation.UPDATE, company)
         # check record exists by id
         if not self.existsByFilter({"id": company.id}):
@@ -148,11 +157,11 @@ class CompanyService(AbstractService):
         # companySchema = self.repository.update(mapper=CompanySchema, mappings=[companySchema])
         companySchema = self.repository.filter({"id": company.id})[0]
         company = CompanyMapper.fromSchema(companySchema)
-        logger.debug(f"-update(), company={company}")
+        logger.debug(lambda: f"-update(), company={company}")
         return company
 
     def delete(self, id: int) -> None:
-        logger.debug(f"+delete({id})")
+        logger.debug(lambda: f"+delete({id})")
         # check record exists by id
         filter = {"id": id}
         if self.existsByFilter(filter):
@@ -160,4 +169,4 @@ class CompanyService(AbstractService):
         else:
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, ["Company doesn't exist!"])
 
-        logger.debug(f"-delete()")
+        logger.debug(lambda: f"-delete()")
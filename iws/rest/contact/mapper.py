@@ -1,7 +1,7 @@
 #
 # Author: Rohtash Lakra
 #
-from framework.orm.mapper import Mapper
+from framework.orm.mapper import Mapper, SchemaMapper
 from framework.orm.pydantic.model import BaseModel
 from framework.orm.sqlalchemy.schema import BaseSchema
 from rest.contact.model import Contact
@@ -10,10 +10,13 @@ from rest.contact.schema import ContactSchema
 
 class ContactMapper(Mapper):
 
+    # the compiled mapper of the (trusted) database rows
+    SCHEMA_MAPPER = SchemaMapper(ContactSchema, Contact)
+
     @classmethod
     def fromSchema(cls, schemaObject: ContactSchema) -> Contact:
         # logger.debug(f"+fromSchema(), schemaObject={schemaObject}")
-        return Contact(**schemaObject.toJSONObject())
+        return cls.SCHEMA_MAPPER.fromSchema(schemaObject)
 
     @classmethod
     def fromModel(cls, modelObject: Contact) -> ContactSchema:
@@ -22,7 +25,7 @@ class ContactMapper(Mapper):
 
     @classmethod
     def fromSchemas(cls, schemaObjects: list[BaseSchema]) -> list[BaseModel]:
-        return [ContactMapper.fromSchema(schemaObject) for schemaObject in schemaObjects]
+        return cls.SCHEMA_MAPPER.fromSchemas(schemaObjects)
 
     @classmethod
     def fromModels(cls, modelObjects: list[BaseModel]) -> list[BaseSchema]:
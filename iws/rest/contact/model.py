@@ -1,15 +1,15 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from typing import Any
 
 from pydantic import model_validator
 from typing_extensions import Self
 
+from framework.logger import getLogger
 from framework.orm.pydantic.model import BaseModel
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class Contact(BaseModel):
@@ -23,12 +23,12 @@ class Contact(BaseModel):
     @model_validator(mode="before")
     @classmethod
     def preValidator(cls, values: Any) -> Any:
-        logger.debug(f"preValidator({values})")
+        logger.debug(lambda: f"preValidator({values})")
         return values
 
     @model_validator(mode="after")
     def postValidator(self, values) -> Self:
-        logger.debug(f"postValidator({values})")
+        logger.debug(lambda: f"postValidator({values})")
         return self
 
     def __str__(self) -> str:
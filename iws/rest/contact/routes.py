@@ -10,6 +10,7 @@ from flask import make_response, request
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import ResponseModel
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from rest.contact.model import Contact
@@ -93,14 +94,16 @@ def get():
     logger.debug(f"+get() => request={request}, args={request.args}, is_json:{request.is_json}")
     try:
         contactService = ContactService()
-        roles = contactService.findByFilter(request.args)
+        pageRequest, filters = PageRequest.fromFilters(request.args)
+        page = contactService.findPage(filters, pageRequest)
 
         # build success response
         response = ResponseModel.buildResponse(HTTPStatus.OK)
-        if roles:
-            response.addInstances(roles)
-        else:
+        response.addPage(page)
+        if not page.items:
             response.message = "No Records Exist!"
+    except ValidationException as ex:
+        response = ResponseModel.buildResponseWithException(ex)
     except Exception as ex:
         response = ResponseModel.buildResponse(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(ex), exception=ex)
 
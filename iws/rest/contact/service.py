@@ -1,19 +1,21 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from typing import List, Optional, Dict, Any
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import BaseModel
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from framework.service import AbstractService
 from rest.contact.mapper import ContactMapper
 from rest.contact.model import Contact
 from rest.contact.repository import ContactRepository
+from rest.contact.schema import ContactSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class ContactService(AbstractService):
@@ -24,7 +26,7 @@ class ContactService(AbstractService):
         self.repository = ContactRepository()
 
     def validate(self, operation: SchemaOperation, contact: Contact) -> None:
-        logger.debug(f"+validate({operation}, {contact})")
+        logger.debug(lambda: f"+validate({operation}, {contact})")
         # super().validate(operation, contact)
         errorMessages = []
 
@@ -51,34 +53,37 @@ class ContactService(AbstractService):
         # throw an error if any validation error
         if errorMessages and len(errorMessages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=errorMessages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validate()")
+        logger.debug(lambda: f"-validate()")
 
     # @override
-    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[BaseModel]]:
-        logger.debug(f"+findByFilter({filters})")
-        contactSchemas = self.repository.filter(filters)
-        contactModels = []
-        for contactSchema in contactSchemas:
-            contactModel = ContactMapper.fromSchema(contactSchema)
-            contactModels.append(contactModel)
-
-        logger.debug(f"-findByFilter(), contactModels={contactModels}")
+    def findByFilter(self, filters: Dict[str, Any], pageRequest: PageRequest = None) -> List[Optional[BaseModel]]:
+        logger.debug(lambda: f"+findByFilter({filters}, {pageRequest})")
+        contactSchemas = self.repository.filter(filters, pageRequest)
+        contactModels = ContactMapper.fromSchemas(contactSchemas)
+        logger.debug(lambda: f"-findByFilter(), contactModels={contactModels}")
         return contactModels
 
     # @override
     def existsByFilter(self, filters: Dict[str, Any]) -> bool:
         """Returns True if the records exist by filter otherwise False"""
-        logger.debug(f"+existsByFilter({filters})")
-        contactSchemas = self.repository.filter(filters)
-        result = True if contactSchemas else False
-        logger.debug(f"-existsByFilter(), result={result}")
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.repository.exists(ContactSchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records matching the filter"""
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.repository.count(ContactSchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
         return result
 
     def validates(self, operation: SchemaOperation, contacts: List[Contact]) -> None:
-        logger.debug(f"+validates({operation}, {contacts})")
+        logger.debug(lambda: f"+validates({operation}, {contacts})")
         errorMessages = []
 
         # validate the object
@@ -91,14 +96,14 @@ class ContactService(AbstractService):
         # throw an error if any validation error
         if errorMessages and len(errorMessages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=errorMessages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validates()")
+        logger.debug(lambda: f"-validates()")
 
     def create(self, contact: Contact) -> Contact:
         """Crates a new contact"""
-        logger.debug(f"+create({contact})")
+        logger.debug(lambda: f"+create({contact})")
         if self.existsByFilter({"subject": contact.subject}):
             raise DuplicateRecordException(HTTPStatus.CONFLICT, f"[{contact.subject}] contact already exists!")
 
@@ -109,23 +114,23 @@ class ContactService(AbstractService):
             contactSchema = self.repository.filter({"subject": contact.subject})
 
         contact = ContactMapper.fromSchema(contactSchema)
-        logger.debug(f"-create(), contact={contact}")
+        logger.debug(lambda: f"-create(), contact={contact}")
         return contact
 
     def bulkCreate(self, contacts: List[Contact]) -> List[Contact]:
         """Crates a new contact"""
-        logger.debug(f"+bulkCreate({contacts})")
+        logger.debug(lambda: f"+bulkCreate({contacts})")
         results = []
         for contact in contacts:
             result = self.create(contact)
             results.append(result)
 
-        logger.debug(f"-bulkCreate(), results={results}")
+        logger.debug(lambda: f"-bulkCreate(), results={results}")
         return results
 
     def update(self, contact: Contact) -> Contact:
         """Updates the contact"""
-        logger.debug(f"+update({contact})")
+        logger.debug(lambda: f"+update({contact})")
         if not self.existsByFilter({"id": contact.id}):
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, "Contact doesn't exist!")
 
@@ -146,11 +151,11 @@ class ContactService(AbstractService):
         self.repository.update(contactSchema)
         contactSchema = self.repository.filter({"id": contact.id})[0]
         contact = ContactMapper.fromSchema(contactSchema)
-        logger.debug(f"-update(), contact={contact}")
+        logger.debug(lambda: f"-update(), contact={contact}")
         return contact
 
     def delete(self, id: int) -> None:
-        logger.debug(f"+delete({id})")
+        logger.debug(lambda: f"+delete({id})")
         # check record exists by id
         filter = {"id": id}
         if self.existsByFilter(filter):
@@ -158,4 +163,4 @@ class ContactService(AbstractService):
         else:
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, "Contact doesn't exist!")
 
-        logger.debug(f"-delete()")
+        logger.debug(lambda: f"-delete()")
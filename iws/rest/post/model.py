@@ -0,0 +1,28 @@
+#
+# Author: Rohtash Lakra
+#
+from typing import Optional
+
+from framework.logger import getLogger
+from framework.orm.pydantic.model import BaseModel
+
+logger = getLogger(__name__)
+
+
+class SearchResult(BaseModel):
+    """SearchResult represents a post or a comment matching a search, the 'id' is of the post or the comment"""
+
+    # i.e. 'post' or 'comment'
+    kind: str = None
+    post_id: int = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    # the best matching fragment with the matched words highlighted
+    snippet: Optional[str] = None
+    # bm25 score (comparable within its kind only), the lower the better
+    rank: float = None
+
+    def __str__(self) -> str:
+        """Returns the string representation of this object"""
+        return (f"{self.getClassName()} <kind={self.kind}, id={self.id}, post_id={self.post_id}, title={self.title}, "
+                f"rank={self.rank}>")
@@ -0,0 +1,106 @@
+#
+# Author: Rohtash Lakra
+#
+import html
+from itertools import zip_longest
+from typing import List, Optional, Dict, Any
+
+from sqlalchemy import text, Row
+
+from framework.logger import getLogger
+from framework.orm.sqlalchemy.repository import SqlAlchemyRepository
+from globals import connector
+from rest.post.schema import Document, PostSchema
+
+logger = getLogger(__name__)
+
+# the highlight of the matched words and the max. words of the snippets, the FTS5 marks the matches with the
+# control characters, which are replaced with the HTML highlight after the snippet's text is escaped
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_WORDS = 16
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# 'ORDER BY rank LIMIT n' is sorted by the FTS5 (no sorter), the snippets are built for the 'n' rows only
+SEARCH_POSTS = text(f"""
+SELECT 'post' AS kind, posts.id AS id, posts.id AS post_id, posts.title AS title, posts.author AS author,
+       snippet(posts_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '...', {SNIPPET_WORDS}) AS snippet,
+       posts_fts.rank AS rank, posts.created_at AS created_at, posts.updated_at AS updated_at
+FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+WHERE posts_fts MATCH :query
+ORDER BY posts_fts.rank
+LIMIT :limit
+""")
+
+SEARCH_COMMENTS = text(f"""
+SELECT 'comment' AS kind, comments.id AS id, comments.post_id AS post_id, posts.title AS title,
+       posts.author AS author,
+       snippet(comments_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '...', {SNIPPET_WORDS}) AS snippet,
+       comments_fts.rank AS rank, comments.created_at AS created_at, comments.updated_at AS updated_at
+FROM comments_fts JOIN comments ON comments.id = comments_fts.rowid JOIN posts ON posts.id = comments.post_id
+WHERE comments_fts MATCH :query
+ORDER BY comments_fts.rank
+LIMIT :limit
+""")
+
+
+class PostRepository(SqlAlchemyRepository):
+    """The PostRepository handles a schema-centric database persistence for posts and their full-text search."""
+
+    def __init__(self):
+        super().__init__(engine=connector.engine)
+
+    # @override
+    def filter(self, filters: Dict[str, Any]) -> List[Optional[PostSchema]]:
+        """Returns records by filter or empty list"""
+        logger.debug(lambda: f"+filter({filters})")
+        posts = self.findAll(PostSchema, filters)
+        logger.debug(lambda: f"-filter(), posts={posts}")
+        return posts
+
+    def search(self, query: str, limit: int, comments: bool = True) -> List[Row]:
+        """Returns the best 'limit' posts (and comments) matching the FTS5 query.
+
+        Each kind is ranked (by its bm25 'rank') and limited by its own index. The bm25 scores of the posts and the
+        comments aren't comparable (the indexes have their own column weights and term statistics), so the kinds are
+        interleaved by their position within the kind (i.e. best post, best comment, 2nd best post, ...) instead of
+        being merged by the score.
+        """
+        logger.debug(lambda: f"+search({query}, {limit}, {comments})")
+        statements = [SEARCH_POSTS, SEARCH_COMMENTS] if comments else [SEARCH_POSTS]
+        with self.openSession() as session:
+            try:
+                kinds = [session.execute(statement, {"query": query, "limit": limit}).all() for statement in statements]
+            except Exception as ex:
+                logger.error(f"Exception while searching posts! Error={ex}")
+                session.rollback()
+                raise ex
+
+        rows = [row for position in zip_longest(*kinds) for row in position if row is not None][:limit]
+        logger.debug(lambda: f"-search(), rows={len(rows)}")
+        return rows
+
+    @staticmethod
+    def highlight(snippet: Optional[str]) -> Optional[str]:
+        """Returns the HTML-escaped snippet with its matched words highlighted"""
+        if snippet is None:
+            return None
+
+        return html.escape(snippet).replace(SNIPPET_START, HIGHLIGHT_START).replace(SNIPPET_END, HIGHLIGHT_END)
+
+
+class DocumentRepository(SqlAlchemyRepository):
+    """The DocumentRepository handles a schema-centric database persistence for the documents' metadata."""
+
+    def __init__(self):
+        super().__init__(engine=connector.engine)
+
+    # @override
+    def filter(self, filters: Dict[str, Any]) -> List[Optional[Document]]:
+        """Returns records by filter or empty list"""
+        logger.debug(lambda: f"+filter({filters})")
+        documents = self.findAll(Document, filters)
+        logger.debug(lambda: f"-filter(), documents={documents}")
+        return documents
+
@@ -5,11 +5,19 @@
 # - https://flask.palletsprojects.com/en/2.3.x/tutorial/views/#require-authentication-in-other-views
 #
 
-from flask import request, current_app
+from flask import abort, request, current_app, make_response
 
+from framework.exception import ValidationException
+from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
+from framework.orm.pydantic.model import ResponseModel
 from rest.post.schema import PostSchema
+from rest.post.service import PostService
 from rest.post.v1 import bp as bp_post_v1
 
+logger = getLogger(__name__)
+
 
 # post's service
 
@@ -70,3 +78,31 @@ def get():
     #     response = ResponseModel.buildResponse(HTTPStatus.NOT_FOUND, error)
     #     return abort(response.to_json(), response.status)
     return None
+
+
+@bp_post_v1.get("/search")
+def search():
+    """Full-text search of the posts and comments i.e. '?q=<words>[&limit=20][&comments=false]'"""
+    logger.debug(f"+search() => request={request}, args={request.args}")
+    try:
+        limit = int(request.args.get(PageRequest.LIMIT, PageRequest.DEFAULT_LIMIT))
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST.statusCode, description="The 'limit' must be a number!")
+
+    try:
+        comments = request.args.get("comments", "true").lower() != "false"
+        searchResults = PostService().search(request.args.get("q"), limit, comments)
+
+        # build success response
+        response = ResponseModel.buildResponse(HTTPStatus.OK)
+        if searchResults:
+            response.addInstances(searchResults)
+        else:
+            response.message = "No Records Exist!"
+    except ValidationException as ex:
+        response = ResponseModel.buildResponseWithException(ex)
+    except Exception as ex:
+        response = ResponseModel.buildResponse(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(ex), exception=ex)
+
+    logger.debug(f"-search() <= response={response}")
+    return make_response(response.to_json(), response.status)
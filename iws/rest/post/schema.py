@@ -7,8 +7,8 @@ from typing import Optional, List
 
 from sqlalchemy import String, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import LargeBinary
 
+from framework.db.search import fullTextIndex
 from framework.orm.sqlalchemy.schema import BaseSchema
 
 
@@ -36,14 +36,15 @@ class PostSchema(BaseSchema):
     # In contrast to the column-based attributes, 'relationship()' denotes a linkage between two ORM classes.
     # attachments: Mapped[List["Attachment"]] = relationship(back_populates="post", cascade="all, delete-orphan")
     # Optional[], therefore will be NULL
-    attachments: Mapped[Optional[List["AttachmentSchema"]]] = relationship(back_populates="post", lazy="joined",
+    # loaded on access only, see 'LoadStrategy' to load them per query
+    attachments: Mapped[Optional[List["AttachmentSchema"]]] = relationship(back_populates="post", lazy="select",
                                                                            cascade="all, delete-orphan")
 
     # Other variants of 'Mapped' are available, most commonly the 'relationship()' construct indicated above.
     # In contrast to the column-based attributes, 'relationship()' denotes a linkage between two ORM classes.
     # attachments: Mapped[List["Attachment"]] = relationship(back_populates="post", cascade="all, delete-orphan")
     # Optional[], therefore will be NULL
-    comments: Mapped[Optional[List["CommentSchema"]]] = relationship(back_populates="post", lazy="joined",
+    comments: Mapped[Optional[List["CommentSchema"]]] = relationship(back_populates="post", lazy="select",
                                                                      cascade="all, delete-orphan")
 
     def addAttachment(self, attachment):
@@ -51,9 +52,10 @@ class PostSchema(BaseSchema):
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
-        return ("{} <id={}, user_id={}, title={}, author={}, content={}, posted_on={}, {}, attachments={}>"
+        # no relationships, the (lazy) loads would fail on the detached instances
+        return ("{} <id={}, user_id={}, title={}, author={}, content={}, posted_on={}, {}>"
                 .format(self.getClassName(), self.id, self.user_id, self.title, self.author, self.content,
-                        self.posted_on, self.auditable(), self.attachments))
+                        self.posted_on, self.auditable()))
 
     def __repr__(self) -> str:
         """Returns the string representation of this object"""
@@ -74,14 +76,19 @@ class AttachmentSchema(BaseSchema):
 
     # not Optional[], therefore will be NOT NULL
     filename: Mapped[str] = mapped_column(String(64))
-    # size: Mapped[int] = mapped_column()
+    # the content is stored in the 'BlobStore' by its SHA-256 hash (hex digest)
     # not Optional[], therefore will be NOT NULL
-    data: Mapped[LargeBinary] = mapped_column(LargeBinary)
+    sha256: Mapped[str] = mapped_column(String(64), index=True)
+    # not Optional[], therefore will be NOT NULL
+    size: Mapped[int] = mapped_column()
+    # Optional[], therefore will be NULL
+    mime_type: Mapped[Optional[str]] = mapped_column(String(128))
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
-        return ("{} <id={}, filename={}, data=*, {}>"
-                .format(self.getClassName(), self.id, self.filename, self.auditable()))
+        return ("{} <id={}, filename={}, sha256={}, size={}, mime_type={}, {}>"
+                .format(self.getClassName(), self.id, self.filename, self.sha256, self.size, self.mime_type,
+                        self.auditable()))
 
     def __repr__(self) -> str:
         """Returns the string representation of this object"""
@@ -123,18 +130,27 @@ class CommentSchema(BaseSchema):
         return str(self)
 
 
+# the full-text (FTS5) indexes of the posts' search, see 'PostRepository.search'
+fullTextIndex(PostSchema.__table__, {"title": 10.0, "content": 1.0, "author": 5.0})
+fullTextIndex(CommentSchema.__table__, {"content": 1.0})
+
+
 class Document(BaseSchema):
     """ DocumentSchema represents [documents] Table """
 
     __tablename__ = "documents"
 
     filename: Mapped[str] = mapped_column(String(64))
-    data: Mapped[LargeBinary] = mapped_column(LargeBinary)
+    # the content is stored in the 'BlobStore' by its SHA-256 hash (hex digest)
+    sha256: Mapped[str] = mapped_column(String(64), index=True)
+    size: Mapped[int] = mapped_column()
+    mime_type: Mapped[Optional[str]] = mapped_column(String(128))
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
-        return ("{} <id={}, filename={}, data=*, {}>"
-                .format(self.getClassName(), self.id, self.filename, self.auditable()))
+        return ("{} <id={}, filename={}, sha256={}, size={}, mime_type={}, {}>"
+                .format(self.getClassName(), self.id, self.filename, self.sha256, self.size, self.mime_type,
+                        self.auditable()))
 
     def __repr__(self) -> str:
         """Returns the string representation of this object"""
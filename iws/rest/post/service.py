@@ -0,0 +1,153 @@
+#
+# Author: Rohtash Lakra
+#
+import mimetypes
+from typing import List, Optional, Dict, Any, BinaryIO
+
+from sqlalchemy.exc import NoResultFound
+
+from framework.db.search import matchQuery
+from framework.exception import ValidationException, RecordNotFoundException
+from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
+from framework.orm.sqlalchemy.schema import SchemaOperation
+from framework.service import AbstractService
+from globals import blobStore
+from rest.post.model import SearchResult
+from rest.post.repository import DocumentRepository, PostRepository
+from rest.post.schema import Document, PostSchema
+
+logger = getLogger(__name__)
+
+
+class PostService(AbstractService):
+    """The PostService handles the posts and their full-text search"""
+
+    def __init__(self):
+        logger.debug("PostService()")
+        super().__init__()
+        self.repository = PostRepository()
+
+    def validate(self, operation: SchemaOperation, post: PostSchema) -> None:
+        logger.debug(lambda: f"+validate({operation}, {post})")
+        if not post:
+            raise ValidationException(messages=["'Post' is not fully defined!"])
+
+        logger.debug(lambda: f"-validate()")
+
+    def search(self, searchText: str, limit: int = PageRequest.DEFAULT_LIMIT,
+               comments: bool = True) -> List[SearchResult]:
+        """Returns the posts (and comments) best matching all the words of the search text, the last word is
+        matched as a prefix (i.e. search as you type)."""
+        logger.debug(lambda: f"+search({searchText}, {limit}, {comments})")
+        errorMessages = []
+        query = matchQuery(searchText)
+        if not query:
+            errorMessages.append("The search text 'q' is required!")
+        if not 0 < limit <= PageRequest.MAX_LIMIT:
+            errorMessages.append(f"The 'limit' must be between 1 and {PageRequest.MAX_LIMIT}!")
+        if errorMessages:
+            raise ValidationException(messages=errorMessages)
+
+        rows = self.repository.search(query, limit, comments)
+        searchResults = [SearchResult(**{**row._mapping, "snippet": PostRepository.highlight(row.snippet)})
+                         for row in rows]
+        logger.debug(lambda: f"-search(), searchResults={searchResults}")
+        return searchResults
+
+    # @override
+    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[PostSchema]]:
+        logger.debug(lambda: f"+findByFilter({filters})")
+        posts = self.repository.filter(filters)
+        logger.debug(lambda: f"-findByFilter(), posts={posts}")
+        return posts
+
+    # @override
+    def existsByFilter(self, filters: Dict[str, Any]) -> bool:
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.repository.exists(PostSchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.repository.count(PostSchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
+        return result
+
+
+class DocumentService(AbstractService):
+    """The DocumentService stores the uploaded contents in the 'BlobStore' and their metadata in the database"""
+
+    def __init__(self):
+        logger.debug("DocumentService()")
+        super().__init__()
+        self.repository = DocumentRepository()
+
+    def validate(self, operation: SchemaOperation, document: Document) -> None:
+        logger.debug(lambda: f"+validate({operation}, {document})")
+        errorMessages = []
+
+        # validate the object
+        if not document:
+            errorMessages.append("'Document' is not fully defined!")
+        elif operation == SchemaOperation.CREATE and not document.filename:
+            errorMessages.append("Document 'filename' is required!")
+
+        # throw an error if any validation error
+        if errorMessages:
+            error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=errorMessages)
+            logger.debug(lambda: f"{type(error)} = exception={error}")
+            raise error
+
+        logger.debug(lambda: f"-validate()")
+
+    def upload(self, stream: BinaryIO, filename: str, mimeType: str = None) -> Document:
+        """Streams the content to the blob store and persists its metadata.
+
+        The identical contents share a blob, so only the first upload of a content writes it to the disk.
+        """
+        logger.debug(lambda: f"+upload({filename}, {mimeType})")
+        document = Document(filename=filename)
+        self.validate(SchemaOperation.CREATE, document)
+        blob = blobStore.write(stream)
+        document.sha256 = blob.sha256
+        document.size = blob.size
+        document.mime_type = mimeType or mimetypes.guess_type(filename)[0]
+        document = self.repository.save(document)
+        logger.debug(lambda: f"-upload(), document={document}, created={blob.created}")
+        return document
+
+    def findById(self, id: int) -> Document:
+        """Returns the document's metadata by id"""
+        logger.debug(lambda: f"+findById({id})")
+        try:
+            document = self.repository.findById(Document, id)
+        except NoResultFound:
+            raise RecordNotFoundException(messages=[f"Document with id={id} doesn't exist!"])
+
+        logger.debug(lambda: f"-findById(), document={document}")
+        return document
+
+    # @override
+    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[Document]]:
+        logger.debug(lambda: f"+findByFilter({filters})")
+        documents = self.repository.filter(filters)
+        logger.debug(lambda: f"-findByFilter(), documents={documents}")
+        return documents
+
+    # @override
+    def existsByFilter(self, filters: Dict[str, Any]) -> bool:
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.repository.exists(Document, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.repository.count(Document, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
+        return result
@@ -1,17 +1,16 @@
 #
 # Author: Rohtash Lakra
 #
-
-import logging
 from dataclasses import field
 from typing import Dict, Any, List, Optional
 
 from pydantic import model_validator
 from typing_extensions import Self
 
+from framework.logger import getLogger
 from framework.orm.pydantic.model import AbstractModel, NamedModel
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class Role(NamedModel):
@@ -24,17 +23,17 @@ class Role(NamedModel):
     @classmethod
     @model_validator(mode="before")
     def preValidator(cls, values: Any) -> Any:
-        logger.debug(f"preValidator({values})")
+        logger.debug(lambda: f"preValidator({values})")
         return super().preValidator(values)
 
     @model_validator(mode="after")
     def postValidator(self, values) -> Self:
-        logger.debug(f"postValidator({values})")
+        logger.debug(lambda: f"postValidator({values})")
         return super().postValidator(values)
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def __str__(self) -> str:
@@ -57,7 +56,7 @@ class Permission(NamedModel):
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def __str__(self) -> str:
@@ -79,7 +78,7 @@ class Capability(NamedModel):
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def __str__(self) -> str:
@@ -110,7 +109,7 @@ class RoleAssignPermission(AbstractModel):
     @classmethod
     @model_validator(mode="before")
     def preValidator(cls, values: Any) -> Any:
-        logger.debug(f"+preValidator(), values={values}")
+        logger.debug(lambda: f"+preValidator(), values={values}")
         # <class 'pydantic._internal._model_construction.ModelMetaclass'>
         if isinstance(values, list):
             for value in values:
@@ -122,12 +121,12 @@ class RoleAssignPermission(AbstractModel):
 
     @model_validator(mode="after")
     def postValidator(self, values) -> Self:
-        logger.debug(f"postValidator({values})")
+        logger.debug(lambda: f"postValidator({values})")
         return super().postValidator(values)
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def __str__(self) -> str:
@@ -12,6 +12,7 @@ from flask import make_response, request
 from framework.blueprint import AbstractBlueprint
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import ResponseModel
 from rest.role.model import Permission
 from rest.role.service import PermissionService
@@ -94,13 +95,16 @@ def get():
     logger.debug(f"+get() => request={request}, args={request.args}, is_json:{request.is_json}")
     try:
         permissionService = PermissionService()
-        modelObjects = permissionService.findByFilter(request.args)
+        pageRequest, filters = PageRequest.fromFilters(request.args)
+        page = permissionService.findPage(filters, pageRequest)
+
         # build success response
         response = ResponseModel.buildResponse(HTTPStatus.OK)
-        if modelObjects:
-            response.addInstances(modelObjects)
-        else:
+        response.addPage(page)
+        if not page.items:
             response.message = "No Records Exist!"
+    except ValidationException as ex:
+        response = ResponseModel.buildResponseWithException(ex)
     except Exception as ex:
         response = ResponseModel.buildResponse(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(ex), exception=ex)
 
@@ -1,19 +1,21 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 
-from sqlalchemy import update, func
+from sqlalchemy import update, func, select, Row, and_, delete, tuple_
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
-from sqlalchemy.orm import Session
 
-from framework.orm.sqlalchemy.repository import SqlAlchemyRepository
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
+from framework.orm.sqlalchemy.repository import SqlAlchemyRepository, LoadPlan, SQLITE_MAX_PARAMETERS
 from framework.orm.sqlalchemy.schema import BaseSchema
 from globals import connector
-from rest.role.schema import RoleSchema, PermissionSchema
+from rest.role.schema import RoleSchema, PermissionSchema, RolePermissionSchema
+from rest.user.schema import UserRoleSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class RoleRepository(SqlAlchemyRepository):
@@ -23,24 +25,20 @@ class RoleRepository(SqlAlchemyRepository):
         super().__init__(engine=connector.engine)
 
     # @override
-    def filter(self, filters: Dict[str, Any]) -> List[Optional[RoleSchema]]:
-        """Returns records by filter or empty list"""
-        logger.debug(f"+findByFilter({filters})")
+    def filter(self, filters: Dict[str, Any], loadPlan: LoadPlan = None,
+               pageRequest: PageRequest = None) -> List[Optional[RoleSchema]]:
+        """Returns records by filter or empty list, the relationships are loaded as per the load plan"""
+        logger.debug(lambda: f"+findByFilter({filters}, {loadPlan}, {pageRequest})")
         schemaObjects = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             # session.begin()
             try:
-                if filters and filters is not None:
-                    if len(filters) == 1 and "id" in filters.keys() and isinstance(filters.get("id"), list):
-                        schemaObjects = session.query(RoleSchema).filter(RoleSchema.id.in_(filters.get("id"))).all()
-                    else:
-                        logger.debug(f"filters={filters}, filters={filters.keys()}")
-                        schemaObjects = session.query(RoleSchema).filter_by(**filters).all()
-                else:
-                    schemaObjects = session.query(RoleSchema).all()
+                # the list values (i.e. {'id': [1, 2]}) are matched with IN
+                statement, parameters = self.filterStatement(RoleSchema, filters, loadPlan, pageRequest)
+                schemaObjects = session.scalars(statement, parameters).unique().all()
 
-                logger.debug(f"Loaded [{len(schemaObjects)}] roles. schemaObjects={schemaObjects}")
+                logger.debug(lambda: f"Loaded [{len(schemaObjects)}] roles. schemaObjects={schemaObjects}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -66,25 +64,17 @@ class RoleRepository(SqlAlchemyRepository):
                 # on rollback, the same closure of state as that of commit proceeds.
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-findByFilter(), schemaObjects={schemaObjects}")
+
+        logger.debug(lambda: f"-findByFilter(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def findByName(self, name: str) -> RoleSchema:
-        logger.debug(f"+findByName({name})")
+        logger.debug(lambda: f"+findByName({name})")
         results = List[Optional[RoleSchema]]
-        with Session(self.get_engine()) as session:
+        with self.openSession() as session:
             try:
                 results = session.query(RoleSchema).filter(RoleSchema.name == name).all()
-                logger.debug(f"Loaded [{len(results)}] roles => results={results}")
+                logger.debug(lambda: f"Loaded [{len(results)}] roles => results={results}")
             except NoResultFound as ex:
                 logger.error(f"NoResultFound while loading role by name! Error={ex}")
                 # session.rollback()
@@ -98,12 +88,105 @@ class RoleRepository(SqlAlchemyRepository):
                 # session.rollback()
                 raise ex
 
-        logger.info(f"-findByName(), results={results}")
+        logger.info(lambda: f"-findByName(), results={results}")
         return results
 
+    def findGrants(self, userId: int) -> List[Row]:
+        """Returns the (role's id, role's name, permission's name) rows of the user's active roles and their active
+        permissions in a single statement, the permission's name is None for a role without any permission."""
+        logger.debug(lambda: f"+findGrants({userId})")
+        statement = (select(RoleSchema.id, RoleSchema.name, PermissionSchema.name)
+                     .select_from(UserRoleSchema)
+                     .join(RoleSchema, and_(RoleSchema.id == UserRoleSchema.role_id, RoleSchema.active.is_(True)))
+                     .outerjoin(RolePermissionSchema, RolePermissionSchema.role_id == RoleSchema.id)
+                     .outerjoin(PermissionSchema, and_(PermissionSchema.id == RolePermissionSchema.permission_id,
+                                                       PermissionSchema.active.is_(True)))
+                     .where(UserRoleSchema.user_id == userId))
+        with self.openSession() as session:
+            try:
+                rows = session.execute(statement).all()
+            except Exception as ex:
+                logger.error(f"Exception while loading user's grants! Error={ex}")
+                session.rollback()
+                raise ex
+
+        logger.debug(lambda: f"-findGrants(), rows={len(rows)}")
+        return rows
+
+    def assignPermissions(self, assignments: Dict[int, Set[int]]) -> Set[int]:
+        """Grants the permissions to the roles (by their ids) and returns the ids of the roles granted any existing
+        permission. The unknown roles/permissions are skipped and the already granted permissions are kept.
+
+        The referenced roles and permissions are loaded with one 'SELECT ... IN' each, and the 'role_permissions' rows
+        are written with a multi-row 'INSERT ... ON CONFLICT DO NOTHING' per SQLite's parameter limit, in one
+        transaction.
+        """
+        logger.debug(lambda: f"+assignPermissions({assignments})")
+        roleIds = set()
+        if assignments:
+            permissionIds = list(set().union(*assignments.values()))
+            with self.openSession() as session:
+                try:
+                    existingRoles = self._findIds(session, RoleSchema, list(assignments.keys()))
+                    existingPermissions = self._findIds(session, PermissionSchema, permissionIds)
+                    rows = [{"role_id": roleId, "permission_id": permissionId}
+                            for roleId, ids in assignments.items() if roleId in existingRoles
+                            for permissionId in ids if permissionId in existingPermissions]
+                    chunkSize = SQLITE_MAX_PARAMETERS // 2
+                    for index in range(0, len(rows), chunkSize):
+                        session.execute(insert(RolePermissionSchema)
+                                        .values(rows[index:index + chunkSize])
+                                        .on_conflict_do_nothing())
+
+                    roleIds = {row["role_id"] for row in rows}
+
+                    session.commit()
+                except Exception as ex:
+                    logger.error(f"Exception while assigning permissions! Error={ex}")
+                    session.rollback()
+                    raise ex
+
+        logger.debug(lambda: f"-assignPermissions(), roleIds={roleIds}")
+        return roleIds
+
+    def revokePermissions(self, assignments: Dict[int, Set[int]]) -> Set[int]:
+        """Revokes the permissions of the roles (by their ids) with one 'DELETE ... WHERE (role_id, permission_id)
+        IN (...) RETURNING role_id' per SQLite's parameter limit, in one transaction, and returns the ids of the
+        roles any permission was revoked from."""
+        logger.debug(lambda: f"+revokePermissions({assignments})")
+        pairs = [(roleId, permissionId) for roleId, ids in (assignments or {}).items() for permissionId in ids]
+        roleIds = set()
+        if pairs:
+            chunkSize = SQLITE_MAX_PARAMETERS // 2
+            key = tuple_(RolePermissionSchema.role_id, RolePermissionSchema.permission_id)
+            with self.openSession() as session:
+                try:
+                    for index in range(0, len(pairs), chunkSize):
+                        roleIds.update(session.scalars(delete(RolePermissionSchema)
+                                                       .where(key.in_(pairs[index:index + chunkSize]))
+                                                       .returning(RolePermissionSchema.role_id)))
+                    session.commit()
+                except Exception as ex:
+                    logger.error(f"Exception while revoking permissions! Error={ex}")
+                    session.rollback()
+                    raise ex
+
+        logger.debug(lambda: f"-revokePermissions(), roleIds={roleIds}")
+        return roleIds
+
+    @staticmethod
+    def _findIds(session, schemaObject: BaseSchema, ids: List[int]) -> Set[int]:
+        """Returns the existing ids of the provided ones, with one lookup per SQLite's parameter limit"""
+        existingIds = set()
+        for index in range(0, len(ids), SQLITE_MAX_PARAMETERS):
+            existingIds.update(session.scalars(select(schemaObject.id)
+                                               .where(schemaObject.id.in_(ids[index:index + SQLITE_MAX_PARAMETERS]))))
+
+        return existingIds
+
     def update(self, schemaObject: RoleSchema) -> int:
-        logger.debug(f"+update({schemaObject})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+update({schemaObject})")
+        with self.openSession() as session:
             try:
                 if not isinstance(schemaObject, BaseSchema):
                     raise ValueError(f"Invalid schemaObject type={type(schemaObject)}")
@@ -115,7 +198,7 @@ class RoleRepository(SqlAlchemyRepository):
                     .values(schemaObject.to_json())
                     .where(RoleSchema.id == schemaObject.id)
                 ).rowcount
-                logger.debug(f"Updated [{results}] role.")
+                logger.debug(lambda: f"Updated [{results}] role.")
 
                 session.commit()
             except NoResultFound as ex:
@@ -131,15 +214,15 @@ class RoleRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-update(), results={results}")
+        logger.info(lambda: f"-update(), results={results}")
         return results
 
     def delete(self, filters: Dict[str, Any]) -> None:
-        logger.debug(f"+delete({filters})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+delete({filters})")
+        with self.openSession() as session:
             try:
                 roleSchema = session.query(RoleSchema).filter_by(**filters).one()
-                logger.debug(f"Deleting roleSchema={roleSchema}")
+                logger.debug(lambda: f"Deleting roleSchema={roleSchema}")
                 session.delete(roleSchema)
                 logger.info("Role is successfully deleted.")
                 session.commit()
@@ -156,33 +239,14 @@ class RoleRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-delete()")
-
-    def bulkDelete(self, ids: list[int]) -> None:
-        logger.debug(f"+bulkDelete({ids})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
-            try:
-                schemaObjects = self.filter({"id": ids})
-                for schemaObject in schemaObjects:
-                    logger.debug(f"Deleting role with id=[{schemaObject.id}]")
-                    session.delete(schemaObject)
+        logger.info(lambda: f"-delete()")
 
-                logger.debug(f"Deleted [{len(schemaObjects)}] roles successfully.")
-                session.commit()
-            except NoResultFound as ex:
-                logger.error(f"NoResultFound while bulk deleting roles! Error={ex}")
-                session.rollback()
-                raise ex
-            except MultipleResultsFound as ex:
-                logger.error(f"MultipleResultsFound while bulk deleting roles! Error={ex}")
-                session.rollback()
-                raise ex
-            except Exception as ex:
-                logger.error(f"Exception while bulk deleting roles! Error={ex}")
-                session.rollback()
-                raise ex
-
-        logger.info(f"-bulkDelete()")
+    def bulkDelete(self, ids: list[int]) -> int:
+        """Deletes the roles by ids with set-based statements and returns the number of deleted rows"""
+        logger.debug(lambda: f"+bulkDelete({ids})")
+        results = self.deleteByIds(RoleSchema, ids, cascades=[UserRoleSchema.role_id])
+        logger.info(lambda: f"-bulkDelete(), results={results}")
+        return results
 
 
 class PermissionRepository(SqlAlchemyRepository):
@@ -192,23 +256,18 @@ class PermissionRepository(SqlAlchemyRepository):
         super().__init__(engine=connector.engine)
 
     # @override
-    def filter(self, filters: Dict[str, Any]) -> List[Optional[PermissionSchema]]:
+    def filter(self, filters: Dict[str, Any], pageRequest: PageRequest = None) -> List[Optional[PermissionSchema]]:
         """Returns records by filter or empty list"""
-        logger.debug(f"+findByFilter({filters})")
+        logger.debug(lambda: f"+findByFilter({filters}, {pageRequest})")
         schemaObjects = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             try:
-                if filters:
-                    if len(filters) == 1 and "id" in filters.keys() and isinstance(filters.get("id"), list):
-                        schemaObjects = session.query(PermissionSchema).filter(
-                            PermissionSchema.id.in_(filters.get("id"))).all()
-                    else:
-                        schemaObjects = session.query(PermissionSchema).filter_by(**filters).all()
-                else:
-                    schemaObjects = session.query(PermissionSchema).all()
+                # the list values (i.e. {'id': [1, 2]}) are matched with IN
+                statement, parameters = self.filterStatement(PermissionSchema, filters, pageRequest=pageRequest)
+                schemaObjects = session.scalars(statement, parameters).all()
 
-                logger.debug(f"Loaded [{len(schemaObjects)}] permissions. schemaObjects={schemaObjects}")
+                logger.debug(lambda: f"Loaded [{len(schemaObjects)}] permissions. schemaObjects={schemaObjects}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -234,21 +293,13 @@ class PermissionRepository(SqlAlchemyRepository):
                 logger.error(f"Exception while loading permissions!")
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-findByFilter(), schemaObjects={schemaObjects}")
+
+        logger.debug(lambda: f"-findByFilter(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def update(self, schemaObject: PermissionSchema) -> PermissionSchema:
-        logger.debug(f"+update({schemaObject})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+update({schemaObject})")
+        with self.openSession() as session:
             try:
                 schemaObject.updated_at = func.now()
                 results = session.execute(
@@ -256,7 +307,7 @@ class PermissionRepository(SqlAlchemyRepository):
                     .values(schemaObject.to_json())
                     .where(PermissionSchema.id == schemaObject.id)
                 ).rowcount
-                logger.debug(f"Updated [{results}] rows.")
+                logger.debug(lambda: f"Updated [{results}] rows.")
 
                 session.commit()
             except NoResultFound as ex:
@@ -272,15 +323,15 @@ class PermissionRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-update(), results={results}")
+        logger.info(lambda: f"-update(), results={results}")
         return results
 
     def delete(self, filters: Dict[str, Any]) -> None:
-        logger.debug(f"+delete({filters})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+delete({filters})")
+        with self.openSession() as session:
             try:
                 permissionSchema = session.query(PermissionSchema).filter_by(**filters).one()
-                logger.debug(f"Deleting permissionSchema={permissionSchema}")
+                logger.debug(lambda: f"Deleting permissionSchema={permissionSchema}")
                 session.delete(permissionSchema)
                 logger.info("Permission is successfully deleted.")
                 session.commit()
@@ -297,30 +348,11 @@ class PermissionRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-delete()")
-
-    def bulkDelete(self, ids: list[int]) -> None:
-        logger.debug(f"+bulkDelete({ids})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
-            try:
-                schemaObjects = self.filter({"id": ids})
-                for schemaObject in schemaObjects:
-                    logger.debug(f"Deleting permission with id=[{schemaObject.id}]")
-                    session.delete(schemaObject)
-
-                logger.debug(f"Deleted [{len(schemaObjects)}] permissions successfully.")
-                session.commit()
-            except NoResultFound as ex:
-                logger.error(f"NoResultFound while bulk deleting permissions! Error={ex}")
-                session.rollback()
-                raise ex
-            except MultipleResultsFound as ex:
-                logger.error(f"MultipleResultsFound while bulk deleting permissions! Error={ex}")
-                session.rollback()
-                raise ex
-            except Exception as ex:
-                logger.error(f"Exception while deleting bulk permissions! Error={ex}")
-                session.rollback()
-                raise ex
+        logger.info(lambda: f"-delete()")
 
-        logger.info(f"-bulkDelete()")
+    def bulkDelete(self, ids: list[int]) -> int:
+        """Deletes the permissions by ids with set-based statements and returns the number of deleted rows"""
+        logger.debug(lambda: f"+bulkDelete({ids})")
+        results = self.deleteByIds(PermissionSchema, ids, cascades=[RolePermissionSchema.permission_id])
+        logger.info(lambda: f"-bulkDelete(), results={results}")
+        return results
@@ -44,9 +44,10 @@ class RoleSchema(NamedSchema):
 
     # Define the many-to-many relationship
     # permissions: Mapped[List["PermissionSchema"]] = relationship(secondary="role_permissions")
+    # loaded with a separate 'SELECT ... IN' by default (no cartesian joins), see 'LoadStrategy' to override per query
     permissions: Mapped[Optional[List["PermissionSchema"]]] = relationship('PermissionSchema',
                                                                            secondary="role_permissions",
-                                                                           lazy="joined")
+                                                                           lazy="selectin")
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
@@ -110,8 +111,8 @@ class RolePermissionSchema(AbstractSchema):
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
-        return ("{} <id={}, role_id={}, permission_id={}, {}>"
-                .format(self.getClassName(), self.id, self.role_id, self.permission_id, self.auditable()))
+        return ("{} <role_id={}, permission_id={}, {}>"
+                .format(self.getClassName(), self.role_id, self.permission_id, self.auditable()))
 
 
 class CapabilitySchema(NamedSchema):
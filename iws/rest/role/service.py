@@ -1,34 +1,39 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
-from typing import List, Optional, Dict, Any
-
-from werkzeug.datastructures import MultiDict
+from typing import List, Optional, Dict, Any, Set
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import BaseModel
+from framework.orm.sqlalchemy.repository import LoadPlan, LoadStrategy
 from framework.orm.sqlalchemy.schema import SchemaOperation
+from framework.security.authorization import Grants
 from framework.service import AbstractService
+from globals import grantCache
 from rest.role.mapper import RoleMapper, PermissionMapper
 from rest.role.model import Role, Permission, RoleAssignPermission
 from rest.role.repository import RoleRepository, PermissionRepository
 from rest.role.schema import PermissionSchema, RoleSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class RoleService(AbstractService):
     """Role's Service"""
 
+    # the relationships loaded for the roles listing
+    LIST_LOAD_PLAN = {"permissions": LoadStrategy.SELECTIN}
+
     def __init__(self):
         logger.debug("RoleService()")
         self.roleRepository = RoleRepository()
         self.permissionRepository = PermissionRepository()
 
     def validate(self, operation: SchemaOperation, role: Role) -> None:
-        logger.debug(f"+validate({operation}, {role})")
+        logger.debug(lambda: f"+validate({operation}, {role})")
         # super().validate(operation, role)
         error_messages = []
 
@@ -47,42 +52,41 @@ class RoleService(AbstractService):
             error_messages.append("'Role' is not fully defined!")
 
         # throw an error if any validation error
-        logger.debug(f"{type(error_messages)} => error_messages={error_messages}")
+        logger.debug(lambda: f"{type(error_messages)} => error_messages={error_messages}")
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validate()")
+        logger.debug(lambda: f"-validate()")
 
     # @override
-    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[BaseModel]]:
-        logger.debug(f"+findByFilter({filters})")
-        roleSchemas = self.roleRepository.filter(filters)
-        # logger.debug(f"roleSchemas => type={type(roleSchemas)}, values={roleSchemas}")
-        roleModels = []
-        for roleSchema in roleSchemas:
-            # logger.debug(f"roleSchema type={type(roleSchema)}, value={roleSchema}")
-            roleModel = RoleMapper.fromSchema(roleSchema)
-            # logger.debug(f"type={type(roleModel)}, roleModel={roleModel}")
-            roleModels.append(roleModel)
-            # roleModelValidate = Role.model_validate(roleSchema)
-            # logger.debug(f"type={type(roleModelValidate)}, roleModelValidate={roleModelValidate}")
-
-        logger.debug(f"-findByFilter(), roleModels={roleModels}")
+    def findByFilter(self, filters: Dict[str, Any], loadPlan: LoadPlan = LIST_LOAD_PLAN,
+                     pageRequest: PageRequest = None) -> List[Optional[BaseModel]]:
+        logger.debug(lambda: f"+findByFilter({filters}, {loadPlan}, {pageRequest})")
+        roleSchemas = self.roleRepository.filter(filters, loadPlan, pageRequest)
+        roleModels = RoleMapper.fromSchemas(roleSchemas)
+        logger.debug(lambda: f"-findByFilter(), roleModels={roleModels}")
         return roleModels
 
     # @override
     def existsByFilter(self, filters: Dict[str, Any]) -> bool:
         """Returns True if the records exist by filter otherwise False"""
-        logger.debug(f"+existsByFilter({filters})")
-        roleSchemas = self.roleRepository.filter(filters)
-        result = True if roleSchemas else False
-        logger.debug(f"-existsByFilter(), result={result}")
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.roleRepository.exists(RoleSchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records matching the filter"""
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.roleRepository.count(RoleSchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
         return result
 
     def validates(self, operation: SchemaOperation, roles: List[Role]) -> None:
-        logger.debug(f"+validates({operation}, {roles})")
+        logger.debug(lambda: f"+validates({operation}, {roles})")
         error_messages = []
 
         # validate the object
@@ -95,14 +99,14 @@ class RoleService(AbstractService):
         # throw an error if any validation error
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validates()")
+        logger.debug(lambda: f"-validates()")
 
     def create(self, role: Role) -> Role:
         """Crates a new role"""
-        logger.debug(f"+create({role})")
+        logger.debug(lambda: f"+create({role})")
         if self.existsByFilter({"name": role.name}):
             raise DuplicateRecordException(HTTPStatus.CONFLICT, f"[{role.name}] role already exists!")
 
@@ -115,29 +119,30 @@ class RoleService(AbstractService):
         role = RoleMapper.fromSchema(roleSchema)
         # role = Role.model_validate(roleSchema)
 
-        logger.debug(f"-create(), role={role}")
+        logger.debug(lambda: f"-create(), role={role}")
         return role
 
     def bulkCreate(self, roles: List[Role]) -> List[Role]:
         """Crates a new role"""
-        logger.debug(f"+bulkCreate({roles})")
+        logger.debug(lambda: f"+bulkCreate({roles})")
         results = []
         for role in roles:
             result = self.create(role)
             results.append(result)
 
-        logger.debug(f"-bulkCreate(), results={results}")
+        logger.debug(lambda: f"-bulkCreate(), results={results}")
         return results
 
     def update(self, role: Role) -> Role:
         """Updates the role"""
-        logger.debug(f"+update({role})")
+        logger.debug(lambda: f"+update({role})")
         # self.validate(SchemaOperation.UPDATE, role)
         # check record exists by id
         if not self.existsByFilter({"id": role.id}):
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, f"Role doesn't exist!")
 
-        roleSchemas = self.roleRepository.filter({"id": role.id})
+        # loaded with the plan it's returned with, the request's session hands back the same (identity-map) object
+        roleSchemas = self.roleRepository.filter({"id": role.id}, self.LIST_LOAD_PLAN)
         roleSchema = roleSchemas[0]
         if role.name and roleSchema.name != role.name:
             roleSchema.name = role.name
@@ -150,84 +155,65 @@ class RoleService(AbstractService):
 
         # roleSchema = CompanyMapper.fromModel(oldRole)
         self.roleRepository.update(roleSchema)
+        grantCache.invalidateRoles([role.id])
         # roleSchema = self.repository.update(mapper=RoleSchema, mappings=[roleSchema])
-        roleSchema = self.roleRepository.filter({"id": role.id})[0]
+        roleSchema = self.roleRepository.filter({"id": role.id}, self.LIST_LOAD_PLAN)[0]
         role = RoleMapper.fromSchema(roleSchema)
-        logger.debug(f"-update(), role={role}")
+        logger.debug(lambda: f"-update(), role={role}")
         return role
 
     def delete(self, id: int) -> None:
-        logger.debug(f"+delete({id})")
+        logger.debug(lambda: f"+delete({id})")
         # check record exists by id
         filter = {"id": id}
         if self.existsByFilter(filter):
             self.roleRepository.delete(filter)
+            grantCache.invalidateRoles([id])
         else:
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, "Role doesn't exist!")
 
-        logger.debug(f"-delete()")
+        logger.debug(lambda: f"-delete()")
 
-    def assignPermissions(self, rolePermissions: list[RoleAssignPermission]) -> List[Role]:
-        """Grants the permissions to the roles"""
-        logger.debug(f"+assignPermissions({rolePermissions})")
-        schemaObjects = []
-        for rolePermission in rolePermissions:
-            # load roles
-            schemaObject = self.roleRepository.findById(RoleSchema, rolePermission.role_id)
-            # load roles permissions
-            filterPermissions = MultiDict()
-            for id in rolePermission.permissions:
-                filterPermissions.add("id", id)
-
-            permissions = self.permissionRepository.filter(filterPermissions)
-            if schemaObject and permissions:
-                # assign permissions to role
-                schemaObject.permissions.extend(permissions)
-                schemaObjects.append(schemaObject)
-
-        logger.debug(f"schemaObjects=>{schemaObjects}")
-        if schemaObjects:
-            self.roleRepository.save_all(schemaObjects)
-            filterRoles = MultiDict()
-            for schemaObject in schemaObjects:
-                filterRoles.add("id", schemaObject.id)
-            schemaObjects = self.roleRepository.filter(filterRoles)
-            modelObjects = RoleMapper.fromSchemas(schemaObjects)
-        else:
-            modelObjects = None
+    def findGrants(self, userId: int) -> Grants:
+        """Returns the compiled grants of the user's active roles and permissions, cached until the roles change"""
+        logger.debug(lambda: f"+findGrants({userId})")
+        grants = grantCache.getGrants(userId, lambda id: Grants.compile(self.roleRepository.findGrants(id)))
+        logger.debug(lambda: f"-findGrants(), grants={grants}")
+        return grants
+
+    @staticmethod
+    def toAssignments(rolePermissions: List[RoleAssignPermission]) -> Dict[int, Set[int]]:
+        """Returns the permissions' ids by the roles' ids, the repeated roles are merged"""
+        assignments = {}
+        for rolePermission in rolePermissions or []:
+            assignments.setdefault(rolePermission.role_id, set()).update(rolePermission.permissions or [])
+
+        return assignments
 
-        logger.debug(f"-assignPermissions(), modelObjects={modelObjects}")
+    def assignPermissions(self, rolePermissions: list[RoleAssignPermission]) -> List[Role]:
+        """Grants the permissions to the roles with set-based statements, see 'RoleRepository.assignPermissions'"""
+        logger.debug(lambda: f"+assignPermissions({rolePermissions})")
+        roleIds = self.roleRepository.assignPermissions(self.toAssignments(rolePermissions))
+        modelObjects = self._findAssigned(roleIds)
+        logger.debug(lambda: f"-assignPermissions(), modelObjects={modelObjects}")
         return modelObjects
 
     def revokePermissions(self, rolePermissions: list[RoleAssignPermission]) -> List[Role]:
-        """Revokes the permissions of the roles"""
-        logger.debug(f"+revokePermissions({rolePermissions})")
-        schemaObjects = []
-        for rolePermission in rolePermissions:
-            # load roles
-            schemaObject = self.roleRepository.findById(RoleSchema, rolePermission.role_id)
-            revoked = False
-            if schemaObject and schemaObject.permissions:
-                # schemaObjectPermissions = schemaObject.permissions.copy()
-                for schemaObjectPermission in schemaObject.permissions:
-                    if schemaObjectPermission.id in rolePermission.permissions:
-                        logger.debug(f"Removing schemaObjectPermission={schemaObjectPermission}")
-                        schemaObject.permissions.remove(schemaObjectPermission)
-                        revoked = True
-
-                # persist role and remove permissions
-                if revoked:
-                    schemaObject = self.roleRepository.save(schemaObject)
-                    schemaObjects.append(schemaObject)
-
-        if schemaObjects:
-            modelObjects = RoleMapper.fromSchemas(schemaObjects)
-        else:
-            modelObjects = None
-
-        logger.debug(f"-revokePermissions(), modelObjects={modelObjects}")
+        """Revokes the permissions of the roles with set-based statements, see 'RoleRepository.revokePermissions'"""
+        logger.debug(lambda: f"+revokePermissions({rolePermissions})")
+        roleIds = self.roleRepository.revokePermissions(self.toAssignments(rolePermissions))
+        modelObjects = self._findAssigned(roleIds)
+        logger.debug(lambda: f"-revokePermissions(), modelObjects={modelObjects}")
         return modelObjects
 
+    def _findAssigned(self, roleIds: Set[int]) -> Optional[List[Role]]:
+        """Invalidates the grants of the changed roles and returns them with their permissions, if any"""
+        if not roleIds:
+            return None
+
+        grantCache.invalidateRoles(roleIds)
+        return RoleMapper.fromSchemas(self.roleRepository.filter({"id": list(roleIds)}, self.LIST_LOAD_PLAN))
+
 
 class PermissionService(AbstractService):
     """Permission's Service"""
@@ -237,7 +223,7 @@ class PermissionService(AbstractService):
         self.permissionRepository = PermissionRepository()
 
     def validate(self, operation: SchemaOperation, modelObject: Permission) -> None:
-        logger.debug(f"+validate({operation}, {modelObject})")
+        logger.debug(lambda: f"+validate({operation}, {modelObject})")
         # super().validate(operation, role)
         error_messages = []
 
@@ -256,42 +242,40 @@ class PermissionService(AbstractService):
             error_messages.append("'Permission' is not fully defined!")
 
         # throw an error if any validation error
-        logger.debug(f"{type(error_messages)} => error_messages={error_messages}")
+        logger.debug(lambda: f"{type(error_messages)} => error_messages={error_messages}")
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validate()")
+        logger.debug(lambda: f"-validate()")
 
     # @override
-    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[BaseModel]]:
-        logger.debug(f"+findByFilter({filters})")
-        schemaObjects = self.permissionRepository.filter(filters)
-        # logger.debug(f"schemaObjects => type={type(schemaObjects)}, values={schemaObjects}")
-        modelObjects = []
-        for schemaObject in schemaObjects:
-            # logger.debug(f"roleSchema type={type(roleSchema)}, value={roleSchema}")
-            modelObject = PermissionMapper.fromSchema(schemaObject)
-            # logger.debug(f"type={type(modelObject)}, modelObject={modelObject}")
-            modelObjects.append(modelObject)
-            # roleModelValidate = Role.model_validate(roleSchema)
-            # logger.debug(f"type={type(roleModelValidate)}, roleModelValidate={roleModelValidate}")
-
-        logger.debug(f"-findByFilter(), modelObjects={modelObjects}")
+    def findByFilter(self, filters: Dict[str, Any], pageRequest: PageRequest = None) -> List[Optional[BaseModel]]:
+        logger.debug(lambda: f"+findByFilter({filters}, {pageRequest})")
+        schemaObjects = self.permissionRepository.filter(filters, pageRequest)
+        modelObjects = PermissionMapper.fromSchemas(schemaObjects)
+        logger.debug(lambda: f"-findByFilter(), modelObjects={modelObjects}")
         return modelObjects
 
     # @override
     def existsByFilter(self, filters: Dict[str, Any]) -> bool:
         """Returns True if the records exist by filter otherwise False"""
-        logger.debug(f"+existsByFilter({filters})")
-        schemaObjects = self.permissionRepository.filter(filters)
-        result = True if schemaObjects else False
-        logger.debug(f"-existsByFilter(), result={result}")
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.permissionRepository.exists(PermissionSchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records matching the filter"""
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.permissionRepository.count(PermissionSchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
         return result
 
     def validates(self, operation: SchemaOperation, modelObjects: List[Permission]) -> None:
-        logger.debug(f"+validates({operation}, {modelObjects})")
+        logger.debug(lambda: f"+validates({operation}, {modelObjects})")
         error_messages = []
 
         # validate the object
@@ -304,14 +288,14 @@ class PermissionService(AbstractService):
         # throw an error if any validation error
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
 
-        logger.debug(f"-validates()")
+        logger.debug(lambda: f"-validates()")
 
     def create(self, modelObject: Permission) -> Permission:
         """Crates a new role"""
-        logger.debug(f"+create({modelObject})")
+        logger.debug(lambda: f"+create({modelObject})")
         self.validate(SchemaOperation.CREATE, modelObject)
         if self.existsByFilter({"name": modelObject.name}):
             raise DuplicateRecordException(HTTPStatus.CONFLICT, f"[{modelObject.name}] permission already exists!")
@@ -323,30 +307,30 @@ class PermissionService(AbstractService):
 
         modelObject = PermissionMapper.fromSchema(schemaObject)
 
-        logger.debug(f"-create(), modelObject={modelObject}")
+        logger.debug(lambda: f"-create(), modelObject={modelObject}")
         return modelObject
 
     def bulkCreate(self, modelObjects: List[Permission]) -> List[Permission]:
         """Crates a new role"""
-        logger.debug(f"+bulkCreate({modelObjects})")
+        logger.debug(lambda: f"+bulkCreate({modelObjects})")
         results = []
         for modelObject in modelObjects:
             result = self.create(modelObject)
             results.append(result)
 
-        logger.debug(f"-bulkCreate(), results={results}")
+        logger.debug(lambda: f"-bulkCreate(), results={results}")
         return results
 
     def update(self, modelObject: Permission) -> Permission:
         """Updates the role"""
-        logger.debug(f"+update({modelObject})")
+        logger.debug(lambda: f"+update({modelObject})")
         self.validate(SchemaOperation.UPDATE, modelObject)
         # check record exists by id
         if not self.existsByFilter({"id": modelObject.id}):
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, f"Permission doesn't exist!")
 
         schemaObject = self.permissionRepository.findById(PermissionSchema, modelObject.id)
-        logger.debug(f"schemaObject={schemaObject}")
+        logger.debug(lambda: f"schemaObject={schemaObject}")
         if modelObject.name and schemaObject.name != modelObject.name:
             schemaObject.name = modelObject.name
 
@@ -358,18 +342,21 @@ class PermissionService(AbstractService):
 
         # roleSchema = CompanyMapper.fromModel(oldRole)
         self.permissionRepository.update(schemaObject)
+        # the permission may be granted by any role
+        grantCache.clear()
         schemaObject = self.permissionRepository.filter({"id": schemaObject.id})[0]
         modelObject = PermissionMapper.fromSchema(schemaObject)
-        logger.debug(f"-update(), modelObject={modelObject}")
+        logger.debug(lambda: f"-update(), modelObject={modelObject}")
         return modelObject
 
     def delete(self, id: int) -> None:
-        logger.debug(f"+delete({id})")
+        logger.debug(lambda: f"+delete({id})")
         # check record exists by id
         filter = {"id": id}
         if self.existsByFilter(filter):
             self.permissionRepository.delete(filter)
+            grantCache.clear()
         else:
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, "Permission doesn't exist!")
 
-        logger.debug(f"-delete()")
+        logger.debug(lambda: f"-delete()")
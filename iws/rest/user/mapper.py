@@ -1,56 +1,54 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
-
-from framework.orm.mapper import Mapper
+from framework.logger import getLogger
+from framework.orm.mapper import Mapper, SchemaMapper
 from framework.orm.pydantic.model import BaseModel
 from framework.orm.sqlalchemy.schema import BaseSchema
 from rest.user.model import User, Address, UserSecurity
 from rest.user.schema import UserSchema, AddressSchema, UserSecuritySchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class UserMapper(Mapper):
 
+    # the compiled mapper of the (trusted) database rows
+    SCHEMA_MAPPER = SchemaMapper(UserSchema, User, {"addresses": SchemaMapper(AddressSchema, Address)})
+
     @classmethod
     # @override
     def fromSchema(cls, schemaObject: UserSchema) -> User:
-        logger.debug(f"+fromSchema({schemaObject})")
-        modelObject = User(**schemaObject.toJSONObject())
-        if schemaObject.addresses:
-            logger.debug(f"schemaObject={schemaObject}, schemaObject.addresses={schemaObject.addresses}")
-            modelObject.addresses = [AddressMapper.fromSchema(address) for address in
-                                     schemaObject.addresses] if schemaObject.addresses else None
+        logger.debug(lambda: f"+fromSchema({schemaObject})")
+        modelObject = cls.SCHEMA_MAPPER.fromSchema(schemaObject)
         # user_security
         # modelObject.user_security = UserSecurityMapper.fromSchema(
         #     schemaObject.user_security) if schemaObject.user_security else None
 
-        logger.debug(f"-fromSchema(), modelObject={modelObject}")
+        logger.debug(lambda: f"-fromSchema(), modelObject={modelObject}")
         return modelObject
 
     @classmethod
     # @override
     def fromModel(cls, modelObject: User) -> UserSchema:
-        logger.debug(f"+fromModel({modelObject})")
+        logger.debug(lambda: f"+fromModel({modelObject})")
         schemaObject = UserSchema(**modelObject.toJSONObject())
         if modelObject.addresses:
-            logger.debug(f"modelObject={modelObject}, modelObject.addresses={modelObject.addresses}")
+            logger.debug(lambda: f"modelObject={modelObject}, modelObject.addresses={modelObject.addresses}")
             schemaObject.addresses = [AddressMapper.fromModel(address) for address in
                                       modelObject.addresses] if modelObject.addresses else None
 
         # user_security
-        logger.debug(f"modelObject.user_security={modelObject.user_security}")
+        logger.debug(lambda: f"modelObject.user_security={modelObject.user_security}")
         schemaObject.user_security = UserSecurityMapper.fromModel(
             modelObject.user_security) if modelObject.user_security else None
 
-        logger.debug(f"-fromModel(), schemaObject={schemaObject}")
+        logger.debug(lambda: f"-fromModel(), schemaObject={schemaObject}")
         return schemaObject
 
     @classmethod
     def fromSchemas(cls, schemaObjects: list[BaseSchema]) -> list[BaseModel]:
-        return [UserMapper.fromSchema(schemaObject) for schemaObject in schemaObjects]
+        return cls.SCHEMA_MAPPER.fromSchemas(schemaObjects)
 
     @classmethod
     def fromModels(cls, modelObjects: list[BaseModel]) -> list[BaseSchema]:
@@ -80,10 +78,13 @@ class UserSecurityMapper(Mapper):
 
 class AddressMapper(Mapper):
 
+    # the compiled mapper of the (trusted) database rows
+    SCHEMA_MAPPER = UserMapper.SCHEMA_MAPPER.relationships["addresses"]
+
     @classmethod
     def fromSchema(cls, schemaObject: AddressSchema) -> Address:
         # logger.debug(f"+fromSchema(), schemaObject={schemaObject}")
-        return Address(**schemaObject.toJSONObject())
+        return cls.SCHEMA_MAPPER.fromSchema(schemaObject)
 
     @classmethod
     def fromModel(cls, modelObject: Address) -> AddressSchema:
@@ -92,7 +93,7 @@ class AddressMapper(Mapper):
 
     @classmethod
     def fromSchemas(cls, schemaObjects: list[BaseSchema]) -> list[BaseModel]:
-        return [AddressMapper.fromSchema(schemaObject) for schemaObject in schemaObjects]
+        return cls.SCHEMA_MAPPER.fromSchemas(schemaObjects)
 
     @classmethod
     def fromModels(cls, modelObjects: list[BaseModel]) -> list[BaseSchema]:
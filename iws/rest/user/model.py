@@ -1,14 +1,14 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from dataclasses import field
 from datetime import datetime
 from typing import Optional, List, Any
 
+from framework.logger import getLogger
 from framework.orm.pydantic.model import AbstractModel, BaseModel
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class Person(BaseModel):
@@ -45,15 +45,15 @@ class User(Person):
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def toJSONObject(self) -> Any:
         # return {column.key: getattr(self, column.key) for column in inspect(self).mapper.column_attrs}
-        logger.debug(f"+toJSONObject() => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"+toJSONObject() => type={type(self)}, object={str(self)}")
         jsonObject = self.model_dump(mode="json", exclude="user_security")
         # return self.model_dump(mode="json", exclude="user_security")
-        logger.debug(f"-toJSONObject(), jsonObject={jsonObject}")
+        logger.debug(lambda: f"-toJSONObject(), jsonObject={jsonObject}")
         return jsonObject
 
     def __str__(self) -> str:
@@ -104,7 +104,7 @@ class Address(BaseModel):
 
     def to_json(self) -> str:
         """Returns the JSON representation of this object."""
-        logger.debug(f"{self.getClassName()} => type={type(self)}, object={str(self)}")
+        logger.debug(lambda: f"{self.getClassName()} => type={type(self)}, object={str(self)}")
         return self.model_dump_json()
 
     def __str__(self) -> str:
@@ -1,19 +1,18 @@
 #
 # Author: Rohtash Lakra
 #
+from typing import List, Optional, Dict, Any, Tuple, Set
 
-import logging
-from typing import List, Optional, Dict, Any
-
-from sqlalchemy import update, func
+from sqlalchemy import update, func, select, insert, or_, Row
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
-from sqlalchemy.orm import Session
 
-from framework.orm.sqlalchemy.repository import SqlAlchemyRepository
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
+from framework.orm.sqlalchemy.repository import SqlAlchemyRepository, LoadPlan, SQLITE_MAX_PARAMETERS
 from globals import connector
-from rest.user.schema import UserSchema, UserSecuritySchema, AddressSchema
+from rest.user.schema import UserSchema, UserSecuritySchema, AddressSchema, UserRoleSchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class UserRepository(SqlAlchemyRepository):
@@ -23,19 +22,18 @@ class UserRepository(SqlAlchemyRepository):
         super().__init__(engine=connector.engine)
 
     # @override
-    def filter(self, filters: Dict[str, Any]) -> List[Optional[UserSchema]]:
-        """Returns records by filter or empty list"""
-        logger.debug(f"+{self.__class__.__name__}.filter({filters})")
+    def filter(self, filters: Dict[str, Any], loadPlan: LoadPlan = None,
+               pageRequest: PageRequest = None) -> List[Optional[UserSchema]]:
+        """Returns records by filter or empty list, the relationships are loaded as per the load plan"""
+        logger.debug(lambda: f"+{self.__class__.__name__}.filter({filters}, {loadPlan}, {pageRequest})")
         schemaObjects = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             try:
-                if filters:
-                    schemaObjects = session.query(UserSchema).filter_by(**filters).all()
-                else:
-                    schemaObjects = session.query(UserSchema).all()
+                statement, parameters = self.filterStatement(UserSchema, filters, loadPlan, pageRequest)
+                schemaObjects = session.scalars(statement, parameters).unique().all()
 
-                logger.debug(f"Loaded [{len(schemaObjects)}] user(s), schemaObjects={schemaObjects}")
+                logger.debug(lambda: f"Loaded [{len(schemaObjects)}] user(s), schemaObjects={schemaObjects}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -60,25 +58,17 @@ class UserRepository(SqlAlchemyRepository):
                 # on rollback, the same closure of state as that of commit proceeds.
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-{self.__class__.__name__}.filter(), schemaObjects={schemaObjects}")
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.filter(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def findByUsername(self, userName: str) -> UserSchema:
-        logger.debug(f"+findByUsername({userName})")
+        logger.debug(lambda: f"+findByUsername({userName})")
         schemaObjects = List[Optional[UserSchema]]
-        with Session(self.get_engine()) as session:
+        with self.openSession() as session:
             try:
                 schemaObjects = session.query(UserSchema).filter(UserSchema.name == userName).all()
-                logger.debug(f"Loaded [{len(schemaObjects)}] user(s), schemaObjects={schemaObjects}")
+                logger.debug(lambda: f"Loaded [{len(schemaObjects)}] user(s), schemaObjects={schemaObjects}")
             except NoResultFound as ex:
                 logger.error(f"NoResultFound while loading user by name! Error={ex}")
                 raise ex
@@ -89,12 +79,12 @@ class UserRepository(SqlAlchemyRepository):
                 logger.error(f"Exception while loading user by name! Error={ex}")
                 raise ex
 
-        logger.info(f"-findByUsername(), schemaObjects={schemaObjects}")
+        logger.info(lambda: f"-findByUsername(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def update(self, schemaObject: UserSchema) -> UserSchema:
-        logger.debug(f"+update({schemaObject})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+update({schemaObject})")
+        with self.openSession() as session:
             try:
                 schemaObject.updated_at = func.now()
                 results = session.execute(
@@ -102,7 +92,7 @@ class UserRepository(SqlAlchemyRepository):
                     .values(schemaObject.to_json())
                     .where(UserSchema.id == schemaObject.id)
                 ).rowcount
-                logger.debug(f"Updated [{results}] user.")
+                logger.debug(lambda: f"Updated [{results}] user.")
 
                 session.commit()
             except NoResultFound as ex:
@@ -118,15 +108,15 @@ class UserRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-update(), results={results}")
+        logger.info(lambda: f"-update(), results={results}")
         return results
 
     def delete(self, filters: Dict[str, Any]) -> None:
-        logger.debug(f"+delete({filters})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+delete({filters})")
+        with self.openSession() as session:
             try:
                 schemaObject = session.query(UserSchema).filter_by(**filters).one()
-                logger.debug(f"Deleting schemaObject={schemaObject}")
+                logger.debug(lambda: f"Deleting schemaObject={schemaObject}")
                 session.delete(schemaObject)
                 logger.debug("User is successfully deleted.")
                 session.commit()
@@ -143,33 +133,93 @@ class UserRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-delete()")
+        logger.info(lambda: f"-delete()")
 
-    def bulkDelete(self, ids: list[int]) -> None:
-        logger.debug(f"+bulkDelete({ids})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+    def findRegistered(self, emails: List[str], userNames: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Returns the already registered emails and user names of the provided ones with one lookup per
+        SQLite's parameter limit (a single 'SELECT ... WHERE email IN (...) OR user_name IN (...)' usually)."""
+        logger.debug(lambda: f"+findRegistered({len(emails)} emails, {len(userNames)} user names)")
+        registeredEmails, registeredUserNames = set(), set()
+        chunkSize = SQLITE_MAX_PARAMETERS // 2
+        with self.openSession() as session:
             try:
-                schemaObjects = self.filter({"id": ids})
-                for schemaObject in schemaObjects:
-                    logger.debug(f"Deleting record with id=[{schemaObject.id}]")
-                    session.delete(schemaObject)
-
-                logger.debug(f"Deleted [{len(schemaObjects)}] users successfully.")
-                session.commit()
-            except NoResultFound as ex:
-                logger.error(f"NoResultFound while bulk deleting users! Error={ex}")
-                session.rollback()
-                raise ex
-            except MultipleResultsFound as ex:
-                logger.error(f"MultipleResultsFound while bulk deleting users! Error={ex}")
-                session.rollback()
-                raise ex
+                for index in range(0, max(len(emails), len(userNames)), chunkSize):
+                    rows = session.execute(
+                        select(UserSchema.email, UserSchema.user_name)
+                        .where(or_(UserSchema.email.in_(emails[index:index + chunkSize]),
+                                   UserSchema.user_name.in_(userNames[index:index + chunkSize])))
+                    )
+                    for email, userName in rows:
+                        registeredEmails.add(email)
+                        registeredUserNames.add(userName)
             except Exception as ex:
-                logger.error(f"Exception while bulk deleting users! Error={ex}")
-                session.rollback()
-                raise ex
-
-        logger.info(f"-bulkDelete()")
+                logger.error(f"Exception while loading registered users! Error={ex}")
+                session.rollback()
+                raise ex
+
+        logger.debug(lambda: f"-findRegistered(), emails={registeredEmails}, userNames={registeredUserNames}")
+        return registeredEmails, registeredUserNames
+
+    def bulkRegister(self, users: List[Dict[str, Any]], securities: List[Dict[str, Any]],
+                     addresses: List[List[Dict[str, Any]]] = None) -> Tuple[List[Row], List[List[Row]]]:
+        """Inserts the users, their security records and their addresses with one multi-row 'INSERT ... RETURNING' per
+        table in one transaction and returns the generated (id, admin, last_seen, created_at, updated_at) rows in the
+        users order and the generated (id, user_id, created_at, updated_at) rows of each user's addresses.
+
+        The securities and the (lists of the) addresses are in the same order as the users, their 'user_id' is set from
+        the generated ids.
+        """
+        logger.debug(lambda: f"+bulkRegister({len(users)} users)")
+        rows = []
+        addressRows = [[] for _ in users]
+        if users:
+            with self.openSession() as session:
+                try:
+                    rows = session.execute(
+                        insert(UserSchema).returning(UserSchema.id, UserSchema.admin, UserSchema.last_seen,
+                                                     UserSchema.created_at, UserSchema.updated_at,
+                                                     sort_by_parameter_order=True),
+                        users
+                    ).all()
+                    for row, security in zip(rows, securities):
+                        security["user_id"] = row.id
+
+                    session.execute(insert(UserSecuritySchema), securities)
+                    # the addresses of all the users, flattened in the users order
+                    owners = []
+                    flattened = []
+                    for index, (row, userAddresses) in enumerate(zip(rows, addresses or [])):
+                        for address in userAddresses:
+                            address["user_id"] = row.id
+                            owners.append(index)
+                            flattened.append(address)
+
+                    if flattened:
+                        returned = session.execute(
+                            insert(AddressSchema).returning(AddressSchema.id, AddressSchema.user_id,
+                                                            AddressSchema.created_at, AddressSchema.updated_at,
+                                                            sort_by_parameter_order=True),
+                            flattened
+                        ).all()
+                        for index, addressRow in zip(owners, returned):
+                            addressRows[index].append(addressRow)
+
+                    session.commit()
+                    logger.debug(lambda: f"Registered [{len(rows)}] users, [{len(flattened)}] addresses successfully.")
+                except Exception as ex:
+                    logger.error(f"Exception while bulk registering users! Error={ex}")
+                    session.rollback()
+                    raise ex
+
+        logger.info(lambda: f"-bulkRegister(), rows={len(rows)}")
+        return rows, addressRows
+
+    def bulkDelete(self, ids: list[int]) -> int:
+        """Deletes the users by ids with set-based statements and returns the number of deleted rows"""
+        logger.debug(lambda: f"+bulkDelete({ids})")
+        results = self.deleteByIds(UserSchema, ids, cascades=[UserRoleSchema.user_id])
+        logger.info(lambda: f"-bulkDelete(), results={results}")
+        return results
 
 
 class UserSecurityRepository(SqlAlchemyRepository):
@@ -181,17 +231,18 @@ class UserSecurityRepository(SqlAlchemyRepository):
     # @override
     def filter(self, filters: Dict[str, Any]) -> List[Optional[UserSecuritySchema]]:
         """Returns records by filter or empty list"""
-        logger.debug(f"+{self.__class__.__name__}.findByFilter({filters})")
+        logger.debug(lambda: f"+{self.__class__.__name__}.findByFilter({filters})")
         schemaObjects = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             try:
                 if filters:
                     schemaObjects = session.query(UserSecuritySchema).filter_by(**filters).all()
                 else:
                     schemaObjects = session.query(UserSecuritySchema).all()
 
-                logger.debug(f"Loaded [{len(schemaObjects)}] user's security record(s). schemaObjects={schemaObjects}")
+                logger.debug(
+                    lambda: f"Loaded [{len(schemaObjects)}] user's security record(s). schemaObjects={schemaObjects}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -216,21 +267,13 @@ class UserSecurityRepository(SqlAlchemyRepository):
                 # on rollback, the same closure of state as that of commit proceeds.
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-{self.__class__.__name__}.findByFilter(), schemaObjects={schemaObjects}")
+
+        logger.debug(lambda: f"-{self.__class__.__name__}.findByFilter(), schemaObjects={schemaObjects}")
         return schemaObjects
 
     def update(self, schemaObject: UserSecuritySchema) -> UserSchema:
-        logger.debug(f"+{self.__class__.__name__}.update({schemaObject})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+{self.__class__.__name__}.update({schemaObject})")
+        with self.openSession() as session:
             try:
                 schemaObject.updated_at = func.now()
                 results = session.execute(
@@ -238,7 +281,7 @@ class UserSecurityRepository(SqlAlchemyRepository):
                     .values(schemaObject.to_json())
                     .where(UserSchema.id == schemaObject.id)
                 ).rowcount
-                logger.debug(f"Updated [{results}] user's security record(s).")
+                logger.debug(lambda: f"Updated [{results}] user's security record(s).")
 
                 session.commit()
             except NoResultFound as ex:
@@ -254,17 +297,17 @@ class UserSecurityRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-{self.__class__.__name__}.update(), results={results}")
+        logger.info(lambda: f"-{self.__class__.__name__}.update(), results={results}")
         return results
 
     def delete(self, filters: Dict[str, Any]) -> None:
-        logger.debug(f"+{self.__class__.__name__}.delete({filters})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+{self.__class__.__name__}.delete({filters})")
+        with self.openSession() as session:
             try:
                 schemaObject = session.query(UserSecuritySchema).filter_by(**filters).one()
-                logger.debug(f"Deleting schemaObject={schemaObject}")
+                logger.debug(lambda: f"Deleting schemaObject={schemaObject}")
                 session.delete(schemaObject)
-                logger.debug(f"UserSecuritySchema is successfully deleted.")
+                logger.debug(lambda: f"UserSecuritySchema is successfully deleted.")
                 session.commit()
             except NoResultFound as ex:
                 logger.error(f"NoResultFound while deleting user's security record(s)! Error={ex}")
@@ -279,33 +322,14 @@ class UserSecurityRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-{self.__class__.__name__}.delete()")
+        logger.info(lambda: f"-{self.__class__.__name__}.delete()")
 
-    def bulkDelete(self, ids: list[int]) -> None:
-        logger.debug(f"+{self.__class__.__name__}.bulkDelete({ids})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
-            try:
-                schemaObjects = self.filter({"id": ids})
-                for schemaObject in schemaObjects:
-                    logger.debug(f"Deleting record with id=[{schemaObject.id}]")
-                    session.delete(schemaObject)
-
-                logger.debug(f"Deleted [{len(schemaObjects)}] user's security record(s) successfully.")
-                session.commit()
-            except NoResultFound as ex:
-                logger.error(f"NoResultFound while bulk deleting user's security record(s)! Error={ex}")
-                session.rollback()
-                raise ex
-            except MultipleResultsFound as ex:
-                logger.error(f"MultipleResultsFound while bulk deleting user's security record(s)! Error={ex}")
-                session.rollback()
-                raise ex
-            except Exception as ex:
-                logger.error(f"Exception while bulk deleting user's security record(s)! Error={ex}")
-                session.rollback()
-                raise ex
-
-        logger.info(f"-{self.__class__.__name__}.bulkDelete()")
+    def bulkDelete(self, ids: list[int]) -> int:
+        """Deletes the user's security records by ids with set-based statements and returns the deleted rows count"""
+        logger.debug(lambda: f"+{self.__class__.__name__}.bulkDelete({ids})")
+        results = self.deleteByIds(UserSecuritySchema, ids)
+        logger.info(lambda: f"-{self.__class__.__name__}.bulkDelete(), results={results}")
+        return results
 
 
 class AddressRepository(SqlAlchemyRepository):
@@ -317,17 +341,17 @@ class AddressRepository(SqlAlchemyRepository):
     # @override
     def filter(self, filters: Dict[str, Any]) -> List[Optional[AddressSchema]]:
         """Returns records by filter or empty list"""
-        logger.debug(f"+findByFilter({filters})")
+        logger.debug(lambda: f"+findByFilter({filters})")
         addressSchemas = None
         # verbose version of what a context manager will do
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        with self.openSession() as session:
             try:
                 if filters:
                     addressSchemas = session.query(AddressSchema).filter_by(**filters).all()
                 else:
                     addressSchemas = session.query(AddressSchema).all()
 
-                logger.debug(f"Loaded [{len(addressSchemas)}] addresses => addressSchemas={addressSchemas}")
+                logger.debug(lambda: f"Loaded [{len(addressSchemas)}] addresses => addressSchemas={addressSchemas}")
 
                 # Commit:
                 # The pending changes above are flushed via flush(), the Transaction is committed, the Connection
@@ -353,21 +377,13 @@ class AddressRepository(SqlAlchemyRepository):
                 logger.error(f"Exception while loading addresses!")
                 session.rollback()
                 raise
-            finally:
-                # close the Session.
-                # This will expunge any remaining objects as well as reset any existing 'SessionTransaction' state.
-                # Neither of these steps are usually essential.
-                # However, if the commit() or rollback() itself experienced an unanticipated internal failure
-                # (such as due to a mis-behaved user-defined event handler), .close() will ensure that invalid state
-                # is removed.
-                session.close()
-
-        logger.debug(f"-findByFilter(), addressSchemas={addressSchemas}")
+
+        logger.debug(lambda: f"-findByFilter(), addressSchemas={addressSchemas}")
         return addressSchemas
 
     def update(self, addressSchema: AddressSchema) -> AddressSchema:
-        logger.debug(f"+update({addressSchema})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+update({addressSchema})")
+        with self.openSession() as session:
             try:
                 addressSchema.updated_at = func.now()
                 results = session.execute(
@@ -375,7 +391,7 @@ class AddressRepository(SqlAlchemyRepository):
                     .values(addressSchema.to_json())
                     .where(AddressSchema.id == addressSchema.id)
                 ).rowcount
-                logger.debug(f"Updated [{results}] addresses.")
+                logger.debug(lambda: f"Updated [{results}] addresses.")
 
                 session.commit()
             except NoResultFound as ex:
@@ -391,15 +407,15 @@ class AddressRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-update(), results={results}")
+        logger.info(lambda: f"-update(), results={results}")
         return results
 
     def delete(self, filters: Dict[str, Any]) -> None:
-        logger.debug(f"+delete({filters})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
+        logger.debug(lambda: f"+delete({filters})")
+        with self.openSession() as session:
             try:
                 addressSchema = session.query(AddressSchema).filter_by(**filters).one()
-                logger.debug(f"Deleting addressSchema={addressSchema}")
+                logger.debug(lambda: f"Deleting addressSchema={addressSchema}")
                 session.delete(addressSchema)
                 logger.info("Address is successfully deleted.")
                 session.commit()
@@ -416,30 +432,11 @@ class AddressRepository(SqlAlchemyRepository):
                 session.rollback()
                 raise ex
 
-        logger.info(f"-delete()")
+        logger.info(lambda: f"-delete()")
 
-    def bulkDelete(self, ids: list[int]) -> None:
-        logger.debug(f"+bulkDelete({ids})")
-        with Session(bind=self.get_engine(), expire_on_commit=False) as session:
-            try:
-                addressSchemas = self.filter({"id": ids})
-                for addressSchema in addressSchemas:
-                    logger.debug(f"Deleting address with id=[{addressSchema.id}]")
-                    session.delete(addressSchema)
-
-                logger.debug(f"Deleted [{len(addressSchemas)}] addresses successfully.")
-                session.commit()
-            except NoResultFound as ex:
-                logger.error(f"NoResultFound while bulk deleting addresses! Error={ex}")
-                session.rollback()
-                raise ex
-            except MultipleResultsFound as ex:
-                logger.error(f"MultipleResultsFound while bulk deleting addresses! Error={ex}")
-                session.rollback()
-                raise ex
-            except Exception as ex:
-                logger.error(f"Exception while deleting bulk addresses! Error={ex}")
-                session.rollback()
-                raise ex
-
-        logger.info(f"-bulkDelete()")
+    def bulkDelete(self, ids: list[int]) -> int:
+        """Deletes the addresses by ids with set-based statements and returns the number of deleted rows"""
+        logger.debug(lambda: f"+bulkDelete({ids})")
+        results = self.deleteByIds(AddressSchema, ids)
+        logger.info(lambda: f"-bulkDelete(), results={results}")
+        return results
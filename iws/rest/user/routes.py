@@ -11,6 +11,7 @@ from flask import session, g
 
 from framework.exception import DuplicateRecordException, ValidationException, RecordNotFoundException
 from framework.http import HTTPStatus
+from framework.orm.pagination import PageRequest
 from framework.orm.pydantic.model import ResponseModel
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from rest.auth import auth
@@ -140,26 +141,31 @@ def bulkCreate():
     """Create/Register Bulk Users"""
     logger.debug(f"+bulkCreate() => request={request}, args={request.args}, is_json:{request.is_json}")
     try:
-        roles = []
+        users = []
         if request.is_json:
             body = request.get_json()
             logger.debug(f"type={type(body)}, body={body}")
             if isinstance(body, list):
-                roles = [User(**entry) for entry in body]
+                users = [User(**entry) for entry in body]
             elif isinstance(body, dict):
-                roles.append(User(**body))
+                users.append(User(**body))
             else:
                 # handle form fields here.
                 pass
 
-        logger.debug(f"roles={roles}")
+        logger.debug(f"users={len(users)}")
         userService = UserService()
-        userService.validates(SchemaOperation.CREATE, roles)
-        roles = userService.bulkCreate(roles)
-        logger.debug(f"roles={roles}")
+        # the invalid/duplicate users are reported as errors without aborting the batch
+        users, errors = userService.bulkCreate(users)
+        logger.debug(f"users={len(users)}, errors={len(errors)}")
         # build success response
-        response = ResponseModel(status=HTTPStatus.CREATED.statusCode, message="Roles are successfully created.")
-        response.addInstances(roles)
+        if users:
+            response = ResponseModel(status=HTTPStatus.CREATED.statusCode, message="Users are successfully created.")
+        else:
+            response = ResponseModel(status=errors[0].status, message="No user is created.")
+
+        response.addInstances(users)
+        response.addInstances(errors)
     except ValidationException as ex:
         response = ResponseModel.buildResponseWithException(ex)
     except DuplicateRecordException as ex:
@@ -178,14 +184,16 @@ def findByFilter():
     logger.debug(f"+findByFilter) => request={request}, args={request.args}, is_json:{request.is_json}")
     try:
         userService = UserService()
-        userObjects = userService.findByFilter(request.args)
+        pageRequest, filters = PageRequest.fromFilters(request.args)
+        page = userService.findPage(filters, pageRequest)
 
         # build success response
         response = ResponseModel.buildResponse(HTTPStatus.OK)
-        if userObjects:
-            response.addInstances(userObjects)
-        else:
+        response.addPage(page)
+        if not page.items:
             response.message = "No Records Exist!"
+    except ValidationException as ex:
+        response = ResponseModel.buildResponseWithException(ex)
     except Exception as ex:
         response = ResponseModel.buildResponse(HTTPStatus.INTERNAL_SERVER_ERROR, message=str(ex), exception=ex)
 
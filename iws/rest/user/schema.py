@@ -47,8 +47,9 @@ class UserSchema(PersonSchema):
 
     # not Optional[], therefore will be NOT NULL
     # 'one-to-one' pattern can be enabled using the 'relationship.uselist' parameter set to 'False'
+    # loaded with a separate 'SELECT ... IN' by default (no cartesian joins), see 'LoadStrategy' to override per query
     user_security: Mapped["UserSecuritySchema"] = relationship("UserSecuritySchema", back_populates="user",
-                                                               lazy="joined", uselist=False,
+                                                               lazy="selectin", uselist=False,
                                                                cascade="all, delete-orphan")
 
     # Other variants of 'Mapped' are available, most commonly the 'relationship()' construct indicated above.
@@ -63,7 +64,7 @@ class UserSchema(PersonSchema):
     # addresses: Mapped[List["Address"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     # Optional[], therefore will be NULL
     # Define the one-to-many relationship
-    addresses: Mapped[Optional[List["AddressSchema"]]] = relationship(back_populates="user", lazy="joined",
+    addresses: Mapped[Optional[List["AddressSchema"]]] = relationship(back_populates="user", lazy="selectin",
                                                                       cascade="all, delete-orphan")
 
     # Define the one-to-many relationship
@@ -127,8 +128,8 @@ class UserRoleSchema(AbstractSchema):
 
     def __str__(self) -> str:
         """Returns the string representation of this object"""
-        return ("{} <id={}, role_id={}, user_id={}, {}>"
-                .format(self.getClassName(), self.id, self.role_id, self.user_id, self.auditable()))
+        return ("{} <role_id={}, user_id={}, {}>"
+                .format(self.getClassName(), self.role_id, self.user_id, self.auditable()))
 
 
 class AddressSchema(BaseSchema):
@@ -1,9 +1,8 @@
 #
 # Author: Rohtash Lakra
 #
-import logging
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from common.config import Config
 from framework.exception import (
@@ -13,7 +12,10 @@ from framework.exception import (
     AuthenticationException
 )
 from framework.http import HTTPStatus
-from framework.orm.pydantic.model import BaseModel
+from framework.logger import getLogger
+from framework.orm.pagination import PageRequest
+from framework.orm.pydantic.model import BaseModel, ErrorModel
+from framework.orm.sqlalchemy.repository import LoadPlan, LoadStrategy
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from framework.security.crypto import CryptoUtils
 from framework.security.crypto import SecurityException
@@ -21,23 +23,32 @@ from framework.security.hash import HashUtils
 from framework.security.jwt import AuthModel, AuthenticatedUser, TokenTypeEnum
 from framework.service import AbstractService
 from framework.utils import Utils
+from globals import principalCache, grantCache
 from rest.user.mapper import UserMapper
 from rest.user.model import User, LoginUser
 from rest.user.repository import UserRepository, UserSecurityRepository
-from rest.user.schema import UserSecuritySchema
+from rest.user.schema import UserSchema, UserSecuritySchema
 
-logger = logging.getLogger(__name__)
+logger = getLogger(__name__)
 
 
 class UserService(AbstractService):
     
+    # the relationships loaded for the users listing (the security records aren't exposed)
+    LIST_LOAD_PLAN = {"addresses": LoadStrategy.SELECTIN, "user_security": LoadStrategy.NONE}
+    
+    # the user's fields persisted in the [users] table on registration
+    USER_COLUMNS = {"email", "first_name", "last_name", "birth_date", "avatar_url", "user_name", "admin"}
+    # the columns of the addresses inserted by 'bulkCreate()'
+    ADDRESS_COLUMNS = {"street1", "street2", "city", "state", "country", "zip"}
+    
     def __init__(self):
-        logger.debug(f"UserService()")
+        logger.debug(lambda: f"UserService()")
         self.userRepository = UserRepository()
         self.userSecurityRepository = UserSecurityRepository()
     
     def validate(self, operation: SchemaOperation, user: User) -> None:
-        logger.debug(f"+validate({operation}, {user})")
+        logger.debug(lambda: f"+validate({operation}, {user})")
         # super().validate(operation, user)
         error_messages = []
         
@@ -71,35 +82,43 @@ class UserService(AbstractService):
             error_messages.append("'User' is not fully defined!")
         
         # throw an error if any validation error
-        logger.debug(f"error_messages={error_messages}")
+        logger.debug(lambda: f"error_messages={error_messages}")
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"-validate(), {type(error)} = exception={error}")
+            logger.debug(lambda: f"-validate(), {type(error)} = exception={error}")
             raise error
         
-        logger.debug(f"-validate()")
+        logger.debug(lambda: f"-validate()")
     
     # @override
-    def findByFilter(self, filters: Dict[str, Any]) -> List[Optional[BaseModel]]:
+    def findByFilter(self, filters: Dict[str, Any], loadPlan: LoadPlan = LIST_LOAD_PLAN,
+                     pageRequest: PageRequest = None) -> List[Optional[BaseModel]]:
         """Returns the records based on the provided filters"""
-        logger.debug(f"+findByFilter({filters})")
-        schemaObjects = self.userRepository.filter(filters)
-        modelObjects = [UserMapper.fromSchema(schemaObject) for schemaObject in schemaObjects]
-        logger.debug(f"-findByFilter(), modelObjects={modelObjects}")
+        logger.debug(lambda: f"+findByFilter({filters}, {loadPlan}, {pageRequest})")
+        schemaObjects = self.userRepository.filter(filters, loadPlan, pageRequest)
+        modelObjects = UserMapper.fromSchemas(schemaObjects)
+        logger.debug(lambda: f"-findByFilter(), modelObjects={modelObjects}")
         return modelObjects
     
     # @override
     def existsByFilter(self, filters: Dict[str, Any]) -> bool:
         """Returns True if the records exist by filter otherwise False"""
-        logger.debug(f"+existsByFilter({filters})")
-        schemaObjects = self.userRepository.filter(filters)
-        result = True if schemaObjects else False
-        logger.debug(f"-existsByFilter(), result={result}")
+        logger.debug(lambda: f"+existsByFilter({filters})")
+        result = self.userRepository.exists(UserSchema, filters)
+        logger.debug(lambda: f"-existsByFilter(), result={result}")
+        return result
+
+    # @override
+    def countByFilter(self, filters: Dict[str, Any]) -> int:
+        """Returns the number of the records matching the filter"""
+        logger.debug(lambda: f"+countByFilter({filters})")
+        result = self.userRepository.count(UserSchema, filters)
+        logger.debug(lambda: f"-countByFilter(), result={result}")
         return result
     
     def validates(self, operation: SchemaOperation, users: List[User]) -> None:
         """Validates the objects based on the operation"""
-        logger.debug(f"+validates({operation}, {users})")
+        logger.debug(lambda: f"+validates({operation}, {users})")
         error_messages = []
         
         # validate the object
@@ -112,14 +131,14 @@ class UserService(AbstractService):
         # throw an error if any validation error
         if error_messages and len(error_messages) > 0:
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"{type(error)} = exception={error}")
+            logger.debug(lambda: f"{type(error)} = exception={error}")
             raise error
         
-        logger.debug(f"-validates()")
+        logger.debug(lambda: f"-validates()")
     
     def register(self, modelObject: User) -> User:
         """Crates/Registers a new user"""
-        logger.debug(f"+register({modelObject})")
+        logger.debug(lambda: f"+register({modelObject})")
         self.validate(SchemaOperation.CREATE, modelObject)
         # check user already exists or not
         if self.existsByFilter({"email": modelObject.email}):
@@ -134,19 +153,19 @@ class UserService(AbstractService):
         
         # persist user's security
         passwordHashCode = HashUtils.hashCode(modelObject.password)
-        logger.debug(f"modelObject.password={modelObject.password}, passwordHashCode={passwordHashCode}")
+        logger.debug(lambda: f"modelObject.password={modelObject.password}, passwordHashCode={passwordHashCode}")
         # saltHashCode, hashCode = HashUtils.hashCodeWithSalt(passwordHashCode)
         # logger.debug(f"saltHashCode={saltHashCode}, hashCode={hashCode}")
         # TODO: Capture platform value form user-agent
         userSecuritySchema = UserSecuritySchema(platform="Service", salt=Utils.randomUUID(),
                                                 hashed_auth_token=passwordHashCode)
-        logger.debug(f"userSecuritySchema={userSecuritySchema}")
+        logger.debug(lambda: f"userSecuritySchema={userSecuritySchema}")
         schemaObject.user_security = userSecuritySchema
         userSecuritySchema = self.userRepository.save(userSecuritySchema)
-        logger.debug(f"userSecuritySchema={userSecuritySchema}")
+        logger.debug(lambda: f"userSecuritySchema={userSecuritySchema}")
         
         modelObject = UserMapper.fromSchema(schemaObject)
-        logger.debug(f"modelObject={modelObject}")
+        logger.debug(lambda: f"modelObject={modelObject}")
         # user = User.model_validate(userSchema)
         
         # # build auth-token
@@ -155,34 +174,82 @@ class UserService(AbstractService):
         # authModelEncrypted = CryptoUtils.encrypt_with_aesgcm(Config.ENC_KEY, Config.ENC_NONCE, authModel.to_json())
         # logger.debug(f"authModelEncrypted={authModelEncrypted}")
         
-        logger.debug(f"-register(), modelObject={modelObject}")
+        logger.debug(lambda: f"-register(), modelObject={modelObject}")
         return modelObject
     
-    def bulkCreate(self, users: List[User]) -> List[User]:
-        """Crates users in bulk"""
-        logger.debug(f"+bulkCreate({users})")
+    def bulkCreate(self, users: List[User]) -> Tuple[List[User], List[ErrorModel]]:
+        """Crates/Registers users in bulk and returns the registered users and the errors of the rejected ones.
+
+        The batch is validated, checked against the registered emails/user names with one lookup and the passwords are
+        hashed up front, then the accepted users (and their addresses) are persisted with one multi-row insert per table
+        in one transaction.
+        An invalid or duplicate user is reported as an error (prefixed with its index) without aborting the batch.
+        """
+        logger.debug(lambda: f"+bulkCreate({len(users) if users else 0} users)")
+        if not users:
+            raise ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=["Users is required!"])
+        
+        errors = []
+        accepted = []
+        for index, user in enumerate(users):
+            try:
+                self.validate(SchemaOperation.CREATE, user)
+                accepted.append((index, user))
+            except ValidationException as ex:
+                errors.extend((index, ErrorModel.buildError(ex.httpStatus, f"[{index}] {message}"))
+                              for message in ex.messages)
+        
+        # check users already exist or not (in the database and earlier in the batch)
+        emails, userNames = self.userRepository.findRegistered([user.email for _, user in accepted],
+                                                               [user.user_name for _, user in accepted])
+        candidates = []
+        for index, user in accepted:
+            if user.email in emails or user.user_name in userNames:
+                name = user.email if user.email in emails else user.user_name
+                message = f"[{index}] User '{name}' is already registered!"
+                errors.append((index, ErrorModel.buildError(HTTPStatus.CONFLICT, message)))
+            else:
+                emails.add(user.email)
+                userNames.add(user.user_name)
+                candidates.append(user)
+        
+        # persist users, their securities and addresses
+        passwordHashCodes = [HashUtils.hashCode(user.password) for user in candidates]
+        securities = [dict(platform="Service", salt=Utils.randomUUID(), hashed_auth_token=passwordHashCode)
+                      for passwordHashCode in passwordHashCodes]
+        addresses = [[address.model_dump(include=self.ADDRESS_COLUMNS) for address in user.addresses or []]
+                     for user in candidates]
+        rows, addressRows = self.userRepository.bulkRegister(
+            [user.model_dump(include=self.USER_COLUMNS) for user in candidates], securities, addresses)
         results = []
-        for user in users:
-            result = self.register(user)
-            results.append(result)
+        for user, row, userAddressRows in zip(candidates, rows, addressRows):
+            userAddresses = [address.model_copy(update=dict(addressRow._mapping))
+                             for address, addressRow in zip(user.addresses or [], userAddressRows)]
+            results.append(user.model_copy(update=dict(row._mapping, password=None, addresses=userAddresses)))
+        # the errors in the users order
+        errors = [error for _, error in sorted(errors, key=lambda it: it[0])]
         
-        logger.debug(f"-bulkCreate(), results={results}")
-        return results
+        logger.debug(lambda: f"-bulkCreate(), results={len(results)}, errors={len(errors)}")
+        return results, errors
     
     def authenticate(self, token_type: TokenTypeEnum, auth_token: str) -> User:
-        """Authenticates the token"""
-        logger.debug(f"+authenticate({token_type}, {auth_token})")
+        """Authenticates the token.
+
+        The authenticated user is cached by the token's digest (see 'PrincipalCache'), the '@auth' requests with the
+        same token are authenticated from the cache until the entry expires or the user is updated/deleted.
+        """
+        logger.debug(lambda: f"+authenticate({token_type}, {auth_token})")
         try:
             # JWT Based Authentication
             if TokenTypeEnum.JWT == TokenTypeEnum:
-                raise AuthenticationException(HTTPStatus.UNAUTHORIZED, "Not yet supported!")
+                raise AuthenticationException(messages=["Not yet supported!"])
             else:
                 try:
                     authModelDecrypted = CryptoUtils.decrypt_with_aesgcm(Config.ENC_KEY, Config.ENC_NONCE, auth_token)
                 except SecurityException as ex:
-                    raise AuthenticationException(HTTPStatus.INTERNAL_SERVER_ERROR, messages=[str(ex)])
+                    raise AuthenticationException(messages=[str(ex)])
                 
-                logger.debug(f"type={type(authModelDecrypted)}, authModelDecrypted={authModelDecrypted}")
+                logger.debug(lambda: f"type={type(authModelDecrypted)}, authModelDecrypted={authModelDecrypted}")
                 authModel = AuthModel(**authModelDecrypted)
                 
                 # TODO: Time comparison with iat and expiry max
@@ -190,31 +257,36 @@ class UserService(AbstractService):
                 if userSecuritySchema:
                     passwordHashCode = HashUtils.hashCode(authModel.auth_token)
                     if userSecuritySchema.hashed_auth_token != passwordHashCode:
-                        raise AuthenticationException(HTTPStatus.UNAUTHORIZED, "Invalid Token!")
+                        raise AuthenticationException(messages=["Invalid Token!"])
                     
-                    if userSecuritySchema.expire_at and userSecuritySchema.expire_at < int(
-                            datetime.now(timezone.utc).timestamp()):
-                        raise AuthenticationException(HTTPStatus.UNAUTHORIZED, "Auth token has expired!")
+                    # the (epoch) expiry, stored as text
+                    expireAt = float(userSecuritySchema.expire_at) if userSecuritySchema.expire_at else None
+                    if expireAt is not None and expireAt < datetime.now(timezone.utc).timestamp():
+                        raise AuthenticationException(messages=["Auth token has expired!"])
                     
                     saltHashCode, hashCode = HashUtils.hashCodeWithSalt(passwordHashCode, userSecuritySchema.salt)
                     if not HashUtils.checkHashCode(authModel.auth_token, saltHashCode, hashCode):
-                        raise AuthenticationException(HTTPStatus.UNAUTHORIZED, "Invalid Token!")
+                        raise AuthenticationException(messages=["Invalid Token!"])
                     
                     # load authenticated user
-                    schemaObject = self.userRepository.filter({"id": authModel.user_id})[0]
+                    schemaObject = self.userRepository.filter({"id": authModel.user_id}, LoadStrategy.NONE)[0]
                     userObject = UserMapper.fromSchema(schemaObject)
                     userObject.authenticated = True
+                    principalCache.putPrincipal(auth_token, userObject.model_copy(), expireAt)
         
+        except AuthenticationException as ex:
+            logger.error(f"Auth token {auth_token} isn't authenticated!, Error:{ex.messages}")
+            raise ex
         except Exception as e:
             logger.error(f"Auth token {auth_token} seems to have been tampered!, Error:{e}")
-            raise AuthenticationException(HTTPStatus.UNAUTHORIZED, str(e))
+            raise AuthenticationException(messages=[str(e)])
         
-        logger.debug(f"-authenticate(), userObject={userObject}")
+        logger.debug(lambda: f"-authenticate(), userObject={userObject}")
         return userObject
     
     def login(self, loginUser: LoginUser) -> AuthenticatedUser:
         """Login a registered user"""
-        logger.debug(f"+{self.__class__.__name__}.login({loginUser})")
+        logger.debug(lambda: f"+{self.__class__.__name__}.login({loginUser})")
         # validate login-info
         error_messages = []
         
@@ -226,15 +298,15 @@ class UserService(AbstractService):
         if error_messages and len(error_messages) > 0:
             logger.error(f"error_messages={error_messages}")
             error = ValidationException(httpStatus=HTTPStatus.INVALID_DATA, messages=error_messages)
-            logger.debug(f"-validate(), {type(error)} = exception={error}")
+            logger.debug(lambda: f"-validate(), {type(error)} = exception={error}")
             raise error
         
         userObjects = None
         # load user either by email or user_name
         if loginUser.email:
-            userObjects = self.findByFilter({"email": loginUser.email})
+            userObjects = self.findByFilter({"email": loginUser.email}, LoadStrategy.NONE)
         elif loginUser.user_name:
-            userObjects = self.findByFilter({"user_name": loginUser.user_name})
+            userObjects = self.findByFilter({"user_name": loginUser.user_name}, LoadStrategy.NONE)
         
         # validate user exists either by email or username
         if not (userObjects and len(userObjects) > 0):
@@ -243,11 +315,11 @@ class UserService(AbstractService):
         # authenticate user by loading user's credentials
         userObject = userObjects[0]
         userSecuritySchema = self.userSecurityRepository.filter({"user_id": userObject.id})[0]
-        logger.debug(f"userSecuritySchema={userSecuritySchema}")
+        logger.debug(lambda: f"userSecuritySchema={userSecuritySchema}")
         
         # validate password
         passwordHashCode = HashUtils.hashCode(loginUser.password)
-        logger.debug(f"loginUser.password={loginUser.password}, passwordHashCode={passwordHashCode}")
+        logger.debug(lambda: f"loginUser.password={loginUser.password}, passwordHashCode={passwordHashCode}")
         # check the hashed-auth-token and password-auth-token are same
         if userSecuritySchema.hashed_auth_token != passwordHashCode:
             raise AuthenticationException(HTTPStatus.UNAUTHORIZED, messages=["Either username or password is wrong!"])
@@ -255,7 +327,7 @@ class UserService(AbstractService):
         # check other patterns
         saltHashCode, hashCode = HashUtils.hashCodeWithSalt(passwordHashCode, userSecuritySchema.salt)
         userObject.authenticated = HashUtils.checkHashCode(loginUser.password, saltHashCode, hashCode)
-        logger.debug(f"userObject={userObject}")
+        logger.debug(lambda: f"userObject={userObject}")
         if not userObject.isAuthenticated():
             raise AuthenticationException(HTTPStatus.UNAUTHORIZED, messages=["Either username or password is wrong!"])
         
@@ -270,25 +342,26 @@ class UserService(AbstractService):
         except SecurityException as ex:
             raise AuthenticationException(HTTPStatus.INTERNAL_SERVER_ERROR, messages=[str(ex)])
         
-        logger.debug(f"authModelEncrypted={authModelEncrypted}")
+        logger.debug(lambda: f"authModelEncrypted={authModelEncrypted}")
         # build authenticate user object model
         authUser = AuthenticatedUser(user_id=authModel.user_id,
                                      token_type=TokenTypeEnum.AUTH.value,
                                      token=authModelEncrypted,
                                      user_exists=True)
         
-        logger.debug(f"-{self.__class__.__name__}.login(), authUser={authUser}")
+        logger.debug(lambda: f"-{self.__class__.__name__}.login(), authUser={authUser}")
         return authUser
     
     def update(self, user: User) -> User:
         """Updates the user"""
-        logger.debug(f"+update({user})")
+        logger.debug(lambda: f"+update({user})")
         # self.validate(SchemaOperation.UPDATE, user)
         # check record exists by id
         if not self.existsByFilter({"id": user.id}):
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, f"User doesn't exist!")
         
-        userSchemas = self.userRepository.filter({"id": user.id})
+        # loaded with the plan it's returned with, the request's session hands back the same (identity-map) object
+        userSchemas = self.userRepository.filter({"id": user.id}, self.LIST_LOAD_PLAN)
         userSchema = userSchemas[0]
         #  Person
         if user.email and userSchema.email != user.email:
@@ -312,18 +385,22 @@ class UserService(AbstractService):
         # userSchema = CompanyMapper.fromModel(oldRole)
         self.userRepository.update(userSchema)
         # userSchema = self.userRepository.update(mapper=UserSchema, mappings=[userSchema])
-        userSchema = self.userRepository.filter({"id": user.id})[0]
+        userSchema = self.userRepository.filter({"id": user.id}, self.LIST_LOAD_PLAN)[0]
         user = UserMapper.fromSchema(userSchema)
-        logger.debug(f"-update(), user={user}")
+        # the cached principals of the user are stale now
+        principalCache.invalidatePrincipal(user.id)
+        logger.debug(lambda: f"-update(), user={user}")
         return user
     
     def delete(self, id: int) -> None:
-        logger.debug(f"+delete({id})")
+        logger.debug(lambda: f"+delete({id})")
         # check record exists by id
         filter = {"id": id}
         if self.existsByFilter(filter):
             self.userRepository.delete(filter)
+            principalCache.invalidatePrincipal(id)
+            grantCache.invalidate(id)
         else:
             raise RecordNotFoundException(HTTPStatus.NOT_FOUND, "User doesn't exist!")
         
-        logger.debug(f"-delete()")
+        logger.debug(lambda: f"-delete()")
@@ -3,10 +3,50 @@
 #
 import json
 import unittest
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import Engine, event
 
 from framework.datetime import nowMillis
+from framework.enums import EnvType
+from globals import connector
 from tests import app
 
+# the benchmarks (the throughput/timing comparisons) are opt-in, i.e. 'RUN_BENCHMARKS=true python -m pytest'
+RUN_BENCHMARKS = EnvType.getenv_bool("RUN_BENCHMARKS")
+# skips the benchmark test unless the benchmarks are enabled
+benchmark = unittest.skipUnless(RUN_BENCHMARKS, "The benchmarks run with RUN_BENCHMARKS=true")
+
+
+class CapturedStatements(list):
+    """CapturedStatements are the SQL statements executed (in order), their parameters are in 'parameters'."""
+
+    def __init__(self):
+        super().__init__()
+        self.parameters = []
+
+    def clear(self) -> None:
+        super().clear()
+        self.parameters.clear()
+
+
+@contextmanager
+def captureStatements(engine: Engine = None) -> Iterator[CapturedStatements]:
+    """Captures the statements executed by the engine (the app's by default) within the block"""
+    engine = engine or connector.engine
+    statements = CapturedStatements()
+
+    def onExecute(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        statements.parameters.append(parameters)
+
+    event.listen(engine, "before_cursor_execute", onExecute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", onExecute)
+
 
 class AbstractTestCase(unittest.TestCase):
     """An AbstractTestCase class, whose instances are single test cases.
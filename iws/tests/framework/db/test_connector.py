@@ -0,0 +1,119 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from framework.datetime import StopWatch
+from framework.db.connector import createEngine, SQLITE_PERFORMANCE_PROFILE
+from globals import connector
+from tests.base import AbstractTestCase, benchmark
+
+logger = logging.getLogger(__name__)
+
+
+def runConcurrently(dbPath: str, pragmas: Optional[dict], threads: int, operations: int) -> Tuple[float, list]:
+    """Runs the reads and writes (25%) of N threads on a new database and returns the throughput (ops/sec) and the
+    errors"""
+    engine = createEngine(f"sqlite:///{dbPath}", pragmas=pragmas, poolSize=threads)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE benchmark (id INTEGER PRIMARY KEY, value TEXT)"))
+
+    errors = []
+
+    def worker(index: int):
+        try:
+            for operation in range(operations):
+                if operation % 4 == 0:
+                    with engine.begin() as connection:
+                        connection.execute(text("INSERT INTO benchmark (value) VALUES (:value)"),
+                                           {"value": f"{index}-{operation}"})
+                else:
+                    with engine.connect() as connection:
+                        connection.execute(text("SELECT COUNT(*) FROM benchmark")).scalar()
+        except Exception as ex:
+            errors.append(ex)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    with StopWatch() as stopWatch:
+        for it in workers:
+            it.start()
+        for it in workers:
+            it.join()
+
+    engine.dispose()
+    return threads * operations / stopWatch.duration, errors
+
+
+class SQLite3ConnectorTest(AbstractTestCase):
+
+    def test_performance_profile(self):
+        """Tests the pragmas of the performance profile are applied on the pooled connections"""
+        logger.debug("+test_performance_profile()")
+        self.assertFalse(connector.engine.echo)
+        self.assertIsInstance(connector.engine.pool, QueuePool)
+        with connector.engine.connect() as connection:
+            self.assertEqual("wal", connection.execute(text("PRAGMA journal_mode")).scalar())
+            # NORMAL
+            self.assertEqual(1, connection.execute(text("PRAGMA synchronous")).scalar())
+            self.assertEqual(SQLITE_PERFORMANCE_PROFILE["cache_size"],
+                             connection.execute(text("PRAGMA cache_size")).scalar())
+            self.assertEqual(SQLITE_PERFORMANCE_PROFILE["busy_timeout"],
+                             connection.execute(text("PRAGMA busy_timeout")).scalar())
+            # MEMORY
+            self.assertEqual(2, connection.execute(text("PRAGMA temp_store")).scalar())
+
+        logger.debug("-test_performance_profile()")
+        print()
+
+    def test_memory_engine(self):
+        """Tests an in-memory database shares its only connection"""
+        logger.debug("+test_memory_engine()")
+        engine = createEngine("sqlite://", pragmas=SQLITE_PERFORMANCE_PROFILE)
+        self.assertIsInstance(engine.pool, StaticPool)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE memory_test (id INTEGER PRIMARY KEY)"))
+            connection.execute(text("INSERT INTO memory_test (id) VALUES (1)"))
+
+        with engine.connect() as connection:
+            self.assertEqual(1, connection.execute(text("SELECT COUNT(*) FROM memory_test")).scalar())
+
+        engine.dispose()
+        logger.debug("-test_memory_engine()")
+        print()
+
+    def test_concurrent_access(self):
+        """Tests the threads' reads and writes don't fail (i.e. 'database is locked') with the tuned engine"""
+        logger.debug("+test_concurrent_access()")
+        with tempfile.TemporaryDirectory() as tempDir:
+            _, errors = runConcurrently(str(Path(tempDir, "tuned.db")), SQLITE_PERFORMANCE_PROFILE, 4, 20)
+
+        self.assertEqual([], errors)
+        logger.debug("-test_concurrent_access()")
+        print()
+
+    @benchmark
+    def test_concurrency_benchmark(self):
+        """Benchmarks the read/write throughput of N threads with the default and the tuned engines"""
+        logger.debug("+test_concurrency_benchmark()")
+        threads = 8
+        operations = 100
+        with tempfile.TemporaryDirectory() as tempDir:
+            defaultThroughput, defaultErrors = runConcurrently(str(Path(tempDir, "default.db")), None, threads,
+                                                               operations)
+            tunedThroughput, tunedErrors = runConcurrently(str(Path(tempDir, "tuned.db")),
+                                                           SQLITE_PERFORMANCE_PROFILE, threads, operations)
+
+        logger.debug(f"threads={threads}, default={defaultThroughput:.0f} ops/s ({len(defaultErrors)} errors), "
+                     f"tuned={tunedThroughput:.0f} ops/s ({len(tunedErrors)} errors)")
+        print(f"SQLite {threads} threads (25% writes): default={defaultThroughput:.0f} ops/s "
+              f"({len(defaultErrors)} errors), tuned={tunedThroughput:.0f} ops/s ({len(tunedErrors)} errors)")
+        self.assertEqual([], tunedErrors)
+        logger.debug("-test_concurrency_benchmark()")
+        print()
@@ -0,0 +1,100 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+
+from sqlalchemy import event, update
+
+from framework.db.session import openSession
+from framework.orm.sqlalchemy.repository import LoadStrategy
+from framework.utils import Utils
+from globals import connector
+from rest.contact.repository import ContactRepository
+from rest.user.model import User, Address
+from rest.user.repository import UserRepository
+from rest.user.schema import UserSchema
+from rest.user.service import UserService
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class RequestScopedSessionTest(AbstractTestCase):
+
+    def test_session_without_request(self):
+        """Tests a new session is opened per call outside a request"""
+        logger.debug("+test_session_without_request()")
+        with openSession(connector.engine) as session:
+            with openSession(connector.engine) as otherSession:
+                self.assertIsNot(session, otherSession)
+
+        logger.debug("-test_session_without_request()")
+        print()
+
+    def test_session_per_request(self):
+        """Tests the repositories share one session within a request, which is closed on the request's teardown"""
+        logger.debug("+test_session_per_request()")
+        contactRepository = ContactRepository()
+        with self.app.test_request_context("/"):
+            with contactRepository.openSession() as session:
+                pass
+
+            with ContactRepository().openSession() as otherSession:
+                self.assertIs(session, otherSession)
+
+            connection = session.get_bind()
+            self.assertFalse(connection.closed)
+
+        # request's teardown returns the connection to the pool
+        self.assertTrue(connection.closed)
+        logger.debug("-test_session_per_request()")
+        print()
+
+    def test_connection_per_request(self):
+        """Tests the repository calls of a request check out only one pooled connection"""
+        logger.debug("+test_connection_per_request()")
+        checkouts = []
+
+        def onCheckout(dbapiConnection, connectionRecord, connectionProxy):
+            checkouts.append(connectionRecord)
+
+        event.listen(connector.engine, "checkout", onCheckout)
+        try:
+            contactRepository = ContactRepository()
+            with self.app.test_request_context("/"):
+                contactRepository.filter({"country": "RequestScopedSession"})
+                contactRepository.filter({"country": "RequestScopedSession"})
+                contactRepository.filter({"id": 1})
+        finally:
+            event.remove(connector.engine, "checkout", onCheckout)
+
+        self.assertEqual(1, len(checkouts))
+        logger.debug("-test_connection_per_request()")
+        print()
+
+    def test_update_then_read(self):
+        """Tests a re-read within a request gets the updated columns and the relationships of its own load plan"""
+        logger.debug("+test_update_then_read()")
+        suffix = Utils.randomUUID()
+        user = User(email=f"{suffix}@lakra.com", first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                    user_name=suffix, password="password")
+        user.addresses.append(Address(street1="123 Test Dr.", city="Hayward", state="California",
+                                      country="United States", zip="94544"))
+        user = UserService().register(user)
+
+        userRepository = UserRepository()
+        with self.app.test_request_context("/"):
+            userSchema = userRepository.filter({"id": user.id}, LoadStrategy.NONE)[0]
+            self.assertEqual([], userSchema.addresses)
+            with userRepository.openSession() as session:
+                session.execute(update(UserSchema.__table__).where(UserSchema.id == user.id).values(last_name="Lakra"))
+                session.commit()
+
+            userSchema = userRepository.filter({"id": user.id}, {"addresses": LoadStrategy.SELECTIN})[0]
+            self.assertEqual("Lakra", userSchema.last_name)
+            self.assertEqual(["123 Test Dr."], [address.street1 for address in userSchema.addresses])
+            userSchema = userRepository.findById(UserSchema, user.id, LoadStrategy.NONE)
+            self.assertEqual([], userSchema.addresses)
+
+        logger.debug("-test_update_then_read()")
+        print()
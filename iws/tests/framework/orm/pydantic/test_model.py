@@ -4,9 +4,10 @@
 import json
 import logging
 
+from framework.datetime import StopWatch
 from framework.http import HTTPStatus
 from framework.orm.pydantic.model import AbstractModel, BaseModel, NamedModel, ErrorModel, ResponseModel
-from tests.base import AbstractTestCase
+from tests.base import AbstractTestCase, benchmark
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,9 @@ class TestPydanticModel(AbstractTestCase):
         logger.debug(f"allFields={allFields}")
         self.assertIsNotNone(allFields)
         self.assertEqual(expected, allFields)
+        # the cached field names are the JSON schema's properties
+        response = ResponseModel.buildResponse(HTTPStatus.OK)
+        self.assertEqual(list(response.model_json_schema().get("properties").keys()), response.getAllFields())
 
         logger.debug("-test_getAllFields()")
         print()
@@ -70,6 +74,28 @@ class TestPydanticModel(AbstractTestCase):
         logger.debug("-test_getClassFields()")
         print()
 
+    @benchmark
+    def test_getAllFields_benchmark(self):
+        """Benchmarks the cached field names against building the JSON schema per response"""
+        logger.debug("+test_getAllFields_benchmark()")
+        response = ResponseModel.buildResponse(HTTPStatus.OK)
+        iterations = 200
+        with StopWatch() as jsonSchemaWatch:
+            for _ in range(iterations):
+                list(response.model_json_schema().get("properties").keys())
+
+        with StopWatch() as cachedWatch:
+            for _ in range(iterations):
+                response.getAllFields()
+
+        logger.debug(f"per response: json-schema={jsonSchemaWatch.duration * 1000000 / iterations:.2f} us, "
+                     f"cached={cachedWatch.duration * 1000000 / iterations:.2f} us")
+        print(f"getAllFields() per response: json-schema={jsonSchemaWatch.duration * 1000000 / iterations:.2f} us, "
+              f"cached={cachedWatch.duration * 1000000 / iterations:.2f} us")
+        self.assertLess(cachedWatch.duration, jsonSchemaWatch.duration)
+        logger.debug("-test_getAllFields_benchmark()")
+        print()
+
     def test_model_json_schema(self):
         """Tests the model_json_schema() method"""
         logger.debug("+test_model_json_schema()")
@@ -275,3 +301,47 @@ class TestPydanticModel(AbstractTestCase):
         logger.debug(f"response_entity_json: {response_entity_json}")
         logger.debug("-test_build_response_with_critical()")
         print()
+
+    def test_response_model_to_json(self):
+        """Tests the ResponseModel.to_json() serializes the items with their own fields"""
+        logger.debug("+test_response_model_to_json()")
+        response = ResponseModel(status=HTTPStatus.OK.statusCode)
+        response.addInstances([NamedModel(id=index, name=f"Name-{index}") for index in range(3)])
+        response.addInstance(ErrorModel.buildError(httpStatus=HTTPStatus.BAD_REQUEST, message="Error"))
+        jsonResponse = response.to_json()
+        logger.debug(f"jsonResponse={jsonResponse}")
+        self.assertEqual(["status", "message", "data", "errors"], list(jsonResponse.keys()))
+        self.assertEqual(3, len(jsonResponse["data"]))
+        self.assertEqual({"created_at": None, "updated_at": None, "id": 2, "name": "Name-2"}, jsonResponse["data"][2])
+        self.assertEqual({"status": 400, "message": "Error", "debug_info": None}, jsonResponse["errors"][0])
+        # must be serializable as is
+        self.assertIsNotNone(json.dumps(jsonResponse))
+        logger.debug("-test_response_model_to_json()")
+        print()
+
+    @benchmark
+    def test_response_model_benchmark(self):
+        """Benchmarks the ResponseModel building and serialization, the latency should grow linearly with the size"""
+        logger.debug("+test_response_model_benchmark()")
+
+        def buildAndSerialize(size: int) -> float:
+            models = [NamedModel(id=index, name=f"Name-{index}") for index in range(size)]
+            elapsed = []
+            for _ in range(3):
+                with StopWatch() as stopWatch:
+                    response = ResponseModel.buildResponse(HTTPStatus.OK)
+                    response.addInstances(models)
+                    jsonResponse = response.to_json()
+                self.assertEqual(size, len(jsonResponse["data"]))
+                elapsed.append(stopWatch.duration)
+
+            return min(elapsed)
+
+        small = buildAndSerialize(1000)
+        large = buildAndSerialize(4000)
+        logger.debug(f"1000 items={small * 1000:.2f} ms, 4000 items={large * 1000:.2f} ms, ratio={large / small:.2f}")
+        print(f"ResponseModel: 1000 items={small * 1000:.2f} ms, 4000 items={large * 1000:.2f} ms")
+        # 4x the items, linear growth is ~4x, quadratic would be ~16x
+        self.assertLess(large / small, 10)
+        logger.debug("-test_response_model_benchmark()")
+        print()
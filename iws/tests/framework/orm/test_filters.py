@@ -0,0 +1,120 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import os
+import timeit
+
+from sqlalchemy import select
+from werkzeug.datastructures import MultiDict
+
+from framework.exception import ValidationException
+from framework.orm.pagination import PageRequest
+from framework.orm.sqlalchemy.repository import SqlAlchemyRepository, LoadStrategy, _filterStatement
+from framework.utils import Utils
+from globals import connector
+from rest.role.repository import PermissionRepository
+from rest.role.schema import PermissionSchema
+from rest.user.schema import UserSchema
+from tests.base import AbstractTestCase, benchmark, captureStatements
+
+logger = logging.getLogger(__name__)
+
+# the number of the statements built by the benchmark
+FILTER_BENCHMARK_ROUNDS = int(os.getenv("FILTER_BENCHMARK_ROUNDS", "2000"))
+
+
+class FiltersTest(AbstractTestCase):
+    """Tests the filters' normalization and the cache of their statements"""
+
+    def test_normalizeFilters(self):
+        logger.debug("+test_normalizeFilters()")
+        self.assertEqual({}, SqlAlchemyRepository.normalizeFilters(UserSchema, None))
+
+        filters = SqlAlchemyRepository.normalizeFilters(UserSchema, {"last_name": "Lak", "email": "roh@lakra.com"})
+        self.assertEqual(["email", "last_name"], list(filters.keys()))
+
+        filters = SqlAlchemyRepository.normalizeFilters(UserSchema, {"id": (1, 2), "email": {"roh@lakra.com"}})
+        self.assertEqual({"email": ["roh@lakra.com"], "id": [1, 2]}, filters)
+
+        # the multiple values of a request's arg are matched with IN
+        filters = SqlAlchemyRepository.normalizeFilters(UserSchema, MultiDict([("id", "1"), ("id", "2"),
+                                                                               ("email", "roh@lakra.com")]))
+        self.assertEqual({"email": "roh@lakra.com", "id": ["1", "2"]}, filters)
+
+        with self.assertRaises(ValidationException):
+            SqlAlchemyRepository.normalizeFilters(UserSchema, {"unknown": "value"})
+
+        logger.debug("-test_normalizeFilters()")
+        print()
+
+    def test_filterStatement(self):
+        logger.debug("+test_filterStatement()")
+        statement, parameters = SqlAlchemyRepository.filterStatement(UserSchema, {"email": "roh@lakra.com"},
+                                                                     LoadStrategy.NONE)
+        self.assertEqual({"email": "roh@lakra.com"}, parameters)
+        # the same shape shares the statement, whatever the values and the keys' order
+        cacheInfo = _filterStatement.cache_info()
+        other, parameters = SqlAlchemyRepository.filterStatement(UserSchema, {"email": "lak@lakra.com"},
+                                                                 LoadStrategy.NONE)
+        self.assertIs(statement, other)
+        self.assertEqual({"email": "lak@lakra.com"}, parameters)
+        self.assertEqual(cacheInfo.hits + 1, _filterStatement.cache_info().hits)
+
+        first, _ = SqlAlchemyRepository.filterStatement(UserSchema, {"email": "roh", "last_name": "Lak"})
+        second, _ = SqlAlchemyRepository.filterStatement(UserSchema, {"last_name": "Lak", "email": "roh"})
+        self.assertIs(first, second)
+
+        # a list value, a load plan or a page request is another shape
+        self.assertIsNot(statement, SqlAlchemyRepository.filterStatement(UserSchema, {"email": ["roh"]},
+                                                                         LoadStrategy.NONE)[0])
+        self.assertIsNot(statement, SqlAlchemyRepository.filterStatement(UserSchema, {"email": "roh"})[0])
+        paged, parameters = SqlAlchemyRepository.filterStatement(UserSchema, {"email": "roh"}, LoadStrategy.NONE,
+                                                                 PageRequest(limit=5))
+        self.assertIsNot(statement, paged)
+        self.assertEqual({"email": "roh", "_page_limit": 6}, parameters)
+        logger.debug("-test_filterStatement()")
+        print()
+
+    def test_filter_in(self):
+        logger.debug("+test_filter_in()")
+        suffix = Utils.randomUUID()
+        repository = PermissionRepository()
+        permissions = [PermissionSchema(name=f"{suffix}-{index}", active=True) for index in range(3)]
+        for permission in permissions:
+            repository.save(permission)
+
+        with captureStatements() as statements:
+            names = MultiDict([("name", permission.name) for permission in permissions[:2]])
+            self.assertEqual({permissions[0].name, permissions[1].name},
+                             {permission.name for permission in repository.filter(names)})
+            # the expanding IN is rendered per the number of the values, the statement is built once
+            ids = [permission.id for permission in permissions]
+            self.assertEqual(3, len(repository.filter({"id": ids})))
+            self.assertEqual([], repository.filter({"id": []}))
+
+        self.assertIn("IN (?, ?)", statements[0])
+        logger.debug("-test_filter_in()")
+        print()
+
+    @benchmark
+    def test_benchmark(self):
+        """Compares the cached statement of the hot {'email': ...} filter with the one built per call"""
+        logger.debug("+test_benchmark()")
+        with connector.engine.connect() as connection:
+            def cachedStatement():
+                return connection.execute(
+                    *SqlAlchemyRepository.filterStatement(UserSchema, {"email": "roh@lakra.com"})).all()
+
+            def builtStatement():
+                options = SqlAlchemyRepository.loaderOptions(UserSchema, None)
+                return connection.execute(select(UserSchema).options(*options)
+                                          .filter_by(email="roh@lakra.com")).all()
+
+            cached = timeit.timeit(cachedStatement, number=FILTER_BENCHMARK_ROUNDS)
+            uncached = timeit.timeit(builtStatement, number=FILTER_BENCHMARK_ROUNDS)
+
+        print(f"{FILTER_BENCHMARK_ROUNDS} {{'email'}} filters: cached={cached * 1000:.1f} ms, "
+              f"built per call={uncached * 1000:.1f} ms")
+        logger.debug("-test_benchmark()")
+        print()
@@ -0,0 +1,128 @@
+#
+# Author: Rohtash Lakra
+#
+import gc
+import logging
+import os
+import time
+from datetime import datetime
+
+from framework.orm.mapper import SchemaMapper
+from rest.company.mapper import CompanyMapper
+from rest.company.model import Company
+from rest.company.schema import CompanySchema
+from rest.contact.mapper import ContactMapper
+from rest.contact.model import Contact
+from rest.contact.schema import ContactSchema
+from rest.role.mapper import RoleMapper
+from rest.role.model import Role, Permission
+from rest.role.schema import RoleSchema, PermissionSchema
+from rest.user.mapper import UserMapper
+from rest.user.model import User, Address
+from rest.user.schema import UserSchema, AddressSchema
+from tests.base import AbstractTestCase, benchmark
+
+logger = logging.getLogger(__name__)
+
+# the number of the rows converted by the benchmark
+MAPPER_BENCHMARK_ROWS = int(os.getenv("MAPPER_BENCHMARK_ROWS", "10000"))
+
+
+def buildUserSchema(index: int) -> UserSchema:
+    """Returns a (database-like) user row with 2 addresses"""
+    now = datetime(2024, 12, 27, 10, 20, 30)
+    userSchema = UserSchema(id=index, email=f"user-{index}@lakra.com", first_name="Roh", last_name="Lak",
+                            birth_date="2024-12-27", user_name=f"user-{index}", password="password", admin=False)
+    userSchema.created_at = userSchema.updated_at = now
+    userSchema.addresses = [AddressSchema(id=index * 10 + offset, user_id=index, street1=f"{offset} Test Dr.",
+                                          city="Hayward", state="California", country="United States", zip="94544")
+                            for offset in range(2)]
+    for address in userSchema.addresses:
+        address.created_at = address.updated_at = now
+
+    return userSchema
+
+
+def validatedUser(userSchema: UserSchema) -> User:
+    """Returns the user validated by the pydantic, as mapped before the compiled mappers"""
+    user = User(**userSchema.toJSONObject())
+    user.addresses = [Address(**address.toJSONObject()) for address in userSchema.addresses]
+    return user
+
+
+class SchemaMapperTest(AbstractTestCase):
+    """Tests the compiled mappers build the same models as the pydantic validation"""
+
+    def test_users(self):
+        logger.debug("+test_users()")
+        userSchemas = [buildUserSchema(index) for index in range(3)]
+        users = UserMapper.fromSchemas(userSchemas)
+        self.assertEqual([validatedUser(userSchema).model_dump() for userSchema in userSchemas],
+                         [user.model_dump() for user in users])
+        self.assertIsInstance(users[0].addresses[0], Address)
+        # the relationship's default when not loaded
+        self.assertEqual([], UserMapper.fromSchema(UserSchema(id=1, email="roh@lakra.com")).addresses)
+        self.assertIsNone(UserMapper.SCHEMA_MAPPER.fromSchema(None))
+        logger.debug("-test_users()")
+        print()
+
+    def test_roles_companies_contacts(self):
+        logger.debug("+test_roles_companies_contacts()")
+        roleSchema = RoleSchema(id=1, name="Reader", active=True, meta_data={"description": "A reader"})
+        roleSchema.permissions = [PermissionSchema(id=index, name=f"read-{index}", active=True) for index in range(3)]
+        role = RoleMapper.fromSchema(roleSchema)
+        expected = Role(**roleSchema.toJSONObject())
+        expected.permissions = [Permission(**permission.toJSONObject()) for permission in roleSchema.permissions]
+        self.assertEqual(expected.model_dump(), role.model_dump())
+
+        companySchema = CompanySchema(id=1, name="Lakra", active=True)
+        companySchema.branches = [CompanySchema(id=2, parent_id=1, name="Lakra West", active=True)]
+        company = CompanyMapper.fromSchema(companySchema)
+        expected = Company(**companySchema.toJSONObject())
+        expected.branches = [Company(**branch.toJSONObject()) for branch in companySchema.branches]
+        self.assertEqual(expected.model_dump(), company.model_dump())
+
+        contactSchema = ContactSchema(id=1, first_name="Roh", last_name="Lak", country="USA", subject="Hello")
+        self.assertEqual(Contact(**contactSchema.toJSONObject()).model_dump(),
+                         ContactMapper.fromSchema(contactSchema).model_dump())
+        logger.debug("-test_roles_companies_contacts()")
+        print()
+
+    def test_compile_once(self):
+        logger.debug("+test_compile_once()")
+        mapper = SchemaMapper(ContactSchema, Contact)
+        self.assertIsNone(mapper._keys)
+        mapper.fromSchema(ContactSchema(id=1, first_name="Roh"))
+        keys = mapper._keys
+        self.assertIn("first_name", keys)
+        mapper.fromSchema(ContactSchema(id=2, first_name="Lak"))
+        self.assertIs(keys, mapper._keys)
+        logger.debug("-test_compile_once()")
+        print()
+
+    @benchmark
+    def test_benchmark(self):
+        """Compares the rows/sec of the compiled mappers with the pydantic validation of the users with addresses"""
+        logger.debug("+test_benchmark()")
+        userSchemas = [buildUserSchema(index) for index in range(MAPPER_BENCHMARK_ROWS)]
+        # the production's log level (the validators log at debug/info) and no GC pauses, like 'timeit'
+        logging.disable(logging.INFO)
+        gc.collect()
+        gc.disable()
+        try:
+            startTime = time.perf_counter()
+            validated = [validatedUser(userSchema) for userSchema in userSchemas]
+            validatedTime = time.perf_counter() - startTime
+
+            startTime = time.perf_counter()
+            compiled = UserMapper.fromSchemas(userSchemas)
+            compiledTime = time.perf_counter() - startTime
+        finally:
+            gc.enable()
+            logging.disable(logging.NOTSET)
+
+        self.assertEqual(validated[-1].model_dump(), compiled[-1].model_dump())
+        print(f"{MAPPER_BENCHMARK_ROWS} users (+2 addresses each): validated={len(userSchemas) / validatedTime:,.0f} "
+              f"rows/sec, compiled={len(userSchemas) / compiledTime:,.0f} rows/sec")
+        logger.debug("-test_benchmark()")
+        print()
@@ -0,0 +1,75 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+
+from werkzeug.datastructures import MultiDict
+
+from framework.exception import ValidationException
+from framework.orm.pagination import PageRequest, Page
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class PaginationTest(AbstractTestCase):
+
+    def test_cursor(self):
+        """Tests the cursor is an opaque round trip of the key"""
+        logger.debug("+test_cursor()")
+        for key in [(datetime(2024, 12, 27, 10, 20, 30), 7), (datetime(2024, 12, 27, 10, 20, 30, 123456), 8)]:
+            cursor = PageRequest.encodeCursor(key)
+            self.assertNotIn("=", cursor)
+            self.assertEqual(key, PageRequest.decodeCursor(cursor))
+
+        for cursor in ["invalid", "W10", "!!!"]:
+            with self.assertRaises(ValidationException):
+                PageRequest.decodeCursor(cursor)
+
+        logger.debug("-test_cursor()")
+        print()
+
+    def test_fromFilters(self):
+        """Tests the pagination parameters are parsed and removed from the filters"""
+        logger.debug("+test_fromFilters()")
+        pageRequest, filters = PageRequest.fromFilters(MultiDict({"name": "Roh"}))
+        self.assertEqual((PageRequest.DEFAULT_LIMIT, None, False),
+                         (pageRequest.limit, pageRequest.after, pageRequest.withTotal))
+        self.assertEqual({"name": "Roh"}, filters.to_dict())
+
+        # the multiple values of a key are kept for the IN filters
+        pageRequest, filters = PageRequest.fromFilters(MultiDict([("id", "1"), ("id", "2"), ("limit", "5")]))
+        self.assertEqual(5, pageRequest.limit)
+        self.assertEqual(["1", "2"], filters.getlist("id"))
+
+        cursor = PageRequest.encodeCursor((datetime(2024, 12, 27), 5))
+        pageRequest, filters = PageRequest.fromFilters({"limit": "5", "cursor": cursor, "total": "true"})
+        self.assertEqual((5, (datetime(2024, 12, 27), 5), True),
+                         (pageRequest.limit, pageRequest.after, pageRequest.withTotal))
+        self.assertEqual({}, filters)
+
+        for limit in ["0", "-1", "abc", str(PageRequest.MAX_LIMIT + 1)]:
+            with self.assertRaises(ValidationException):
+                PageRequest.fromFilters({"limit": limit})
+
+        logger.debug("-test_fromFilters()")
+        print()
+
+    def test_page(self):
+        """Tests the extra item is dropped and the next cursor points at the last item"""
+        logger.debug("+test_page()")
+        items = [SimpleNamespace(id=index, created_at=datetime(2024, 12, 27, 0, 0, index)) for index in range(3)]
+        page = Page.of(items, PageRequest(limit=2), total=10)
+        self.assertEqual(items[:2], page.items)
+        self.assertTrue(page.hasNext())
+        self.assertEqual((items[1].created_at, items[1].id), PageRequest.decodeCursor(page.nextCursor))
+        self.assertEqual({"limit": 2, "size": 2, "has_next": True, "next_cursor": page.nextCursor, "total": 10},
+                         page.toMetadata())
+
+        page = Page.of(items[:2], PageRequest(limit=2))
+        self.assertFalse(page.hasNext())
+        self.assertEqual({"limit": 2, "size": 2, "has_next": False, "next_cursor": None}, page.toMetadata())
+        logger.debug("-test_page()")
+        print()
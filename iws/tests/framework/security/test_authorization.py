@@ -0,0 +1,67 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+
+from framework.ext.permission import checkPermission
+from framework.security.authorization import Grants, GrantCache, toNames
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class AuthorizationTest(AbstractTestCase):
+
+    def test_grants(self):
+        """Tests the grants are compiled into the sets of the roles and permissions"""
+        logger.debug("+test_grants()")
+        grants = Grants.compile([(1, "Admin", "read"), (1, "Admin", "write"), (2, "Guest", None)])
+        self.assertEqual(frozenset({"Admin", "Guest"}), grants.roles)
+        self.assertEqual(frozenset({"read", "write"}), grants.permissions)
+        self.assertEqual(frozenset({1, 2}), grants.roleIds)
+
+        self.assertTrue(grants.allows())
+        self.assertTrue(grants.allows(toNames("Admin")))
+        self.assertTrue(grants.allows(toNames(["Owner", "Guest"]), toNames(["read", "write"])))
+        self.assertFalse(grants.allows(toNames("Owner")))
+        self.assertFalse(grants.allows(permissions=toNames(["read", "delete"])))
+        self.assertFalse(Grants().allows(permissions=toNames("read")))
+
+        self.assertTrue(checkPermission(grants, "write"))
+        self.assertFalse(checkPermission(grants, "delete"))
+        logger.debug("-test_grants()")
+        print()
+
+    def test_grant_cache(self):
+        """Tests the grants are cached by the principals and invalidated by their roles"""
+        logger.debug("+test_grant_cache()")
+        grantCache = GrantCache(maxSize=2, ttl=60)
+        loads = []
+
+        def loader(principalId):
+            loads.append(principalId)
+            return Grants.compile([(principalId * 10, f"Role-{principalId}", "read"), (100, "Shared", None)])
+
+        grants = grantCache.getGrants(1, loader)
+        self.assertIs(grants, grantCache.getGrants(1, loader))
+        grantCache.getGrants(2, loader)
+        self.assertEqual([1, 2], loads)
+
+        # a role's change invalidates the grants of its principals only
+        self.assertEqual(1, grantCache.invalidateRoles([10]))
+        self.assertIsNone(grantCache.get(1))
+        self.assertIsNotNone(grantCache.get(2))
+        self.assertEqual(1, grantCache.invalidateRoles([100]))
+        self.assertEqual(0, grantCache.invalidateRoles([100]))
+
+        # the evicted principals are removed from the roles' index
+        for principalId in [1, 2, 3]:
+            grantCache.getGrants(principalId, loader)
+        self.assertNotIn(1, grantCache._principals.get(100))
+        self.assertEqual(2, grantCache.invalidateRoles([100]))
+
+        # the grants loaded while invalidated are not cached
+        grantCache.getGrants(4, lambda principalId: grantCache.invalidateRoles([100]) or Grants())
+        self.assertIsNone(grantCache.get(4))
+        logger.debug("-test_grant_cache()")
+        print()
@@ -0,0 +1,106 @@
+#
+# Author: Rohtash Lakra
+#
+import base64
+import json
+import logging
+import threading
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from framework.datetime import StopWatch
+from framework.security.crypto import CryptoUtils, SecurityException, AESGCMCipher, UTF_8
+from tests.base import AbstractTestCase, benchmark
+
+logger = logging.getLogger(__name__)
+
+ENC_KEY = "0123456789abcdef0123456789abcdef"
+ENC_NONCE = "0123456789ab"
+
+
+def encryptPerCall(data: str) -> str:
+    """Returns the data encrypted with a new 'AESGCM' (the cipher context before it was reused)"""
+    aesgcm = AESGCM(ENC_KEY.encode(UTF_8))
+    return base64.b64encode(aesgcm.encrypt(ENC_NONCE.encode(UTF_8), data.encode(UTF_8), None)).decode(UTF_8)
+
+
+class CryptoUtilsTest(AbstractTestCase):
+    """Unit-tests for CryptoUtils class."""
+
+    def test_encrypt_decrypt(self):
+        logger.debug("+test_encrypt_decrypt()")
+        data = json.dumps({"user_id": 1, "auth_token": "password", "iat": 1735689600})
+        encrypted = CryptoUtils.encrypt_with_aesgcm(ENC_KEY, ENC_NONCE, data)
+        self.assertEqual(json.loads(data), CryptoUtils.decrypt_with_aesgcm(ENC_KEY, ENC_NONCE, encrypted))
+        # the cipher context is created once per key
+        self.assertIs(CryptoUtils.cipher(ENC_KEY, ENC_NONCE), CryptoUtils.cipher(ENC_KEY, ENC_NONCE))
+        self.assertIsInstance(CryptoUtils.cipher(ENC_KEY, ENC_NONCE), AESGCMCipher)
+
+        # batch
+        cipher = CryptoUtils.cipher(ENC_KEY, ENC_NONCE)
+        items = [json.dumps({"user_id": index}) for index in range(3)]
+        self.assertEqual([json.loads(item) for item in items], cipher.decryptAll(cipher.encryptAll(items)))
+        # the reused cipher context encrypts as a new one
+        self.assertEqual([encryptPerCall(item) for item in items], cipher.encryptAll(items))
+        logger.debug("-test_encrypt_decrypt()")
+        print()
+
+    def test_invalid_inputs(self):
+        logger.debug("+test_invalid_inputs()")
+        with self.assertRaises(SecurityException):
+            CryptoUtils.cipher(None, ENC_NONCE)
+
+        with self.assertRaises(SecurityException):
+            CryptoUtils.cipher("short-key", ENC_NONCE)
+
+        encrypted = base64.b64decode(CryptoUtils.encrypt_with_aesgcm(ENC_KEY, ENC_NONCE, "{}"))
+        tampered = base64.b64encode(bytes([encrypted[0] ^ 1]) + encrypted[1:]).decode(UTF_8)
+        with self.assertRaises(SecurityException):
+            CryptoUtils.decrypt_with_aesgcm(ENC_KEY, ENC_NONCE, tampered)
+
+        logger.debug("-test_invalid_inputs()")
+        print()
+
+    def test_cipher_threads(self):
+        """Tests the shared cipher context across the threads"""
+        logger.debug("+test_cipher_threads()")
+        cipher = CryptoUtils.cipher(ENC_KEY, ENC_NONCE)
+        errors = []
+
+        def worker(index: int):
+            for item in range(200):
+                data = {"user_id": index, "item": item}
+                if cipher.decrypt(cipher.encrypt(json.dumps(data))) != data:
+                    errors.append(data)
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+        for it in workers:
+            it.start()
+        for it in workers:
+            it.join()
+
+        self.assertEqual([], errors)
+        logger.debug("-test_cipher_threads()")
+        print()
+
+    @benchmark
+    def test_cipher_benchmark(self):
+        """Benchmarks the tokens/second of a new 'AESGCM' per call and the reusable cipher context"""
+        logger.debug("+test_cipher_benchmark()")
+        size = 20000
+        token = json.dumps({"user_id": 1, "auth_token": "password", "iat": 1735689600})
+        with StopWatch() as perCall:
+            for _ in range(size):
+                encryptPerCall(token)
+
+        cipher = CryptoUtils.cipher(ENC_KEY, ENC_NONCE)
+        with StopWatch() as reused:
+            cipher.encryptAll(token for _ in range(size))
+
+        logger.debug(f"encrypt({size} tokens): perCall={size / perCall.duration:.0f}/s, "
+                     f"reused={size / reused.duration:.0f}/s")
+        print(f"encrypt({size} tokens): perCall={size / perCall.duration:.0f} tokens/s, "
+              f"reused={size / reused.duration:.0f} tokens/s")
+        self.assertLess(reused.duration, perCall.duration)
+        logger.debug("-test_cipher_benchmark()")
+        print()
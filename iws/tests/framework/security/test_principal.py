@@ -0,0 +1,52 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import time
+
+from framework.security.principal import PrincipalCache
+from rest.user.model import User
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCacheTest(AbstractTestCase):
+
+    def test_principal_cache(self):
+        """Tests the principals are cached by the token digests and invalidated by their ids"""
+        logger.debug("+test_principal_cache()")
+        principalCache = PrincipalCache(maxSize=2, ttl=60)
+        user = User(id=1, email="one@lakra.com", authenticated=True)
+        principalCache.putPrincipal("token-1", user)
+        principalCache.putPrincipal("token-2", user)
+        self.assertIs(user, principalCache.getPrincipal("token-1"))
+        self.assertIsNone(principalCache.getPrincipal("token-3"))
+        # only the token's digest is cached
+        self.assertIn(PrincipalCache.tokenDigest("token-1"), principalCache._entries)
+        self.assertNotIn("token-1", principalCache._entries)
+
+        # the evicted tokens are removed from the principal's index
+        principalCache.putPrincipal("token-3", User(id=2, email="two@lakra.com", authenticated=True))
+        self.assertEqual(1, principalCache.invalidatePrincipal(1))
+        self.assertIsNone(principalCache.getPrincipal("token-1"))
+        self.assertEqual(0, principalCache.invalidatePrincipal(1))
+        self.assertIsNotNone(principalCache.getPrincipal("token-3"))
+        logger.debug("-test_principal_cache()")
+        print()
+
+    def test_token_expiry(self):
+        """Tests a cached principal isn't served beyond its token's expiry"""
+        logger.debug("+test_token_expiry()")
+        principalCache = PrincipalCache(maxSize=10, ttl=60)
+        user = User(id=1, email="one@lakra.com", authenticated=True)
+        principalCache.putPrincipal("valid", user, expireAt=time.time() + 60)
+        principalCache.putPrincipal("expired", user, expireAt=time.time() - 1)
+        self.assertIs(user, principalCache.getPrincipal("valid"))
+        self.assertIsNone(principalCache.getPrincipal("expired"))
+        # the expired token is removed, and counted as a miss
+        self.assertEqual(1, len(principalCache))
+        self.assertEqual((1, 1), (principalCache.hits, principalCache.misses))
+        self.assertNotIn(PrincipalCache.tokenDigest("expired"), principalCache._tokenExpiry)
+        logger.debug("-test_token_expiry()")
+        print()
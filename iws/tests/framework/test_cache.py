@@ -0,0 +1,52 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+
+from framework.cache import TTLCache
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCacheTest(AbstractTestCase):
+
+    def setUp(self):
+        logger.debug("+setUp()")
+        super().setUp()
+        self.now = 0.0
+        self.cache = TTLCache(maxSize=2, ttl=10, timer=lambda: self.now)
+        logger.debug("-setUp()")
+        print()
+
+    def test_expiry(self):
+        """Tests the entries expire after the ttl"""
+        logger.debug("+test_expiry()")
+        self.cache.put("one", 1)
+        self.now = 9.9
+        self.assertEqual(1, self.cache.get("one"))
+        self.now = 10
+        self.assertIsNone(self.cache.get("one"))
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0.5, self.cache.hitRatio())
+        logger.debug("-test_expiry()")
+        print()
+
+    def test_eviction(self):
+        """Tests the least recently used entry is evicted beyond the max size"""
+        logger.debug("+test_eviction()")
+        self.cache.put("one", 1)
+        self.cache.put("two", 2)
+        self.assertEqual(1, self.cache.get("one"))
+        self.cache.put("three", 3)
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get("two"))
+        self.assertEqual(1, self.cache.get("one"))
+        self.assertEqual(3, self.cache.get("three"))
+        self.assertTrue(self.cache.invalidate("one"))
+        self.assertFalse(self.cache.invalidate("one"))
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.hits + self.cache.misses)
+        logger.debug("-test_eviction()")
+        print()
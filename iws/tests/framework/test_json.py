@@ -0,0 +1,120 @@
+#
+# Author: Rohtash Lakra
+#
+import json
+import logging
+import os
+import timeit
+import uuid
+from datetime import datetime, date
+from decimal import Decimal
+
+from framework.http import HTTPStatus
+from framework.json import JSONProvider, OrJSONBackend, StdJSONBackend, jsonBackend, JsonEncoder
+from framework.orm.pydantic.model import ResponseModel
+from rest.role.model import Role, Permission
+from rest.role.schema import PermissionSchema
+from rest.user.mapper import UserMapper
+from tests.base import AbstractTestCase, benchmark
+from tests.framework.orm.test_mapper import buildUserSchema
+
+logger = logging.getLogger(__name__)
+
+# the number of the responses encoded by the benchmark
+JSON_BENCHMARK_ROUNDS = int(os.getenv("JSON_BENCHMARK_ROUNDS", "200"))
+
+
+def buildRoles(count: int) -> list:
+    """Returns the roles with 5 permissions each"""
+    roles = []
+    for index in range(count):
+        role = Role(id=index, name=f"Role-{index}", active=True, meta_data={"description": "A role"})
+        role.created_at = role.updated_at = datetime(2024, 12, 27, 10, 20, 30)
+        role.permissions = [Permission(id=index * 10 + offset, name=f"read-{offset}", active=True)
+                            for offset in range(5)]
+        roles.append(role)
+
+    return roles
+
+
+class JSONTest(AbstractTestCase):
+    """Tests the JSON backends and the Flask's JSON provider"""
+
+    def test_backends(self):
+        logger.debug("+test_backends()")
+        payload = {
+            "created_at": datetime(2024, 12, 27, 10, 20, 30, 123456),
+            "birth_date": date(2024, 12, 27),
+            "amount": Decimal("10.25"),
+            "uuid": uuid.UUID(int=1),
+            "ids": {1},
+            1: "one",
+            "role": buildRoles(1)[0],
+            "permission": PermissionSchema(id=1, name="read", active=True),
+            "name": "Rohtash Lakrä",
+        }
+        expected = StdJSONBackend().dumps(payload)
+        self.assertEqual(expected, OrJSONBackend().dumps(payload))
+
+        jsonObject = jsonBackend.loads(expected)
+        self.assertEqual("2024-12-27T10:20:30.123456", jsonObject["created_at"])
+        self.assertEqual("2024-12-27", jsonObject["birth_date"])
+        self.assertEqual(10.25, jsonObject["amount"])
+        self.assertEqual("00000000-0000-0000-0000-000000000001", jsonObject["uuid"])
+        self.assertEqual([1], jsonObject["ids"])
+        self.assertEqual("one", jsonObject["1"])
+        self.assertEqual(5, len(jsonObject["role"]["permissions"]))
+        self.assertEqual("read", jsonObject["permission"]["name"])
+        self.assertEqual("Rohtash Lakrä", jsonObject["name"])
+
+        with self.assertRaises(TypeError):
+            jsonBackend.dumps(object())
+
+        # the sorted and indented JSON (the standard json can't sort the mixed keys)
+        payload.pop(1)
+        self.assertEqual(StdJSONBackend().dumps(payload, sortKeys=True, indent=True),
+                         OrJSONBackend().dumps(payload, sortKeys=True, indent=True))
+
+        # the legacy encoder uses the same conversions
+        jsonObject.pop("1")
+        self.assertEqual(jsonObject, json.loads(json.dumps(payload, cls=JsonEncoder)))
+        logger.debug("-test_backends()")
+        print()
+
+    def test_provider(self):
+        logger.debug("+test_provider()")
+        self.assertIsInstance(self.app.json, JSONProvider)
+        roles = buildRoles(2)
+        with self.app.app_context():
+            response = self.app.json.response(ResponseModel.jsonResponses(HTTPStatus.OK, roles))
+
+        self.assertEqual("application/json", response.mimetype)
+        self.assertEqual([role.model_dump(mode="json") for role in roles], response.json["data"])
+        # the fields are kept in their declaration order
+        self.assertEqual(["status", "message", "data", "errors"], list(response.json.keys()))
+        self.assertEqual({"id": 1}, self.app.json.loads(b'{"id": 1}'))
+        logger.debug("-test_provider()")
+        print()
+
+    @benchmark
+    def test_benchmark(self):
+        """Compares the encoding of the typical user/role payloads of the standard json and the orjson"""
+        logger.debug("+test_benchmark()")
+        # the users (with 2 addresses each) and the roles (with 5 permissions each) of a page
+        payloads = {
+            "users": ResponseModel.jsonResponses(HTTPStatus.OK, UserMapper.fromSchemas(
+                [buildUserSchema(index) for index in range(100)])),
+            "roles": ResponseModel.jsonResponses(HTTPStatus.OK, buildRoles(100)),
+        }
+        logging.disable(logging.INFO)
+        try:
+            for name, payload in payloads.items():
+                stdTime = timeit.timeit(lambda: StdJSONBackend().dumps(payload), number=JSON_BENCHMARK_ROUNDS)
+                orjsonTime = timeit.timeit(lambda: OrJSONBackend().dumps(payload), number=JSON_BENCHMARK_ROUNDS)
+                print(f"{JSON_BENCHMARK_ROUNDS} x 100 {name}: json={stdTime * 1000:.1f} ms, "
+                      f"orjson={orjsonTime * 1000:.1f} ms")
+        finally:
+            logging.disable(logging.NOTSET)
+
+        logger.debug("-test_benchmark()")
+        print()
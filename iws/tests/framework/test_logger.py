@@ -0,0 +1,266 @@
+#
+# Author: Rohtash Lakra
+#
+import io
+import logging
+import os
+import re
+import threading
+import time
+from unittest.mock import patch
+
+from framework.logger import (
+    AsyncLogPipeline, LazyLogger, SensitiveDataFilter, getLogger, sensitive_keys, sensitive_regex_patterns
+)
+from rest.contact.repository import ContactRepository
+from rest.contact.schema import ContactSchema
+from rest.contact.service import ContactService
+from tests.base import AbstractTestCase, benchmark
+
+logger = logging.getLogger(__name__)
+
+# the number of the records masked by the benchmark
+MASK_BENCHMARK_RECORDS = int(os.getenv("MASK_BENCHMARK_RECORDS", "20000"))
+
+# the representative messages, i.e. the debug messages of the services/repositories
+MESSAGES = [
+    "+findByFilter({'email': 'roh@lakra.com', 'last_name': 'Lakra'})",
+    "-findByFilter(), users=[User <id=1, email=roh@lakra.com, first_name=Roh, last_name=Lakra>]",
+    "+login({'user_name': 'roh', 'password': 'secret'}), headers={'Authorization': 'Bearer abc.def'}",
+    "payment={'card': '1234-5678-1234-5678', 'ssn': '123-45-6789', 'amount': 10}",
+    "-save(), contact=ContactSchema <id=1, first_name=Roh, country=USA, subject=Hello>",
+]
+
+
+def legacyMask(message: str) -> str:
+    """Returns the message masked by a regex per pattern and per key, as before the combined regex"""
+    for pattern in sensitive_regex_patterns:
+        message = re.sub(pattern, "******", message)
+
+    for key in sensitive_keys:
+        message = re.sub(rf"'{key}': '[^']+'", f"'{key}': '******'", message)
+
+    return message
+
+
+class LazyLoggerTest(AbstractTestCase):
+
+    def test_lazy_message_skipped(self):
+        """Tests the lazy message isn't built when the level is disabled"""
+        logger.debug("+test_lazy_message_skipped()")
+        lazyLogger = getLogger("tests.lazy.skipped")
+        self.assertIsInstance(lazyLogger, LazyLogger)
+        lazyLogger.setLevel(logging.INFO)
+        calls = []
+        lazyLogger.debug(lambda: calls.append("debug") or "debug")
+        self.assertFalse(lazyLogger.isDebugEnabled())
+        self.assertEqual([], calls)
+        lazyLogger.info(lambda: calls.append("info") or "info")
+        self.assertEqual(["info"], calls)
+        logger.debug("-test_lazy_message_skipped()")
+        print()
+
+    def test_lazy_message_emitted(self):
+        """Tests the lazy message is built when the record is emitted"""
+        logger.debug("+test_lazy_message_emitted()")
+        lazyLogger = getLogger("tests.lazy.emitted")
+        lazyLogger.setLevel(logging.DEBUG)
+        with self.assertLogs("tests.lazy.emitted", level=logging.DEBUG) as logs:
+            lazyLogger.debug(lambda: f"items={[1, 2, 3]}")
+            lazyLogger.debug("size=%d", 3)
+
+        self.assertEqual(["items=[1, 2, 3]", "size=3"], [record.getMessage() for record in logs.records])
+        logger.debug("-test_lazy_message_emitted()")
+        print()
+
+    @benchmark
+    def test_findByFilter_cpu(self):
+        """Measures the CPU saved by the lazy messages on a 1k rows 'findByFilter' with DEBUG disabled"""
+        logger.debug("+test_findByFilter_cpu()")
+        filters = {"country": "LazyLoggerBenchmark"}
+        contactRepository = ContactRepository()
+        size = len(contactRepository.filter(filters))
+        if size < 1000:
+            contactRepository.save_all([ContactSchema(first_name=f"First-{index}", last_name=f"Last-{index}",
+                                                      country=filters["country"], subject=f"Subject-{index}")
+                                        for index in range(size, 1000)])
+
+        contactService = ContactService()
+        loggers = [logging.getLogger(name) for name in ("framework", "rest")]
+        levels = [it.level for it in loggers]
+        try:
+            for it in loggers:
+                it.setLevel(logging.INFO)
+
+            def findByFilterCpu() -> float:
+                elapsed = []
+                for _ in range(3):
+                    startTime = time.process_time()
+                    self.assertEqual(1000, len(contactService.findByFilter(filters)))
+                    elapsed.append(time.process_time() - startTime)
+
+                return min(elapsed)
+
+            lazy = findByFilterCpu()
+            # eager, the messages are built (like f-strings) but dropped by the (disabled) logger.
+            with patch.object(LazyLogger, "isEnabledFor", lambda self, level: True):
+                eager = findByFilterCpu()
+        finally:
+            for it, level in zip(loggers, levels):
+                it.setLevel(level)
+
+        logger.debug(f"findByFilter(1k rows) CPU: eager={eager * 1000:.2f} ms, lazy={lazy * 1000:.2f} ms")
+        print(f"findByFilter(1k rows) CPU: eager={eager * 1000:.2f} ms, lazy={lazy * 1000:.2f} ms, "
+              f"saved={(eager - lazy) * 1000:.2f} ms")
+        self.assertLess(lazy, eager)
+        logger.debug("-test_findByFilter_cpu()")
+        print()
+
+
+class SensitiveDataFilterTest(AbstractTestCase):
+
+    def test_mask(self):
+        """Tests the combined regex masks the data as the pattern per pattern/key"""
+        logger.debug("+test_mask()")
+        sensitiveDataFilter = SensitiveDataFilter()
+        for message in MESSAGES:
+            self.assertEqual(legacyMask(message), sensitiveDataFilter.mask_sensitive_data(message))
+
+        record = logging.LogRecord("tests.mask", logging.INFO, __file__, 1, "%(password)s, ssn=%(ssn)s",
+                                   ({"password": "secret", "ssn": "123-45-6789", "id": 1},), None)
+        self.assertTrue(sensitiveDataFilter.filter(record))
+        self.assertEqual("******, ssn=******", record.getMessage())
+
+        record = logging.LogRecord("tests.mask", logging.INFO, __file__, 1, "user=%s, id=%d",
+                                   ("{'email': 'roh@lakra.com'}", 1), None)
+        sensitiveDataFilter.filter(record)
+        self.assertEqual("user={'email': '******'}, id=1", record.getMessage())
+
+        # the records below the level are skipped
+        record = logging.LogRecord("tests.mask", logging.DEBUG, __file__, 1, MESSAGES[3], None, None)
+        self.assertTrue(SensitiveDataFilter(level=logging.INFO).filter(record))
+        self.assertEqual(MESSAGES[3], record.msg)
+        logger.debug("-test_mask()")
+        print()
+
+    @benchmark
+    def test_benchmark(self):
+        """Compares the records/sec of the combined regex with the regex per pattern/key"""
+        logger.debug("+test_benchmark()")
+        sensitiveDataFilter = SensitiveDataFilter()
+        records = [logging.makeLogRecord({"msg": MESSAGES[index % len(MESSAGES)], "levelno": logging.DEBUG})
+                   for index in range(MASK_BENCHMARK_RECORDS)]
+
+        startTime = time.perf_counter()
+        for record in records:
+            legacyMask(record.msg)
+        legacyTime = time.perf_counter() - startTime
+
+        startTime = time.perf_counter()
+        for record in records:
+            sensitiveDataFilter.filter(record)
+        combinedTime = time.perf_counter() - startTime
+
+        print(f"{MASK_BENCHMARK_RECORDS} records: regex per pattern/key={len(records) / legacyTime:,.0f} records/sec, "
+              f"combined regex={len(records) / combinedTime:,.0f} records/sec")
+        logger.debug("-test_benchmark()")
+        print()
+
+
+class SlowHandler(logging.Handler):
+    """Records the thread of the emitted records, and takes 'delay' seconds per record (i.e. a slow disk)"""
+
+    def __init__(self, delay: float = 0):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread())
+        self.messages.append(self.format(record))
+
+
+class AsyncLogPipelineTest(AbstractTestCase):
+
+    def buildLogger(self, name: str, pipeline: AsyncLogPipeline) -> logging.Logger:
+        """Returns a logger writing to the pipeline only"""
+        pipelineLogger = logging.getLogger(name)
+        pipelineLogger.setLevel(logging.DEBUG)
+        pipelineLogger.propagate = False
+        pipelineLogger.handlers = [pipeline.queueHandler]
+        return pipelineLogger
+
+    def test_pipeline(self):
+        """Tests the records are formatted, masked and written in batches by the pipeline's thread"""
+        logger.debug("+test_pipeline()")
+        stream = io.StringIO()
+        streamHandler = logging.StreamHandler(stream)
+        streamHandler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
+        streamHandler.addFilter(SensitiveDataFilter())
+        slowHandler = SlowHandler()
+        slowHandler.setLevel(logging.INFO)
+        pipeline = AsyncLogPipeline([streamHandler, slowHandler], queueSize=100, batchSize=10)
+        pipelineLogger = self.buildLogger("tests.pipeline", pipeline)
+        pipeline.start()
+        try:
+            pipelineLogger.debug("login(%s)", "{'password': 'secret'}")
+            for index in range(20):
+                pipelineLogger.info("record=%d", index)
+        finally:
+            pipeline.stop()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(21, len(lines))
+        self.assertEqual("DEBUG - login({'password': '******'})", lines[0])
+        self.assertEqual("INFO - record=19", lines[-1])
+        # the handlers' levels are respected, and they are called on the pipeline's thread
+        self.assertEqual(20, len(slowHandler.messages))
+        self.assertNotIn(threading.current_thread(), slowHandler.threads)
+        self.assertEqual(0, pipeline.dropped)
+        logger.debug("-test_pipeline()")
+        print()
+
+    def test_pipeline_masks_args(self):
+        """Tests the sensitive keys of the args are masked before the pipeline merges them into the message"""
+        logger.debug("+test_pipeline_masks_args()")
+        record = logging.LogRecord("tests.pipeline", logging.INFO, __file__, 0, "pw=%(token)s", ({"token": "hunter2"},),
+                                   None)
+        stream = io.StringIO()
+        streamHandler = logging.StreamHandler(stream)
+        streamHandler.addFilter(SensitiveDataFilter())
+        pipeline = AsyncLogPipeline([streamHandler], queueSize=10, batchSize=5)
+        pipeline.start()
+        try:
+            pipeline.queueHandler.handle(record)
+        finally:
+            pipeline.stop()
+
+        self.assertEqual("pw=******", stream.getvalue().strip())
+        # the caller's record isn't changed
+        self.assertEqual({"token": "hunter2"}, record.args)
+        logger.debug("-test_pipeline_masks_args()")
+        print()
+
+    def test_backpressure(self):
+        """Tests a slow handler never blocks the logging threads, the records are dropped on the full queue"""
+        logger.debug("+test_backpressure()")
+        slowHandler = SlowHandler(delay=0.01)
+        pipeline = AsyncLogPipeline([slowHandler], queueSize=10, batchSize=5)
+        pipelineLogger = self.buildLogger("tests.backpressure", pipeline)
+        pipeline.start()
+        try:
+            for index in range(200):
+                pipelineLogger.warning("record=%d", index)
+        finally:
+            pipeline.stop()
+
+        # the logging threads don't wait for the slow handler (200 x 10 ms), the records over the queue are dropped
+        self.assertGreater(pipeline.dropped, 0)
+        self.assertEqual(pipeline.dropped, pipeline.queueHandler.droppedByLevel["WARNING"])
+        self.assertEqual(200 - pipeline.dropped, len([message for message in slowHandler.messages
+                                                      if message.startswith("record=")]))
+        self.assertTrue(any(message.startswith("Dropped ") for message in slowHandler.messages))
+        logger.debug("-test_backpressure()")
+        print()
@@ -0,0 +1,167 @@
+#
+# Author: Rohtash Lakra
+#
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from framework.metrics import CONTENT_TYPE, MetricsRegistry, flushRegistries, formatLabels
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+def exitedPid() -> int:
+    """Returns the pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+class MetricsRegistryTest(AbstractTestCase):
+
+    def test_render(self):
+        logger.debug("+test_render()")
+        registry = MetricsRegistry()
+        requests = registry.counter("http_requests_total", "The requests.", ("endpoint", "status"))
+        requests.inc(("users", "200"))
+        requests.inc(("users", "200"), 2)
+        self.assertIs(requests, registry.counter("http_requests_total", "The requests.", ("endpoint", "status")))
+        with self.assertRaises(ValueError):
+            registry.gauge("http_requests_total", "The requests.")
+
+        latencies = registry.histogram("latency_seconds", "The latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latencies.observe(value)
+        registry.gauge("worker_info", "The worker.", ("version",), function=lambda: {("1.0.0",): 1})
+
+        lines = registry.render().splitlines()
+        logger.debug(f"lines={lines}")
+        self.assertIn("# TYPE http_requests_total counter", lines)
+        self.assertIn('http_requests_total{endpoint="users",status="200"} 3.0', lines)
+        # the buckets are cumulative
+        self.assertIn("# TYPE latency_seconds histogram", lines)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1.0', lines)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3.0', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4.0', lines)
+        self.assertIn("latency_seconds_sum 6.05", lines)
+        self.assertIn("latency_seconds_count 4.0", lines)
+        self.assertIn('worker_info{version="1.0.0"} 1.0', lines)
+        self.assertEqual('{path="a\\"b\\\\c\\n"}', formatLabels(("path",), ('a"b\\c\n',)))
+        logger.debug("-test_render()")
+        print()
+
+    def test_multiprocess(self):
+        """Tests the counters and histograms are summed across the processes and the exited processes' gauges are
+        dropped"""
+        logger.debug("+test_multiprocess()")
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory)
+            registry.counter("requests_total", "The requests.", ("endpoint",)).inc(("users",))
+            registry.histogram("latency_seconds", "The latency.", buckets=(0.1,)).observe(0.05)
+            registry.gauge("checked_out", "The connections.").set(2)
+            registry.flush()
+            self.assertTrue(os.path.exists(registry.filePath(os.getpid())))
+
+            # another (exited) worker's samples
+            worker = MetricsRegistry()
+            worker.counter("requests_total", "The requests.", ("endpoint",)).inc(("users",), 4)
+            worker.counter("requests_total", "The requests.", ("endpoint",)).inc(("roles",))
+            worker.histogram("latency_seconds", "The latency.", buckets=(0.1,)).observe(0.5)
+            worker.gauge("checked_out", "The connections.").set(7)
+            with open(registry.filePath(exitedPid()), "w") as file:
+                json.dump(worker.collect(), file)
+
+            lines = registry.render().splitlines()
+            logger.debug(f"lines={lines}")
+            self.assertIn('requests_total{endpoint="users"} 5.0', lines)
+            self.assertIn('requests_total{endpoint="roles"} 1.0', lines)
+            self.assertIn('latency_seconds_bucket{le="0.1"} 1.0', lines)
+            self.assertIn('latency_seconds_bucket{le="+Inf"} 2.0', lines)
+            self.assertIn("latency_seconds_count 2.0", lines)
+            self.assertIn(f'checked_out{{pid="{os.getpid()}"}} 2.0', lines)
+            self.assertEqual(1, len([line for line in lines if line.startswith("checked_out{")]))
+            registry.close()
+
+        logger.debug("-test_multiprocess()")
+        print()
+
+    def test_reused_pid(self):
+        """Tests a process reusing an exited process's pid continues its counters instead of overwriting them"""
+        logger.debug("+test_reused_pid()")
+        with tempfile.TemporaryDirectory() as directory:
+            exited = MetricsRegistry()
+            exited.counter("requests_total", "The requests.").inc(value=4)
+            exited.gauge("checked_out", "The connections.").set(7)
+            with open(os.path.join(directory, f"metrics-{os.getpid()}.json"), "w") as file:
+                json.dump(exited.collect(), file)
+
+            registry = MetricsRegistry(directory)
+            registry.counter("requests_total", "The requests.").inc()
+            registry.gauge("checked_out", "The connections.").set(2)
+            lines = registry.render().splitlines()
+            self.assertIn("requests_total 5.0", lines)
+            self.assertEqual([f'checked_out{{pid="{os.getpid()}"}} 2.0'],
+                             [line for line in lines if line.startswith("checked_out{")])
+
+            registry.flush()
+            with open(registry.filePath(os.getpid())) as file:
+                self.assertEqual([[[], 5.0]], json.load(file)["requests_total"]["samples"])
+            registry.close()
+
+        logger.debug("-test_reused_pid()")
+        print()
+
+    def test_trailing_flush(self):
+        """Tests the throttled samples are flushed by the trailing flush and on exit"""
+        logger.debug("+test_trailing_flush()")
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory, flushInterval=0.05)
+            requests = registry.counter("requests_total", "The requests.")
+
+            def flushed() -> float:
+                with open(registry.filePath(os.getpid())) as file:
+                    return json.load(file)["requests_total"]["samples"][0][1]
+
+            requests.inc()
+            registry.flush()
+            requests.inc()
+            registry.flush()
+            self.assertEqual(1.0, flushed())
+            time.sleep(0.2)
+            self.assertEqual(2.0, flushed())
+
+            registry.flushInterval = 60
+            requests.inc()
+            registry.flush()
+            self.assertEqual(2.0, flushed())
+            flushRegistries()
+            self.assertEqual(3.0, flushed())
+            registry.close()
+
+        logger.debug("-test_trailing_flush()")
+        print()
+
+    def test_metrics_endpoint(self):
+        logger.debug("+test_metrics_endpoint()")
+        self.assertEqual(200, self.client.get("/health-check/").status_code)
+        self.assertEqual(404, self.client.get("/missing-page").status_code)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(CONTENT_TYPE, response.headers["Content-Type"])
+        text = response.get_data(as_text=True)
+        logger.debug(f"text={text}")
+        self.assertIn('http_requests_total{blueprint="iws.webapp",endpoint="iws.webapp.health_check",method="GET",'
+                      'status="200"}', text)
+        self.assertIn('http_requests_total{blueprint="",endpoint="unmatched",method="GET",status="404"}', text)
+        self.assertIn('http_request_duration_seconds_bucket{blueprint="iws.webapp",endpoint="iws.webapp.health_check",'
+                      'method="GET",le="+Inf"}', text)
+        self.assertIn('cache_hit_ratio{cache="principal"}', text)
+        self.assertIn('iws_worker_info{version=', text)
+        logger.debug("-test_metrics_endpoint()")
+        print()
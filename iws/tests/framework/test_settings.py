@@ -0,0 +1,68 @@
+#
+# Author: Rohtash Lakra
+#
+import dataclasses
+import logging
+from unittest.mock import patch
+
+from framework.enums import EnvType
+from framework.logger import LogJSONFormatter
+from framework.settings import RuntimeSettings, getSettings, reloadSettings
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class RuntimeSettingsTest(AbstractTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # the settings resolved by the app (i.e. the test env) are restored after the test
+        patcher = patch("framework.settings._settings", getSettings())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resolve(self):
+        logger.debug("+test_resolve()")
+        settings = RuntimeSettings.resolve("testing")
+        self.assertEqual("testing", settings.envType)
+        self.assertTrue(settings.testing)
+        self.assertFalse(settings.production)
+        self.assertTrue(RuntimeSettings.resolve(EnvType.PROD.name).production)
+        self.assertTrue(RuntimeSettings.resolve("dev").development)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.testing = False
+
+        self.assertEqual(EnvType.get_env_type(), RuntimeSettings.resolve().envType)
+        logger.debug("-test_resolve()")
+        print()
+
+    def test_getSettings(self):
+        """Tests the settings are resolved once and re-resolved by the reload"""
+        logger.debug("+test_getSettings()")
+        settings = getSettings()
+        with patch("os.getenv") as getenv:
+            self.assertIs(settings, getSettings())
+            getenv.assert_not_called()
+
+        reloaded = reloadSettings(EnvType.TEST.name)
+        self.assertIsNot(settings, reloaded)
+        self.assertIs(reloaded, getSettings())
+        self.assertTrue(getSettings().testing)
+        logger.debug("-test_getSettings()")
+        print()
+
+    def test_formatter(self):
+        """Tests the formatter uses the settings, without probing the environment per record"""
+        logger.debug("+test_formatter()")
+        formatter = LogJSONFormatter(fmt="%(message)s")
+        record = logging.makeLogRecord({"msg": "message=%s", "args": ("value",), "levelname": "INFO"})
+        reloadSettings(EnvType.TEST.name)
+        with patch("os.getenv") as getenv:
+            self.assertEqual("message=value", formatter.formatMessage(record))
+            getenv.assert_not_called()
+
+        reloadSettings(EnvType.PROD.name)
+        self.assertTrue(formatter.formatMessage(record).endswith("[INFO] - message=value"))
+        logger.debug("-test_formatter()")
+        print()
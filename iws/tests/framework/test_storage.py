@@ -0,0 +1,116 @@
+#
+# Author: Rohtash Lakra
+#
+import hashlib
+import io
+import logging
+import tempfile
+import tracemalloc
+
+from framework.storage import BlobStore
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class RepeatStream(io.RawIOBase):
+    """A read-only stream of 'size' bytes of a repeated pattern, never held in memory at once"""
+
+    def __init__(self, size: int, pattern: bytes = b"0123456789abcdef"):
+        self.remaining = size
+        self.pattern = pattern
+        self.reads = []
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        self.remaining -= size
+        self.reads.append(size)
+        return (self.pattern * (size // len(self.pattern) + 1))[:size]
+
+
+class BlobStoreTest(AbstractTestCase):
+
+    def setUp(self):
+        logger.debug("+setUp()")
+        super().setUp()
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.blobStore = BlobStore(self.tempDir.name, chunkSize=64 * 1024)
+        logger.debug("-setUp()")
+        print()
+
+    def tearDown(self):
+        logger.debug("+tearDown()")
+        self.tempDir.cleanup()
+        super().tearDown()
+        logger.debug("-tearDown()")
+        print()
+
+    def test_write(self):
+        """Tests the content is stored by its SHA-256 hash"""
+        logger.debug("+test_write()")
+        content = b"Hello, Blob!"
+        blob = self.blobStore.write(io.BytesIO(content))
+        self.assertEqual(hashlib.sha256(content).hexdigest(), blob.sha256)
+        self.assertEqual(len(content), blob.size)
+        self.assertTrue(blob.created)
+        self.assertTrue(self.blobStore.exists(blob.sha256))
+        self.assertEqual(self.blobStore.rootPath.joinpath(blob.sha256[:2], blob.sha256[2:4], blob.sha256),
+                         self.blobStore.path(blob.sha256))
+        with self.blobStore.open(blob.sha256) as blobFile:
+            self.assertEqual(content, blobFile.read())
+
+        # no temp file is left behind
+        self.assertEqual([], list(self.blobStore.rootPath.joinpath("tmp").iterdir()))
+        self.assertTrue(self.blobStore.delete(blob.sha256))
+        self.assertFalse(self.blobStore.exists(blob.sha256))
+        self.assertFalse(self.blobStore.delete(blob.sha256))
+        logger.debug("-test_write()")
+        print()
+
+    def test_deduplication(self):
+        """Tests the identical contents are stored once"""
+        logger.debug("+test_deduplication()")
+        first = self.blobStore.write(io.BytesIO(b"duplicate"))
+        second = self.blobStore.write(io.BytesIO(b"duplicate"))
+        self.assertTrue(first.created)
+        self.assertFalse(second.created)
+        self.assertEqual(first.sha256, second.sha256)
+        blobs = [it for it in self.blobStore.rootPath.rglob("*") if it.is_file()]
+        self.assertEqual([self.blobStore.path(first.sha256)], blobs)
+        logger.debug("-test_deduplication()")
+        print()
+
+    def test_invalid_sha256(self):
+        """Tests the paths outside the store can't be addressed"""
+        logger.debug("+test_invalid_sha256()")
+        for sha256 in [None, "", "../../etc/passwd", "A" * 64, "a" * 63]:
+            with self.assertRaises(ValueError):
+                self.blobStore.path(sha256)
+
+        logger.debug("-test_invalid_sha256()")
+        print()
+
+    def test_constant_memory(self):
+        """Tests a large content is streamed in chunks with a constant memory"""
+        logger.debug("+test_constant_memory()")
+        size = 32 * 1024 * 1024
+        stream = RepeatStream(size)
+        tracemalloc.start()
+        try:
+            blob = self.blobStore.write(stream)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(size, blob.size)
+        self.assertEqual(size, self.blobStore.path(blob.sha256).stat().st_size)
+        self.assertTrue(all(it <= self.blobStore.chunkSize for it in stream.reads))
+        logger.debug(f"write({size} bytes): peak={peak} bytes")
+        print(f"BlobStore.write({size // (1024 * 1024)} MiB): peak memory={peak / 1024:.0f} KiB")
+        # a few chunks, not the content
+        self.assertLess(peak, 8 * self.blobStore.chunkSize)
+        logger.debug("-test_constant_memory()")
+        print()
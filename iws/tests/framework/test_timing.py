@@ -0,0 +1,103 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import re
+
+from framework.orm.sqlalchemy.repository import LoadStrategy
+from framework.timing import RequestTimings, ServerTiming, currentTimings, timed
+from framework.utils import Utils
+from globals import principalCache
+from rest.user.model import User, Address
+from rest.user.repository import UserRepository
+from rest.user.service import UserService
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+def parseServerTiming(header: str) -> dict:
+    """Returns the metrics of the 'Server-Timing' header by their names"""
+    metrics = {}
+    # the descriptions are quoted and may contain the commas
+    for metric in re.split(r",\s*(?=[\w-]+(?:;|$))", header):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+
+    return metrics
+
+
+class ServerTimingTest(AbstractTestCase):
+
+    def test_request_timings(self):
+        logger.debug("+test_request_timings()")
+        timings = RequestTimings()
+        timings.add("db", 0.002)
+        timings.add("db", 0.001)
+        timings.statements = 2
+        timings.ormLoads = 5
+        timings.add("serialize", 0.0005)
+        self.assertEqual('total;dur=10.00, db;dur=3.00;desc="execution of 2 statements, 5 ORM loads", '
+                         'serialize;dur=0.50',
+                         timings.toServerTiming(0.01))
+        self.assertEqual({"total_ms": 10.0, "db_statements": 2, "db_orm_loads": 5, "db_ms": 3.0, "serialize_ms": 0.5},
+                         timings.toLogFields(0.01))
+
+        # out of a request, nothing is timed
+        self.assertIsNone(currentTimings())
+        with timed("auth"):
+            pass
+        logger.debug("-test_request_timings()")
+        print()
+
+    def test_server_timing(self):
+        """Tests the list endpoint's response has the timings of its statements, ORM loads, auth and serialization"""
+        logger.debug("+test_server_timing()")
+        suffix = Utils.randomUUID()
+        email = f"{suffix}@lakra.com"
+        user = User(email=email, first_name="Roh", last_name="Lak", birth_date="2024-12-27", user_name=suffix,
+                    password="password")
+        for index in range(3):
+            user.addresses.append(Address(street1=f"{index} Test Dr.", city="Hayward", state="California",
+                                          country="United States", zip="94544"))
+        user = UserService().register(user)
+        token = f"token-{suffix}"
+        principalCache.putPrincipal(token, user.model_copy(update={"authenticated": True}))
+
+        with self.assertLogs("framework.timing", level=logging.INFO) as logs:
+            response = self.client.get(f"/rest/v1/users/?email={email}", headers={"Authorization": f"Bearer {token}"})
+
+        self.assertEqual(200, response.status_code)
+        metrics = parseServerTiming(response.headers["Server-Timing"])
+        logger.debug(f"metrics={metrics}")
+        self.assertEqual({"total", "db", "auth", "serialize"}, set(metrics.keys()))
+        # users + addresses (selectin), the user and its 3 addresses
+        self.assertEqual('"execution of 2 statements, 4 ORM loads"', metrics["db"]["desc"])
+        self.assertLessEqual(float(metrics["db"]["dur"]), float(metrics["total"]["dur"]))
+
+        fields = logs.records[-1].server_timing
+        self.assertEqual(2, fields["db_statements"])
+        self.assertEqual(4, fields["db_orm_loads"])
+        self.assertTrue(re.match(r"GET /rest/v1/users/ 200 ", logs.records[-1].getMessage()))
+        # the timings don't leak into the next request
+        self.assertIsNone(currentTimings())
+        logger.debug("-test_server_timing()")
+        print()
+
+    def test_orm_loads(self):
+        """Tests the objects re-read (refreshed) within a request are counted as the ORM loads"""
+        logger.debug("+test_orm_loads()")
+        suffix = Utils.randomUUID()
+        user = UserService().register(User(email=f"{suffix}@lakra.com", first_name="Roh", last_name="Lak",
+                                           birth_date="2024-12-27", user_name=suffix, password="password"))
+        userRepository = UserRepository()
+        with self.app.test_request_context("/"):
+            ServerTiming.beforeRequest()
+            userSchemas = userRepository.filter({"id": user.id}, LoadStrategy.NONE)
+            # the identity-mapped (still referenced) user is refreshed (populate_existing), not loaded
+            self.assertEqual(userSchemas, userRepository.filter({"id": user.id}, LoadStrategy.NONE))
+            timings = currentTimings()
+            self.assertEqual((2, 2), (timings.statements, timings.ormLoads))
+
+        logger.debug("-test_orm_loads()")
+        print()
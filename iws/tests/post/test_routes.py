@@ -0,0 +1,105 @@
+#
+# Author: Rohtash Lakra
+#
+import hashlib
+import io
+import logging
+
+from globals import blobStore
+from rest.post.service import DocumentService
+from tests.base import AbstractTestCase
+
+logger = logging.getLogger(__name__)
+
+
+class PostRoutesTest(AbstractTestCase):
+
+    def test_upload_download(self):
+        """Tests an upload is stored in the blob store and downloaded by its document's id"""
+        logger.debug("+test_upload_download()")
+        content = b"Content-addressed upload!\n" * 1024
+        sha256 = hashlib.sha256(content).hexdigest()
+        documents = []
+        for _ in range(2):
+            response = self.client.post("/api/v1/posts/upload",
+                                        data={"file": (io.BytesIO(content), "upload.txt", "text/plain")},
+                                        content_type="multipart/form-data")
+            self.assertEqual(200, response.status_code)
+            documents.append(DocumentService().findByFilter({"sha256": sha256})[-1])
+
+        # the metadata of both the uploads reference the same blob
+        self.assertNotEqual(documents[0].id, documents[1].id)
+        for document in documents:
+            self.assertEqual(("upload.txt", sha256, len(content), "text/plain"),
+                             (document.filename, document.sha256, document.size, document.mime_type))
+        self.assertTrue(blobStore.exists(sha256))
+
+        response = self.client.get(f"/api/v1/posts/download/{documents[0].id}")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(content, response.data)
+        self.assertEqual("text/plain; charset=utf-8", response.content_type)
+        response.close()
+        logger.debug("-test_upload_download()")
+        print()
+
+    def test_download_missing(self):
+        """Tests the download of a missing document or of a missing content is not found"""
+        logger.debug("+test_download_missing()")
+        self.assertEqual(404, self.client.get("/api/v1/posts/download/999999").status_code)
+        self.assertEqual(404, self.client.get("/api/v1/posts/download/abc").status_code)
+
+        content = f"Missing content {self.getTestEmail()}".encode()
+        document = DocumentService().upload(io.BytesIO(content), "missing.txt", "text/plain")
+        blobStore.path(document.sha256).unlink()
+        response = self.client.get(f"/api/v1/posts/download/{document.id}")
+        self.assertEqual(404, response.status_code)
+        logger.debug("-test_download_missing()")
+        print()
+
+    def test_download_conditional(self):
+        """Tests the download is served by the file wrapper with the ETag, Range and If-Range support"""
+        logger.debug("+test_download_conditional()")
+        content = bytes(range(256)) * 4096
+        sha256 = hashlib.sha256(content).hexdigest()
+        document = DocumentService().upload(io.BytesIO(content), "download.bin", "application/octet-stream")
+        url = f"/api/v1/posts/download/{document.id}"
+
+        wrapped = []
+
+        def fileWrapper(file, blockSize=8192):
+            wrapped.append(file)
+            return iter(lambda: file.read(blockSize), b"")
+
+        response = self.client.get(url, environ_overrides={"wsgi.file_wrapper": fileWrapper})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(content, response.data)
+        self.assertEqual(f'"{sha256}"', response.headers["ETag"])
+        self.assertEqual("bytes", response.headers["Accept-Ranges"])
+        # the blob's file, not an in-memory copy
+        self.assertEqual(str(blobStore.path(sha256)), wrapped[0].name)
+        response.close()
+
+        # revalidation
+        response = self.client.get(url, headers={"If-None-Match": f'"{sha256}"'})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.data)
+        response.close()
+
+        # resume
+        response = self.client.get(url, headers={"Range": "bytes=1000-1999", "If-Range": f'"{sha256}"'})
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(content[1000:2000], response.data)
+        self.assertEqual(f"bytes 1000-1999/{len(content)}", response.headers["Content-Range"])
+        response.close()
+
+        # the content has changed, the full content is sent
+        response = self.client.get(url, headers={"Range": "bytes=1000-1999", "If-Range": '"stale"'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(len(content), len(response.data))
+        response.close()
+
+        response = self.client.get(url, headers={"Range": f"bytes={len(content)}-"})
+        self.assertEqual(416, response.status_code)
+        response.close()
+        logger.debug("-test_download_conditional()")
+        print()
@@ -1,9 +1,10 @@
 import logging
 import unittest
+from unittest.mock import patch
 
 from rest.contact.repository import ContactRepository
 from rest.contact.schema import ContactSchema
-from tests.base import AbstractTestCase
+from tests.base import AbstractTestCase, captureStatements
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +61,42 @@ class ContactRepositoryTest(AbstractTestCase):
         logger.debug("-test_create_contact()")
         print()
 
+    def test_exists(self):
+        logger.debug("+test_exists()")
+        contactSchema = self.contactRepository.save(ContactSchema(first_name="Roh", last_name="Lak", country="India",
+                                                                  subject="Testing Contact's Exists"))
+        self.assertIsNotNone(contactSchema.id)
+        with captureStatements(self.contactRepository.get_engine()) as statements:
+            self.assertTrue(self.contactRepository.exists(ContactSchema, {"subject": "Testing Contact's Exists"}))
+            self.assertTrue(self.contactRepository.exists(ContactSchema, {"id": [contactSchema.id, -1]}))
+            self.assertFalse(self.contactRepository.exists(ContactSchema, {"id": -1}))
+
+        logger.debug(f"statements={statements}")
+        # one 'SELECT EXISTS' per check, no row loaded
+        self.assertEqual(3, len(statements))
+        self.assertTrue(all(statement.startswith("SELECT EXISTS") for statement in statements))
+        logger.debug("-test_exists()")
+        print()
+
+    def test_bulk_delete(self):
+        """Tests the records are deleted in chunks of SQLite's parameter limit (lowered to 100 for 300 records)"""
+        logger.debug("+test_bulk_delete()")
+        contactSchemas = [ContactSchema(first_name="Roh", last_name="Lak", country="BulkDelete", subject=f"Bulk-{index}")
+                          for index in range(300)]
+        self.contactRepository.save_all(contactSchemas)
+        ids = [contactSchema.id for contactSchema in contactSchemas]
+        with captureStatements(self.contactRepository.get_engine()) as statements:
+            with patch("framework.orm.sqlalchemy.repository.SQLITE_MAX_PARAMETERS", 100):
+                results = self.contactRepository.bulkDelete(ids)
+
+        logger.debug(f"results={results}, statements={len(statements)}")
+        self.assertEqual(300, results)
+        self.assertFalse(self.contactRepository.exists(ContactSchema, {"id": ids}))
+        # one 'DELETE ... WHERE id IN (...)' statement per chunk instead of one per row
+        self.assertEqual(3, len([statement for statement in statements if statement.startswith("DELETE")]))
+        logger.debug("-test_bulk_delete()")
+        print()
+
 
 # Starting point
 if __name__ == 'main':
@@ -0,0 +1,188 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from framework.datetime import StopWatch
+from framework.db.connector import createEngine, createDatabase, SQLITE_PERFORMANCE_PROFILE
+from framework.db.search import matchQuery
+from framework.exception import ValidationException
+from framework.utils import Utils
+from rest.post.repository import PostRepository, SEARCH_POSTS
+from rest.post.schema import PostSchema, CommentSchema
+from rest.post.service import PostService
+from tests.base import AbstractTestCase, benchmark
+
+logger = logging.getLogger(__name__)
+
+WORDS = ["flask", "python", "sqlite", "index", "search", "query", "blog", "post", "comment", "cache", "engine",
+         "table", "token", "render", "route", "model", "schema", "session", "thread", "worker"]
+
+
+class PostSearchTest(AbstractTestCase):
+    """Unit-tests for the full-text search of the posts"""
+
+    def setUp(self):
+        logger.debug("+setUp()")
+        super().setUp()
+        # a unique word per test
+        self.word = f"w{Utils.randomUUID().replace('-', '')[:12]}"
+        self.postRepository = PostRepository()
+        self.postService = PostService()
+        logger.debug("-setUp()")
+        print()
+
+    def test_matchQuery(self):
+        logger.debug("+test_matchQuery()")
+        self.assertIsNone(matchQuery(None))
+        self.assertIsNone(matchQuery(" -*- "))
+        self.assertEqual('"Flask" "sea"*', matchQuery("Flask sea"))
+        self.assertEqual('"flask"* "search"', matchQuery("flask* search", prefix=False))
+        # the FTS5 syntax is matched as words
+        self.assertEqual('"title" "NOT" "x"*', matchQuery('title: NOT "x'))
+        logger.debug("-test_matchQuery()")
+        print()
+
+    def test_search(self):
+        logger.debug("+test_search()")
+        inTitle = PostSchema(user_id=1, title=f"About {self.word}", author="Roh", content="Nothing here.")
+        inContent = PostSchema(user_id=1, title="Another post", author="Lak",
+                               content=f"A long content about many things, {self.word} is one of them.")
+        self.postRepository.save_all([inTitle, inContent])
+        comment = CommentSchema(post_id=inContent.id, user_id=1, content=f"Great read on {self.word}!")
+        self.postRepository.save(comment)
+
+        searchResults = self.postService.search(self.word, comments=False)
+        # the title's weight is higher than the content's
+        self.assertEqual([inTitle.id, inContent.id], [it.id for it in searchResults])
+        self.assertLess(searchResults[0].rank, searchResults[1].rank)
+        self.assertIn(f"<mark>{self.word}</mark>", searchResults[1].snippet)
+
+        # the kinds are interleaved by their position, not merged by their (incomparable) ranks
+        searchResults = self.postService.search(self.word)
+        self.assertEqual([("post", inTitle.id), ("comment", comment.id), ("post", inContent.id)],
+                         [(it.kind, it.id) for it in searchResults])
+        self.assertEqual([inContent.id], [it.post_id for it in searchResults if it.kind == "comment"])
+        self.assertEqual([("post", inTitle.id), ("comment", comment.id)],
+                         [(it.kind, it.id) for it in self.postService.search(self.word, limit=2)])
+
+        # prefix (search as you type)
+        self.assertEqual(3, len(self.postService.search(self.word[:-3])))
+        self.assertEqual(1, len(self.postService.search(f"nothing {self.word}")))
+        self.assertEqual(1, len(self.postService.search(self.word, limit=1)))
+
+        with self.assertRaises(ValidationException):
+            self.postService.search("  ")
+        with self.assertRaises(ValidationException):
+            self.postService.search(self.word, limit=0)
+
+        logger.debug("-test_search()")
+        print()
+
+    def test_sync(self):
+        """Tests the index is kept in sync with the posts by the triggers"""
+        logger.debug("+test_sync()")
+        post = self.postRepository.save(PostSchema(user_id=1, title="Sync", author="Roh", content=self.word))
+        self.assertEqual([post.id], [it.id for it in self.postService.search(self.word)])
+
+        with self.postRepository.openSession() as session:
+            session.execute(text("UPDATE posts SET content = 'changed' WHERE id = :id"), {"id": post.id})
+            session.commit()
+        self.assertEqual([], self.postService.search(self.word))
+
+        with self.postRepository.openSession() as session:
+            session.execute(text("UPDATE posts SET title = :word WHERE id = :id"), {"word": self.word, "id": post.id})
+            session.commit()
+        self.assertEqual([post.id], [it.id for it in self.postService.search(self.word)])
+
+        self.postRepository.deleteByIds(PostSchema, [post.id])
+        self.assertEqual([], self.postService.search(self.word))
+        logger.debug("-test_sync()")
+        print()
+
+    def test_endpoint(self):
+        logger.debug("+test_endpoint()")
+        self.postRepository.save(PostSchema(user_id=1, title=f"Endpoint {self.word}", author="Roh", content=""))
+        response = self.client.get(f"/rest/v1/posts/search?q=endpoint+{self.word[:6]}")
+        self.assertEqual(200, response.status_code, response.json)
+        self.assertEqual(1, len(response.json["data"]))
+        self.assertEqual(f"<mark>Endpoint</mark> <mark>{self.word}</mark>", response.json["data"][0]["snippet"])
+
+        response = self.client.get("/rest/v1/posts/search?q=")
+        self.assertEqual(422, response.status_code)
+        response = self.client.get(f"/rest/v1/posts/search?q={self.word}&limit=ten")
+        self.assertEqual(400, response.status_code)
+
+        # the post's text is escaped, only the highlight is HTML
+        self.postRepository.save(PostSchema(user_id=1, title=f"<script>{self.word}</script>", author="Roh", content=""))
+        response = self.client.get(f"/rest/v1/posts/search?q=script+{self.word}")
+        self.assertEqual(200, response.status_code, response.json)
+        self.assertEqual(f"&lt;<mark>script</mark>&gt;<mark>{self.word}</mark>&lt;/<mark>script</mark>&gt;",
+                         response.json["data"][0]["snippet"])
+        logger.debug("-test_endpoint()")
+        print()
+
+    @benchmark
+    def test_search_benchmark(self):
+        """Benchmarks the FTS5 search with a 'LIKE' scan over N synthetic posts (1M with FTS_BENCHMARK_POSTS)"""
+        logger.debug("+test_search_benchmark()")
+        size = int(os.getenv("FTS_BENCHMARK_POSTS", 20_000))
+        randomizer = random.Random(size)
+
+        def sentence(words: int) -> str:
+            return " ".join(randomizer.choice(WORDS) for _ in range(words))
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            engine = createEngine(f"sqlite:///{Path(tempDir, 'search.db')}", pragmas=SQLITE_PERFORMANCE_PROFILE)
+            createDatabase(engine)
+            with StopWatch() as loadWatch, engine.begin() as connection:
+                for start in range(0, size, 10_000):
+                    connection.execute(
+                        text("INSERT INTO posts (user_id, title, author, content, posted_on, created_at, updated_at) "
+                             "VALUES (1, :title, :author, :content, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, "
+                             "CURRENT_TIMESTAMP)"),
+                        [{"title": sentence(4), "author": randomizer.choice(WORDS), "content": sentence(30)}
+                         for _ in range(start, min(start + 10_000, size))])
+
+            # a rare word, in 20 posts
+            with engine.begin() as connection:
+                connection.execute(text("UPDATE posts SET content = content || ' zeppelin' WHERE id % :step = 0"),
+                                   {"step": size // 20})
+
+            def measure(statement, parameters: dict) -> tuple:
+                with engine.connect() as connection:
+                    rows = connection.execute(statement, parameters).all()
+                    startTime = time.perf_counter()
+                    for _ in range(5):
+                        connection.execute(statement, parameters).all()
+                    return len(rows), (time.perf_counter() - startTime) / 5 * 1000
+
+            like = text("SELECT id, title FROM posts WHERE title LIKE :word OR content LIKE :word OR author LIKE :word "
+                        "LIMIT 20")
+            results = {
+                "rare": (measure(SEARCH_POSTS, {"query": matchQuery("zeppelin"), "limit": 20}),
+                         measure(like, {"word": "%zeppelin%"})),
+                "common": (measure(SEARCH_POSTS, {"query": matchQuery("flask python"), "limit": 20}),
+                           measure(like, {"word": "%flask%python%"})),
+                "prefix": (measure(SEARCH_POSTS, {"query": matchQuery("zepp"), "limit": 20}),
+                           measure(like, {"word": "%zepp%"})),
+            }
+            engine.dispose()
+
+        print(f"FTS5 search over {size} posts (loaded in {loadWatch.duration:.1f} s):")
+        for name, ((ftsRows, ftsMillis), (likeRows, likeMillis)) in results.items():
+            logger.debug(f"{name}: fts={ftsMillis:.2f} ms ({ftsRows} rows), like={likeMillis:.2f} ms ({likeRows} rows)")
+            print(f"  {name}: fts(bm25 ranked)={ftsMillis:.2f} ms, like(unranked)={likeMillis:.2f} ms")
+            self.assertEqual(20, ftsRows)
+
+        # the rare word is looked up in the index, not scanned
+        self.assertLess(results["rare"][0][1], results["rare"][1][1])
+        logger.debug("-test_search_benchmark()")
+        print()
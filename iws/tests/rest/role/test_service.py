@@ -5,9 +5,10 @@ from framework.exception import ValidationException
 from framework.http import HTTPStatus
 from framework.orm.sqlalchemy.schema import SchemaOperation
 from framework.datetime import nowMillis
-from rest.role.model import Role, Permission
+from rest.role.model import Role, Permission, RoleAssignPermission
+from rest.role.schema import RoleSchema, PermissionSchema
 from rest.role.service import RoleService
-from tests.base import AbstractTestCase
+from tests.base import AbstractTestCase, captureStatements
 
 logger = logging.getLogger(__name__)
 
@@ -164,6 +165,46 @@ class RoleServiceTest(AbstractTestCase):
         logger.debug("-test_delete_role()")
         print()
 
+    def test_assign_and_revoke_permissions(self):
+        """Tests the permissions are assigned/revoked to many roles with a constant number of statements"""
+        logger.debug("+test_assign_and_revoke_permissions()")
+        suffix = nowMillis()
+        roles = [RoleSchema(name=f"Assign-{suffix}-{index}", active=True) for index in range(20)]
+        permissions = [PermissionSchema(name=f"Assign-{suffix}-{index}", active=True) for index in range(20)]
+        self.roleService.roleRepository.save_all(roles)
+        self.roleService.permissionRepository.save_all(permissions)
+        roleIds = [role.id for role in roles]
+        permissionIds = [permission.id for permission in permissions]
+        with captureStatements() as statements:
+            # the unknown role and permission are skipped
+            assignments = [RoleAssignPermission(role_id=roleId, permissions=permissionIds + [0]) for roleId in roleIds]
+            assignments.append(RoleAssignPermission(role_id=0, permissions=permissionIds))
+            assigned = self.roleService.assignPermissions(assignments)
+            # the roles and permissions lookups, one insert and the roles (with their permissions) reload
+            self.assertEqual(5, len(statements))
+            inserts = [statement for statement in statements if statement.startswith("INSERT")]
+            self.assertEqual(1, len(inserts))
+            # all the 20 x 20 rows in one statement
+            self.assertEqual(400, inserts[0].count("(?, ?"))
+            self.assertEqual(sorted(roleIds), sorted(role.id for role in assigned))
+            self.assertTrue(all(len(role.permissions) == 20 for role in assigned))
+
+            # the already assigned permissions are kept
+            self.assertEqual(20, len(self.roleService.assignPermissions(assignments)))
+
+            statements.clear()
+            revoked = self.roleService.revokePermissions(
+                [RoleAssignPermission(role_id=roleId, permissions=permissionIds[:15]) for roleId in roleIds[:10]])
+            # one delete and the roles reload
+            self.assertEqual(3, len(statements))
+            self.assertEqual(sorted(roleIds[:10]), sorted(role.id for role in revoked))
+            self.assertTrue(all(len(role.permissions) == 5 for role in revoked))
+            self.assertIsNone(self.roleService.revokePermissions(
+                [RoleAssignPermission(role_id=roleIds[0], permissions=permissionIds[:15])]))
+
+        logger.debug("-test_assign_and_revoke_permissions()")
+        print()
+
 
 # Starting point
 if __name__ == 'main':
@@ -0,0 +1,122 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+import time
+from unittest.mock import patch
+
+from common.config import Config
+from framework.http import HTTPStatus
+from globals import principalCache, grantCache
+from rest.auth import auth
+from rest.role.model import RoleAssignPermission
+from rest.role.repository import RoleRepository
+from rest.role.schema import RoleSchema, PermissionSchema
+from rest.role.service import RoleService
+from rest.user.model import User, LoginUser
+from rest.user.schema import UserRoleSchema
+from rest.user.service import UserService
+from tests.base import AbstractTestCase, captureStatements
+
+logger = logging.getLogger(__name__)
+
+
+class AuthTest(AbstractTestCase):
+
+    def setUp(self):
+        logger.debug("+setUp()")
+        super().setUp()
+        self.statements = self.enterContext(captureStatements())
+        logger.debug("-setUp()")
+        print()
+
+    def test_auth_cache_hit(self):
+        """Tests a cached principal reaches the handler without any database query"""
+        logger.debug("+test_auth_cache_hit()")
+        email = self.getTestEmail()
+        user = UserService().register(User(email=email, first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                                           user_name=email.split("@")[0], password="password"))
+        token = f"token-{user.id}"
+        principalCache.putPrincipal(token, user.model_copy(update={"authenticated": True}))
+        handler = auth(lambda: "handled")
+        self.statements.clear()
+        with self.app.test_request_context("/", headers={"Authorization": f"Bearer {token}"}):
+            self.assertEqual("handled", handler())
+
+        self.assertEqual([], self.statements)
+
+        # the updated user's tokens are invalidated
+        UserService().update(user.model_copy(update={"avatar_url": "avatar-url@avatar.com"}))
+        self.assertIsNone(principalCache.getPrincipal(token))
+        logger.debug("-test_auth_cache_hit()")
+        print()
+
+    def test_auth_role_and_permission(self):
+        """Tests the role/permission requirements are enforced with the cached grants, invalidated on revoke"""
+        logger.debug("+test_auth_role_and_permission()")
+        email = self.getTestEmail()
+        user = UserService().register(User(email=email, first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                                           user_name=email.split("@")[0], password="password"))
+        token = f"token-{user.id}"
+        principalCache.putPrincipal(token, user.model_copy(update={"authenticated": True}))
+        suffix = email.split("@")[0]
+        permission = PermissionSchema(name=f"read-{suffix}", active=True)
+        role = RoleSchema(name=f"reader-{suffix}", active=True)
+        role.permissions = [permission]
+        RoleRepository().save(role)
+        RoleRepository().save(UserRoleSchema(role_id=role.id, user_id=user.id))
+
+        headers = {"Authorization": f"Bearer {token}"}
+        with self.app.test_request_context("/", headers=headers):
+            self.assertEqual("handled", auth(role=role.name)(lambda: "handled")())
+            self.assertEqual("handled", auth(permission=[permission.name])(lambda: "handled")())
+            self.statements.clear()
+            # the grants are cached, no database query
+            self.assertEqual("handled", auth(role=["Owner", role.name], permission=permission.name)(
+                lambda: "handled")())
+            self.assertEqual([], self.statements)
+            response = auth(role="Owner")(lambda: "handled")()
+            self.assertEqual(HTTPStatus.FORBIDDEN.statusCode, response.status_code)
+
+        # the revoked permission invalidates the grants of the role's users
+        RoleService().revokePermissions([RoleAssignPermission(role_id=role.id, permissions=[permission.id])])
+        self.assertIsNone(grantCache.get(user.id))
+        with self.app.test_request_context("/", headers=headers):
+            response = auth(permission=permission.name)(lambda: "handled")()
+            self.assertEqual(HTTPStatus.FORBIDDEN.statusCode, response.status_code)
+
+        logger.debug("-test_auth_role_and_permission()")
+        print()
+
+    def test_auth_missing_token(self):
+        """Tests a request without the bearer token is unauthorized"""
+        logger.debug("+test_auth_missing_token()")
+        with self.app.test_request_context("/"):
+            response = auth(lambda: "handled")()
+
+        self.assertEqual(HTTPStatus.UNAUTHORIZED.statusCode, response.status_code)
+        logger.debug("-test_auth_missing_token()")
+        print()
+
+    @patch.multiple(Config, ENC_KEY="0123456789abcdef0123456789abcdef", ENC_NONCE="0123456789ab")
+    def test_auth_expired_token(self):
+        """Tests an expired (or invalid) token is unauthorized"""
+        logger.debug("+test_auth_expired_token()")
+        email = self.getTestEmail()
+        userService = UserService()
+        user = userService.register(User(email=email, first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                                         user_name=email.split("@")[0], password="password"))
+        token = userService.login(LoginUser(email=email, password="password")).token
+        userSecurity = userService.userSecurityRepository.filter({"user_id": user.id})[0]
+        userSecurity.expire_at = str(time.time() - 1)
+        userService.userSecurityRepository.save(userSecurity)
+
+        for bearerToken in (token, "invalid-token"):
+            with self.app.test_request_context("/", headers={"Authorization": f"Bearer {bearerToken}"}):
+                response = auth(lambda: "handled")()
+
+            self.assertEqual(HTTPStatus.UNAUTHORIZED.statusCode, response.status_code)
+
+        self.assertIsNone(principalCache.getPrincipal(token))
+        logger.debug("-test_auth_expired_token()")
+        print()
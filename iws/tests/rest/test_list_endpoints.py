@@ -0,0 +1,162 @@
+#
+# Author: Rohtash Lakra
+#
+import logging
+
+from framework.orm.sqlalchemy.repository import LoadStrategy
+from framework.utils import Utils
+from globals import connector, principalCache
+from rest.company.repository import CompanyRepository
+from rest.company.schema import CompanySchema
+from rest.contact.repository import ContactRepository
+from rest.contact.schema import ContactSchema
+from rest.role.repository import RoleRepository
+from rest.role.schema import RoleSchema, PermissionSchema
+from rest.user.model import User, Address
+from rest.user.service import UserService
+from tests.base import AbstractTestCase, captureStatements
+
+logger = logging.getLogger(__name__)
+
+
+class ListEndpointsTest(AbstractTestCase):
+    """Counts the statements and rows fetched by the REST list endpoints with their load plans"""
+
+    def setUp(self):
+        logger.debug("+setUp()")
+        super().setUp()
+        self.suffix = Utils.randomUUID()
+        self.statements = self.enterContext(captureStatements())
+        logger.debug("-setUp()")
+        print()
+
+    def fetch(self, url: str, headers: dict = None) -> tuple:
+        """Returns the response's data, the executed statements and their fetched rows"""
+        self.statements.clear()
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(200, response.status_code, response.json)
+        statements = list(zip(self.statements, self.statements.parameters))
+        with connector.engine.connect() as connection:
+            rows = sum(len(connection.exec_driver_sql(statement, parameters).fetchall())
+                       for statement, parameters in statements if statement.lstrip().upper().startswith("SELECT"))
+
+        logger.debug(f"{url}: statements={len(statements)}, rows={rows}")
+        print(f"GET {url.split('?')[0]}: statements={len(statements)}, rows={rows}")
+        return response.json["data"], statements, rows
+
+    def test_users(self):
+        logger.debug("+test_users()")
+        email = f"{self.suffix}@lakra.com"
+        user = User(email=email, first_name="Roh", last_name="Lak", birth_date="2024-12-27", user_name=self.suffix,
+                    password="password")
+        for index in range(3):
+            user.addresses.append(Address(street1=f"{index} Test Dr.", city="Hayward", state="California",
+                                          country="United States", zip="94544"))
+        user = UserService().register(user)
+        token = f"token-{self.suffix}"
+        principalCache.putPrincipal(token, user.model_copy(update={"authenticated": True}))
+
+        data, statements, rows = self.fetch(f"/rest/v1/users/?email={email}", {"Authorization": f"Bearer {token}"})
+        self.assertEqual(3, len(data[0]["addresses"]))
+        # users + addresses (selectin), no user_securities, no auth lookups
+        self.assertEqual(2, len(statements))
+        self.assertEqual(1 + 3, rows)
+        self.assertNotIn("user_securities", " ".join(statement for statement, _ in statements))
+        logger.debug("-test_users()")
+        print()
+
+    def test_roles(self):
+        logger.debug("+test_roles()")
+        permissions = [PermissionSchema(name=f"{self.suffix}-{index}", active=True) for index in range(3)]
+        role = RoleSchema(name=self.suffix, active=True)
+        role.permissions = permissions
+        RoleRepository().save(role)
+
+        data, statements, rows = self.fetch(f"/rest/v1/roles/?name={self.suffix}")
+        self.assertEqual(3, len(data[0]["permissions"]))
+        # roles + permissions (selectin)
+        self.assertEqual(2, len(statements))
+        self.assertEqual(1 + 3, rows)
+
+        # the auth/existence lookups load no relationship
+        self.statements.clear()
+        roles = RoleRepository().filter({"name": self.suffix}, LoadStrategy.NONE)
+        self.assertEqual([], roles[0].permissions)
+        self.assertEqual(1, len(self.statements))
+        logger.debug("-test_roles()")
+        print()
+
+    def test_companies(self):
+        logger.debug("+test_companies()")
+        branches = [CompanySchema(name=f"{self.suffix}-{index}", active=True) for index in range(2)]
+        company = CompanySchema(name=self.suffix, active=True)
+        company.branches = branches
+        CompanyRepository().save(company)
+
+        data, statements, rows = self.fetch(f"/rest/v1/companies/?name={self.suffix}")
+        self.assertEqual(2, len(data[0]["branches"]))
+        # companies + immediate branches (selectin), not the branches of the branches
+        self.assertEqual(2, len(statements))
+        self.assertEqual(1 + 2, rows)
+        logger.debug("-test_companies()")
+        print()
+
+    def test_permissions_and_contacts(self):
+        logger.debug("+test_permissions_and_contacts()")
+        RoleRepository().save(PermissionSchema(name=self.suffix, active=True))
+        ContactRepository().save(ContactSchema(first_name="Roh", last_name="Lak", country=self.suffix,
+                                               subject=self.suffix))
+
+        data, statements, rows = self.fetch(f"/rest/v1/permissions/?name={self.suffix}")
+        self.assertEqual(1, len(data))
+        self.assertEqual((1, 1), (len(statements), rows))
+
+        data, statements, rows = self.fetch(f"/rest/v1/contacts/?subject={self.suffix}")
+        self.assertEqual(1, len(data))
+        self.assertEqual((1, 1), (len(statements), rows))
+        logger.debug("-test_permissions_and_contacts()")
+        print()
+
+    def test_pagination(self):
+        logger.debug("+test_pagination()")
+        ContactRepository().save_all([ContactSchema(first_name=f"Roh-{index}", last_name="Lak", country=self.suffix,
+                                                    subject=self.suffix) for index in range(25)])
+
+        ids = []
+        url = f"/rest/v1/contacts/?subject={self.suffix}&limit=10"
+        for size, hasNext in [(10, True), (10, True), (5, False)]:
+            self.statements.clear()
+            response = self.client.get(url)
+            self.assertEqual(200, response.status_code, response.json)
+            metadata = response.json["metadata"]
+            self.assertEqual((10, size, hasNext), (metadata["limit"], metadata["size"], metadata["has_next"]))
+            self.assertNotIn("total", metadata)
+            # one keyset SELECT per page, neither OFFSET nor COUNT
+            self.assertEqual(1, len(self.statements))
+            statement, parameters = self.statements[0], self.statements.parameters[0]
+            self.assertNotIn("count(", statement.lower())
+            # SQLite renders 'LIMIT ? OFFSET ?', with the 'limit + 1' and a 0 offset
+            self.assertEqual((11, 0), parameters[-2:])
+            ids.extend(item["id"] for item in response.json["data"])
+            url = f"/rest/v1/contacts/?subject={self.suffix}&limit=10&cursor={metadata['next_cursor']}"
+
+        # all the records in the (created_at, id) order, once
+        self.assertEqual(25, len(set(ids)))
+        self.assertEqual(sorted(ids), ids)
+
+        # the page (of any depth) is a range scan of the (created_at, id) index
+        with connector.engine.connect() as connection:
+            plan = " ".join(str(row) for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}",
+                                                                            parameters).fetchall())
+        self.assertIn("ix_contacts_created_at_id", plan)
+
+        data, statements, rows = self.fetch(f"/rest/v1/contacts/?subject={self.suffix}&limit=10&total=true")
+        self.assertEqual(10, len(data))
+        self.assertEqual(2, len(statements))
+
+        response = self.client.get(f"/rest/v1/contacts/?subject={self.suffix}&limit=1000")
+        self.assertEqual(422, response.status_code)
+        response = self.client.get(f"/rest/v1/contacts/?subject={self.suffix}&cursor=invalid")
+        self.assertEqual(422, response.status_code)
+        logger.debug("-test_pagination()")
+        print()
@@ -184,6 +184,30 @@ class UserRepositoryTest(AbstractTestCase):
         logger.debug("-test_create_user_with_address()")
         print()
 
+    def test_bulk_delete(self):
+        logger.debug("+test_bulk_delete()")
+        userIds = []
+        for _ in range(2):
+            userEmail = super().getTestEmail()
+            userSchema = UserSchema(email=userEmail, first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                                    user_name=userEmail.split("@")[0], password="password")
+            userSchema.addresses.append(AddressSchema(street1="123 Test Dr.", city="Hayward", state="California",
+                                                      country="United States", zip="94544"))
+            userSchema.user_security = UserSecuritySchema(platform="Python", salt=Utils.randomUUID(),
+                                                          hashed_auth_token=HashUtils.hashCode("password"))
+            userSchema = self.userRepository.save(userSchema)
+            self.assertIsNotNone(userSchema.id)
+            userIds.append(userSchema.id)
+
+        # cascades are deleted with the users
+        self.assertEqual(2, self.userRepository.bulkDelete(userIds + [-1]))
+        self.assertEqual([], self.userRepository.filter({"id": userIds[0]}))
+        self.assertFalse(self.userRepository.exists(UserSecuritySchema, {"user_id": userIds}))
+        self.assertFalse(self.userRepository.exists(AddressSchema, {"user_id": userIds}))
+        self.assertEqual(0, self.userRepository.bulkDelete(userIds))
+        logger.debug("-test_bulk_delete()")
+        print()
+
 
 # Starting point
 if __name__ == 'main':
@@ -1,13 +1,17 @@
 import logging
 import unittest
 
+from framework.datetime import StopWatch
 from framework.exception import ValidationException
 from framework.http import HTTPStatus
 from framework.orm.sqlalchemy.schema import SchemaOperation
+from framework.security.hash import HashUtils
 from framework.security.jwt import TokenTypeEnum
+from framework.utils import Utils
 from rest.user.model import User, Address, LoginUser
+from rest.user.repository import AddressRepository
 from rest.user.service import UserService
-from tests.base import AbstractTestCase
+from tests.base import AbstractTestCase, benchmark
 
 logger = logging.getLogger(__name__)
 
@@ -217,6 +221,23 @@ class UserServiceTest(AbstractTestCase):
         logger.debug("-test_update_user()")
         print()
 
+    def test_update_user_with_address(self):
+        """Tests the updated user has its addresses, within a request (sharing a session) too"""
+        logger.debug("+test_update_user_with_address()")
+        self.user.addresses.append(self.address)
+        self.user = self.userService.register(self.user)
+        self.assertEqual(1, len(self.user.addresses))
+
+        self.user.avatar_url = "avatar-url@avatar.com"
+        with self.app.test_request_context("/"):
+            user = self.userService.update(self.user)
+
+        logger.debug(f"user={user}")
+        self.assertEqual("avatar-url@avatar.com", user.avatar_url)
+        self.assertEqual([self.address.street1], [address.street1 for address in user.addresses])
+        logger.debug("-test_update_user_with_address()")
+        print()
+
     def test_delete_user(self):
         logger.debug("+test_delete_user()")
         self.user = self.userService.register(self.user)
@@ -230,6 +251,78 @@ class UserServiceTest(AbstractTestCase):
         logger.debug("-test_delete_user()")
         print()
 
+    def test_bulk_create(self):
+        logger.debug("+test_bulk_create()")
+        self.user = self.userService.register(self.user)
+        prefix = Utils.randomUUID()
+        users = [User(email=f"{prefix}-{index}@lakra.com", first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                      user_name=f"{prefix}-{index}", password=f"password-{index}") for index in range(3)]
+        users[1].addresses.append(self.address)
+        users[2].addresses = None
+        # already registered, duplicate in the batch and invalid users
+        users.append(User(email=self.userEmail, first_name="Roh", last_name="Lak", birth_date="2024-12-27",
+                          user_name=f"{prefix}-3", password="password"))
+        users.append(users[0].model_copy(update={"email": f"{prefix}-4@lakra.com"}))
+        users.append(User(email=f"{prefix}-5@lakra.com", first_name="Roh", last_name="Lak", user_name=f"{prefix}-5"))
+
+        results, errors = self.userService.bulkCreate(users)
+        logger.debug(f"results={results}, errors={errors}")
+        self.assertEqual([user.email for user in users[:3]], [user.email for user in results])
+        for user in results:
+            self.assertIsNotNone(user.id)
+            self.assertIsNotNone(user.created_at)
+            self.assertIsNone(user.password)
+            userSecurity = self.userService.userSecurityRepository.filter({"user_id": user.id})[0]
+            self.assertEqual(HashUtils.hashCode(f"password-{user.user_name[-1]}"), userSecurity.hashed_auth_token)
+
+        # the addresses are stored with the generated ids
+        self.assertEqual([0, 1, 0], [len(user.addresses) for user in results])
+        address = results[1].addresses[0]
+        self.assertIsNotNone(address.id)
+        self.assertEqual(results[1].id, address.user_id)
+        addressSchemas = AddressRepository().filter({"user_id": results[1].id})
+        self.assertEqual([(address.id, "123 Test Dr.")], [(schema.id, schema.street1) for schema in addressSchemas])
+
+        self.assertEqual([f"[3] User '{self.userEmail}' is already registered!",
+                          f"[4] User '{prefix}-0' is already registered!",
+                          "[5] User 'birth_date' is required!",
+                          "[5] User 'password' is required!"], [error.message for error in errors])
+        self.assertEqual([HTTPStatus.CONFLICT.statusCode] * 2 + [HTTPStatus.INVALID_DATA.statusCode] * 2,
+                         [error.status for error in errors])
+
+        self.userService.userRepository.bulkDelete([user.id for user in results])
+        logger.debug("-test_bulk_create()")
+        print()
+
+    @benchmark
+    def test_bulk_create_benchmark(self):
+        logger.debug("+test_bulk_create_benchmark()")
+        size = 100
+
+        def buildUsers() -> list:
+            prefix = Utils.randomUUID()
+            return [User(email=f"{prefix}-{index}@lakra.com", first_name="Roh", last_name="Lak",
+                         birth_date="2024-12-27", user_name=f"{prefix}-{index}", password="password")
+                    for index in range(size)]
+
+        users = buildUsers()
+        with StopWatch() as looped:
+            registered = [self.userService.register(user) for user in users]
+
+        users = buildUsers()
+        with StopWatch() as batched:
+            results, errors = self.userService.bulkCreate(users)
+
+        self.assertEqual(size, len(results))
+        self.assertEqual([], errors)
+        self.userService.userRepository.bulkDelete([user.id for user in registered + results])
+        logger.debug(f"register({size} users): looped={looped.duration:.3f}s, batched={batched.duration:.3f}s")
+        print(f"register({size} users): looped={looped.duration:.3f}s, batched={batched.duration:.3f}s, "
+              f"speedup={looped.duration / batched.duration:.1f}x")
+        self.assertLess(batched.duration, looped.duration)
+        logger.debug("-test_bulk_create_benchmark()")
+        print()
+
 
 # Starting point
 if __name__ == 'main':
@@ -3,6 +3,7 @@
 #
 from flask import current_app
 from unittest import TestCase
+from framework.settings import getSettings
 from webapp import WebApp
 
 
@@ -35,6 +36,8 @@ class WebAppTest(TestCase):
         print("+test_webapp()")
         assert self.app is not None
         assert current_app == self.app
+        # the test mode resolves the test env
+        assert getSettings().testing
         # valid object and expected results
         print("-test_webapp()")
         print()
@@ -15,14 +15,19 @@ from flask_cors import CORS
 # https://flask.palletsprojects.com/en/3.0.x/deploying/proxy_fix/
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+from _version import __version__
 from api import bp as api_bp
 from common.config import Config
 from framework.enums import EnvType
 from framework.enums import KeyEnum
 from framework.http import HTTPStatus
+from framework.json import JSONProvider
 from framework.logger import DefaultLogger
+from framework.metrics import RequestMetrics, registerCacheMetrics, registerPoolMetrics, registerWorkerMetrics
 from framework.orm.pydantic.model import ResponseModel
-from globals import connector
+from framework.settings import getSettings, reloadSettings
+from framework.timing import ServerTiming
+from globals import connector, requestSession, metrics, principalCache, grantCache
 from rest import bp as rest_bp
 from webapp.routes import bp as webapp_bp
 
@@ -49,20 +54,23 @@ class WebApp:
         # with self.app.app_context():
         flask_version = importlib.metadata.version("flask")
         logger.debug(f"Running Application [{self.app.name}] on version [{flask_version}] with testMode [{test_mode}]")
-        logger.info(f"ENV_TYPE={EnvType.get_env_type()}")
+        settings = getSettings()
+        logger.info(f"ENV_TYPE={settings.envType}")
         # Load the environment variables
-        dotEnvFileName = ".env.test" if test_mode or EnvType.is_testing(EnvType.get_env_type()) else ".env"
+        dotEnvFileName = ".env.test" if test_mode or settings.testing else ".env"
         logger.info(f"dotEnvFileName={dotEnvFileName}")
         env_file_path = self.path.cwd().joinpath(dotEnvFileName)  # self.path.cwd() / '.env'
         logger.debug(f"env_file_path={env_file_path}")
 
         # loads .env file and updates the local env object
         load_dotenv(dotenv_path=env_file_path)
+        # the .env file might change the env type, it's resolved once here (the test mode is always the test env)
+        settings = reloadSettings(EnvType.TEST.name if test_mode else None)
         self.set_env(self.__HOST, os.getenv(self.__HOST, "127.0.0.1"))
         self.set_env(self.__PORT, os.getenv(self.__PORT, '8080'))
         self.set_env(self.__DEBUG, os.getenv(self.__DEBUG, False))
-        self.set_env(KeyEnum.ENV_TYPE.name, EnvType.get_env_type())
-        if test_mode or EnvType.is_testing(EnvType.get_env_type()):
+        self.set_env(KeyEnum.ENV_TYPE.name, settings.envType)
+        if test_mode or settings.testing:
             self.set_env(KeyEnum.ENV_TYPE.name, EnvType.TEST.name)
 
         self.set_env(KeyEnum.LOG_FILE_NAME.name, os.getenv(KeyEnum.LOG_FILE_NAME.name, 'iws.log'))
@@ -100,8 +108,11 @@ class WebApp:
         # customize the default response class of your Flask application
         # app.response_class = JsonResponse
 
+        # encode the JSON responses with the orjson (if installed)
+        app.json = JSONProvider(app)
+
         # use custom logger adapter
-        app.logger = DefaultLogger(app)
+        app.logger = DefaultLogger(app, queueSize=Config.LOG_QUEUE_SIZE, batchSize=Config.LOG_BATCH_SIZE)
         app.logger.logConfig()
 
         # app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
@@ -111,7 +122,7 @@ class WebApp:
         self.__load_env(test_mode=test_mode)
         # load app's configs
         app.config.from_object(config_class)
-        if test_mode or EnvType.is_testing(EnvType.get_env_type()):
+        if test_mode or getSettings().testing:
             app.config.update({
                 KeyEnum.ENV_TYPE.name: EnvType.TEST.name,
                 "TESTING": True,
@@ -129,6 +140,17 @@ class WebApp:
         connector.init(app)
         connector.init_db({KeyEnum.DB_TYPE.name: KeyEnum.SQLALCHEMY.name})
 
+        # per-request timings (i.e. db, auth, serialize) as the 'Server-Timing' header and the log fields
+        if Config.SERVER_TIMING_ENABLED:
+            ServerTiming(app, connector.engine)
+
+        # request counters and latencies, DB pool, auth caches and worker gauges exposed at '/metrics'
+        if Config.METRICS_ENABLED:
+            RequestMetrics(app, metrics)
+            registerPoolMetrics(metrics, connector.engine)
+            registerCacheMetrics(metrics, {"principal": principalCache, "grant": grantCache})
+            registerWorkerMetrics(metrics, __version__)
+
         # Initialize/Register Default Error Handlers, if any
 
         @app.errorhandler(404)
@@ -189,6 +211,8 @@ class WebApp:
         app.register_blueprint(bp)
 
         # Initialize/Register Request's behavior/db connection
+        # one session (and pooled connection) per request, shared by all the repositories
+        requestSession.init_app(app)
         if not test_mode:
             # app.before_request(connector.open_connection())
             # app.teardown_request(connector.close_connection())
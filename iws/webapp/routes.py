@@ -6,6 +6,9 @@ import logging
 
 from flask import Blueprint, make_response, jsonify, render_template, request
 
+from framework.metrics import CONTENT_TYPE
+from globals import metrics
+
 logger = logging.getLogger(__name__)
 
 bp = Blueprint("webapp", __name__)
@@ -35,6 +38,12 @@ def health_check():
     return make_response(jsonify({'message': 'ok'}), 200)
 
 
+@bp.get("/metrics")
+def metrics_endpoint():
+    """Application's Metrics Endpoint, aggregated across the workers in the text exposition format"""
+    return make_response(metrics.render(), 200, {"Content-Type": CONTENT_TYPE})
+
+
 @bp.get("/")
 def index():
     """Index/Home Page"""